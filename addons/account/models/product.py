@@ -35,6 +35,10 @@ class ProductTemplate(models.Model):
         domain=[('deprecated', '=', False)],
         help="This account will be used for invoices instead of the default one to value expenses for the current product.")
 
+    @api.model
+    def _write_multi_fields(self, fnames):
+        return [name for name in fnames if name == 'uom_po_id']
+
     @api.multi
     def write(self, vals):
         #TODO: really? i don't see the reason we'd need that constraint..
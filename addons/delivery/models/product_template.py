@@ -9,6 +9,10 @@ class ProductTemplate(models.Model):
 
     hs_code = fields.Char(string="HS Code", help="Standardized code for international shipping and goods declaration", oldname="x_hs_code")
 
+    @api.model
+    def _write_multi_fields(self, fnames):
+        return [name for name in fnames if name == 'list_price']
+
     @api.multi
     def write(self, vals):
         res = super(ProductTemplate, self).write(vals)
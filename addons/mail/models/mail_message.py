@@ -30,6 +30,9 @@ class Message(models.Model):
     _inherit = ['ir.needaction_mixin']
     _order = 'id desc'
     _rec_name = 'record_name'
+    _sql_indexes = [
+        ('model_res_id_idx', '(model, res_id, id DESC)'),
+    ]
 
     _message_read_limit = 30
 
@@ -577,11 +580,6 @@ class Message(models.Model):
     # mail_message internals
     #------------------------------------------------------
 
-    def init(self, cr):
-        cr.execute("""SELECT indexname FROM pg_indexes WHERE indexname = 'mail_message_model_res_id_idx'""")
-        if not cr.fetchone():
-            cr.execute("""CREATE INDEX mail_message_model_res_id_idx ON mail_message (model, res_id)""")
-
     @api.model
     def _find_allowed_model_wise(self, doc_model, doc_dict):
         doc_ids = doc_dict.keys()
@@ -252,6 +252,19 @@ class MailThread(models.AbstractModel):
 
         return thread
 
+    @api.model
+    def _write_multi_fields(self, fnames):
+        if self._context.get('tracking_disable'):
+            return []
+        # the values of tracked fields are compared on every write
+        if not self._context.get('mail_notrack') and self._get_tracked_fields(fnames):
+            return fnames
+        # fields that subscribe followers, see message_auto_subscribe()
+        subtypes = self.env['mail.message.subtype'].search(['|', ('res_model', '=', False), ('parent_id.res_model', '=', self._name)])
+        relation_fields = set(subtype.relation_field for subtype in subtypes if subtype.relation_field)
+        return [name for name in fnames if name in relation_fields] + \
+            self._message_get_auto_subscribe_fields(fnames)
+
     @api.multi
     def write(self, values):
         if self._context.get('tracking_disable'):
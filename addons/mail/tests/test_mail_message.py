@@ -164,6 +164,19 @@ class TestMailMessage(TestMail):
         messages = self.env['mail.message'].sudo(self.user_portal).search([('subject', 'like', '_Test')])
         self.assertEqual(messages, msg4 | msg5)
 
+    def test_mail_message_access_search_path(self):
+        # a message the employee may read, replying to one in a private group
+        child = self.env['mail.message'].create({
+            'body': 'Child Body',
+            'model': 'mail.channel',
+            'res_id': self.group_pigs.id,
+            'parent_id': self.message.id,
+        })
+        domain = [('parent_id.body', 'ilike', 'My Body')]
+        self.assertEqual(self.env['mail.message'].search(domain), child)
+        # Test: Employee: the path leaf does not match the private message
+        self.assertFalse(self.env['mail.message'].sudo(self.user_employee).search(domain))
+
     @mute_logger('openerp.addons.base.ir.ir_model', 'openerp.models')
     def test_mail_message_access_read_crash(self):
         # TODO: Change the except_orm to Warning ( Because here it's call check_access_rule
@@ -705,6 +705,9 @@ class product_template(osv.osv):
 
         return product_template_id
 
+    def _write_multi_fields(self, cr, uid, fnames, context=None):
+        return [name for name in fnames if name in ('attribute_line_ids', 'active')]
+
     def write(self, cr, uid, ids, vals, context=None):
         res = super(product_template, self).write(cr, uid, ids, vals, context=context)
         if 'attribute_line_ids' in vals or vals.get('active'):
@@ -1194,6 +1197,9 @@ class product_product(osv.osv):
         self._set_standard_price(cr, uid, product_id, vals.get('standard_price', 0.0), context=context)
         return product_id
 
+    def _write_multi_fields(self, cr, uid, fnames, context=None):
+        return [name for name in fnames if name == 'standard_price']
+
     def write(self, cr, uid, ids, vals, context=None):
         ''' Store the standard price change in order to be able to retrieve the cost of a product for a given date'''
         if isinstance(ids, (int, long)):
@@ -1 +1 @@
-from . import test_uom, test_pricelist
+from . import test_uom, test_pricelist, test_product_write_multi
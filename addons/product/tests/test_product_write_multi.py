@@ -0,0 +1,29 @@
+from openerp.tests.common import TransactionCase
+from openerp.tools import sql_profiler
+
+
+class TestProductWriteMulti(TransactionCase):
+    """Tests for write_multi() on products, whose write() is overridden"""
+
+    def test_write_multi(self):
+        Template = self.env['product.template']
+        templates = Template
+        for index in range(3):
+            templates += Template.create({'name': 'Write Multi %s' % index})
+        a, b, c = templates
+
+        # the override of write() does not react to 'color': batch update
+        profiler = sql_profiler.SQLProfiler('write_multi')
+        with sql_profiler.profiling(profiler):
+            templates.write_multi({a.id: {'color': 1}, b.id: {'color': 2}, c.id: {'color': 3}})
+        updates = [query for query, _duration, _rows, _stack in profiler.queries
+                   if query.lstrip().startswith('UPDATE "product_template"')]
+        self.assertEqual(len(updates), 1)
+        templates.invalidate_cache()
+        self.assertEqual(templates.mapped('color'), [1, 2, 3])
+
+        # it reacts to 'active', which archives the variants
+        templates.write_multi({a.id: {'active': False}, b.id: {'color': 4}})
+        self.assertFalse(a.active)
+        self.assertFalse(a.with_context(active_test=False).product_variant_ids.active)
+        self.assertEqual(b.color, 4)
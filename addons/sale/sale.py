@@ -572,15 +572,20 @@ class SaleOrderLine(models.Model):
     def _get_analytic_track_service(self):
         return []
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(SaleOrderLine, self).create(vals_list)
+        for line in lines:
+            if line.state == 'sale':
+                if line.product_id.track_service in self._get_analytic_track_service() or line.product_id.invoice_policy in self._get_analytic_invoice_policy() and not line.order_id.project_id:
+                    line.order_id._create_analytic_account()
+                line._action_procurement_create()
+
+        return lines
+
     @api.model
-    def create(self, values):
-        line = super(SaleOrderLine, self).create(values)
-        if line.state == 'sale':
-            if line.product_id.track_service in self._get_analytic_track_service() or line.product_id.invoice_policy in self._get_analytic_invoice_policy() and not line.order_id.project_id:
-                line.order_id._create_analytic_account()
-            line._action_procurement_create()
-
-        return line
+    def _write_multi_fields(self, fnames):
+        return [name for name in fnames if name == 'product_uom_qty']
 
     @api.multi
     def write(self, values):
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+from openerp.tools import sql_profiler
+
+
+class TestSaleOrderLineCreate(TransactionCase):
+
+    def test_create_lines_batch(self):
+        """ Order lines created together are inserted with a single query. """
+        uom = self.env.ref('product.product_uom_unit')
+        partner = self.env['res.partner'].create({'name': 'Batch'})
+        product = self.env['product.product'].create({'name': 'Batch'})
+        order = self.env['sale.order'].create({'partner_id': partner.id})
+        vals_list = [{
+            'order_id': order.id,
+            'name': 'Batch %s' % index,
+            'product_id': product.id,
+            'product_uom_qty': 1.0,
+            'product_uom': uom.id,
+            'price_unit': index,
+        } for index in range(5)]
+
+        profiler = sql_profiler.SQLProfiler('create_lines_batch')
+        with sql_profiler.profiling(profiler):
+            lines = self.env['sale.order.line'].create(vals_list)
+        inserts = [query for query, _duration, _rows, _stack in profiler.queries
+                   if query.lstrip().startswith('INSERT INTO "sale_order_line"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(lines.mapped('name'), ['Batch %s' % index for index in range(5)])
+        self.assertEqual(order.order_line, lines)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestSalePrefetch(TransactionCase):
+
+    def test_prefetch_line_product_category(self):
+        """ Following line.product_id.categ_id.name on order lines takes a
+            number of queries that does not depend on the number of lines.
+        """
+        uom = self.env.ref('product.product_uom_unit')
+        partner = self.env['res.partner'].create({'name': 'Prefetch'})
+        lines = []
+        for index in range(10):
+            categ = self.env['product.category'].create({'name': 'Prefetch %s' % index})
+            product = self.env['product.product'].create({'name': 'Prefetch %s' % index, 'categ_id': categ.id})
+            lines.append((0, 0, {
+                'name': product.name,
+                'product_id': product.id,
+                'product_uom_qty': 1.0,
+                'product_uom': uom.id,
+                'price_unit': 1.0,
+            }))
+        order = self.env['sale.order'].create({'partner_id': partner.id, 'order_line': lines})
+        self.assertEqual(len(order.order_line), 10)
+
+        def count_queries(lines):
+            self.env.invalidate_all()
+            lines = lines.browse(lines.ids)
+            count = self.cr.sql_log_count
+            for line in lines:
+                line.product_id.categ_id.name
+            return self.cr.sql_log_count - count
+
+        self.assertEqual(count_queries(order.order_line[:1]), count_queries(order.order_line))
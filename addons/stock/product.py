@@ -507,6 +507,9 @@ class product_template(osv.osv):
         result['domain'] = "[('product_id.product_tmpl_id','in',[" + ','.join(map(str,ids)) + "])]"
         return result
 
+    def _write_multi_fields(self, cr, uid, fnames, context=None):
+        return [name for name in fnames if name == 'uom_id']
+
     def write(self, cr, uid, ids, vals, context=None):
         if 'uom_id' in vals:
             new_uom = self.pool.get('product.uom').browse(cr, uid, vals['uom_id'], context=context)
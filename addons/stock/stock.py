@@ -269,6 +269,10 @@ class stock_quant(osv.osv):
     """
     _name = "stock.quant"
     _description = "Quants"
+    _sql_indexes = [
+        ('product_location_index', '(product_id, location_id, company_id, qty, in_date, reservation_id)'),
+        ('product_location_reservation_index', '(product_id, location_id, reservation_id)'),
+    ]
 
     def _get_quant_name(self, cr, uid, ids, name, args, context=None):
         """ Forms complete name of location from parent location to child location.
@@ -331,11 +335,6 @@ class stock_quant(osv.osv):
         'company_id': lambda self, cr, uid, c: self.pool.get('res.company')._company_default_get(cr, uid, 'stock.quant', context=c),
     }
 
-    def init(self, cr):
-        cr.execute('SELECT indexname FROM pg_indexes WHERE indexname = %s', ('stock_quant_product_location_index',))
-        if not cr.fetchone():
-            cr.execute('CREATE INDEX stock_quant_product_location_index ON stock_quant (product_id, location_id, company_id, qty, in_date, reservation_id)')
-
     def read_group(self, cr, uid, domain, fields, groupby, offset=0, limit=None, context=None, orderby=False, lazy=True):
         ''' Overwrite the read_group in order to sum the function field 'inventory_value' in group by'''
         res = super(stock_quant, self).read_group(cr, uid, domain, fields, groupby, offset=offset, limit=limit, context=context, orderby=orderby, lazy=lazy)
@@ -1766,6 +1765,9 @@ class stock_move(osv.osv):
     _description = "Stock Move"
     _order = 'picking_id, sequence, id'
     _log_create = False
+    _sql_indexes = [
+        ('product_location_index', '(product_id, location_id, location_dest_id, company_id, state)'),
+    ]
 
     def get_price_unit(self, cr, uid, move, context=None):
         """ Returns the unit price to store on the quant """
@@ -2013,11 +2015,6 @@ class stock_move(osv.osv):
             'You try to move a product using a UoM that is not compatible with the UoM of the product moved. Please use an UoM in the same UoM category.',
             ['product_uom']),
     ]
-    def init(self, cr):
-        cr.execute('SELECT indexname FROM pg_indexes WHERE indexname = %s', ('stock_move_product_location_index',))
-        if not cr.fetchone():
-            cr.execute('CREATE INDEX stock_move_product_location_index ON stock_move (product_id, location_id, location_dest_id, company_id, state)')
-
     @api.cr_uid_ids_context
     def do_unreserve(self, cr, uid, move_ids, context=None):
         quant_obj = self.pool.get("stock.quant")
@@ -33,6 +33,7 @@ import openerp
 import openerp.modules.registry
 from openerp.addons.base.ir.ir_qweb import AssetsBundle, QWebTemplateNotFound
 from openerp.modules import get_resource_path
+from openerp.tools import sql_profiler
 from openerp.tools import topological_sort
 from openerp.tools.translate import _
 from openerp.tools import ustr
@@ -599,6 +600,18 @@ class WebClient(http.Controller):
     def index(self, mod=None, **kwargs):
         return request.render('web.qunit_suite')
 
+    @http.route('/web/sql_profile/<string:report_id>', type='http', auth="user")
+    def sql_profile(self, report_id, format='html'):
+        """ Show a report of the SQL profiler, see the option --sql-profiler. """
+        if not request.env.user._is_admin():
+            raise AccessError(_("Only administrators can see the SQL profiles."))
+        report = sql_profiler.load(report_id)
+        if report is None:
+            raise werkzeug.exceptions.NotFound()
+        if format == 'json':
+            return request.make_response(json.dumps(report), [('Content-Type', 'application/json')])
+        return request.make_response(sql_profiler.to_html(report))
+
 class Proxy(http.Controller):
 
     @http.route('/web/proxy/load', type='json', auth="none")
@@ -830,11 +843,13 @@ class Menu(http.Controller):
 
 class DataSet(http.Controller):
 
-    @http.route('/web/dataset/search_read', type='json', auth="user")
-    def search_read(self, model, fields=False, offset=0, limit=False, domain=None, sort=None):
-        return self.do_search_read(model, fields, offset, limit, domain, sort)
+    @http.route('/web/dataset/search_read', type='json', auth="user", readonly=True)
+    def search_read(self, model, fields=False, offset=0, limit=False, domain=None, sort=None, keyset=False,
+                    count_limit=False, count_estimate=False):
+        return self.do_search_read(model, fields, offset, limit, domain, sort, keyset,
+                                   count_limit, count_estimate)
     def do_search_read(self, model, fields=False, offset=0, limit=False, domain=None
-                       , sort=None):
+                       , sort=None, keyset=False, count_limit=False, count_estimate=False):
         """ Performs a search() followed by a read() (if needed) using the
         provided search criteria
 
@@ -845,28 +860,72 @@ class DataSet(http.Controller):
         :param int limit: the maximum number of records to return
         :param list domain: the search domain for the query
         :param list sort: sorting directives
+        :param keyset: ``True`` to get the first page with keyset pagination,
+                       or the token returned with the previous page to get
+                       the next one; ``offset`` is then only used for
+                       computing ``length``
+        :param int count_limit: if set, count the matching records up to
+                                ``count_limit`` only
+        :param bool count_estimate: if ``True``, estimate the number of
+                                    matching records instead of counting them
         :returns: A structure (dict) with two keys: ids (all the ids matching
                   the (domain, context) pair) and records (paginated records
-                  matching fields selection set)
+                  matching fields selection set); in keyset mode, the key
+                  token gives the token of the next page (``False`` if none);
+                  if the count is capped or estimated, the key length_exact
+                  tells whether ``length`` is the exact number of records
         :rtype: list
         """
         Model = request.session.model(model)
 
-        records = Model.search_read(domain, fields, offset or 0, limit or False, sort or False,
-                           request.context)
+        if keyset:
+            token = keyset if isinstance(keyset, basestring) else None
+            ids, token = Model.search_keyset(domain or [], limit or None, sort or None, token,
+                                             request.context)
+            if not ids:
+                return {
+                    'length': offset or 0,
+                    'records': [],
+                    'token': False,
+                }
+            if fields and fields == ['id']:
+                records = [{'id': id} for id in ids]
+            else:
+                read_ctx = dict(request.context or {})
+                read_ctx.pop('active_test', None)
+                records = Model.read(ids, fields or False, read_ctx)
+        else:
+            token = None
+            records = Model.search_read(domain, fields, offset or 0, limit or False, sort or False,
+                               request.context)
         if not records:
             return {
                 'length': 0,
                 'records': []
             }
+        length_exact = True
         if limit and len(records) == limit:
-            length = Model.search_count(domain, request.context)
+            if count_estimate:
+                length = Model.search_count(domain, request.context, estimate=True)
+                length_exact = False
+            elif count_limit:
+                length = Model.search_count(domain, request.context, limit=count_limit)
+                length_exact = length < count_limit
+            else:
+                length = Model.search_count(domain, request.context)
+            # the records already read are a lower bound of the count
+            length = max(length, len(records) + (offset or 0))
         else:
             length = len(records) + (offset or 0)
-        return {
+        result = {
             'length': length,
             'records': records
         }
+        if keyset:
+            result['token'] = token
+        if count_limit or count_estimate:
+            result['length_exact'] = length_exact
+        return result
 
     @http.route('/web/dataset/load', type='json', auth="user")
     def load(self, model, id, fields):
@@ -1316,6 +1375,41 @@ class ExportFormat(object):
         """
         raise NotImplementedError()
 
+    def from_data_iter(self, fields, rows):
+        """ Conversion method from OpenERP's export data to whatever the
+        current export class outputs, as an iterator over chunks of the
+        output. By default, the whole output is built by :meth:`from_data`.
+
+        :params list fields: a list of fields to export
+        :params rows: an iterable over the records to export
+        :returns: an iterator over chunks of output
+        """
+        yield self.from_data(fields, list(rows))
+
+    def export_rows(self, registry, uid, model, ids, domain, field_names, context):
+        """ Generate the rows to export, reading records by chunks. This runs
+        while the response is being sent, after the request has been closed,
+        hence the dedicated cursor and environment, and the registry and uid
+        given as parameters instead of being taken from the request.
+        """
+        with Environment.manage(), registry.cursor() as cr:
+            Model = Environment(cr, uid, context)[model]
+            if ids:
+                pages = [Model.browse(ids)]
+            else:
+                pages = self._search_pages(Model, domain)
+            for records in pages:
+                for row in records.export_data_iter(field_names, self.raw_data):
+                    yield row
+
+    def _search_pages(self, Model, domain):
+        token = None
+        while True:
+            records, token = Model.search_keyset(domain, limit=openerp.models.PREFETCH_MAX, token=token)
+            yield records
+            if not token:
+                break
+
     def base(self, data, token):
         params = json.loads(data)
         model, fields, ids, domain, import_compat = \
@@ -1323,29 +1417,34 @@ class ExportFormat(object):
                                 'import_compat')(
                 params)
 
-        Model = request.session.model(model)
         context = dict(request.context or {}, **params.get('context', {}))
-        ids = ids or Model.search(domain, 0, False, False, context=context)
+        # check access rights before streaming the response
+        request.env[model].check_access_rights('read')
 
         if not request.env[model]._is_an_ordinary_table():
             fields = [field for field in fields if field['name'] != 'id']
 
         field_names = map(operator.itemgetter('name'), fields)
-        import_data = Model.export_data(ids, field_names, self.raw_data, context=context).get('datas',[])
+        rows = self.export_rows(request.registry, request.uid, model, ids,
+                                domain or [], field_names, context)
 
         if import_compat:
             columns_headers = field_names
         else:
             columns_headers = [val['label'].strip() for val in fields]
 
-
-        return request.make_response(self.from_data(columns_headers, import_data),
+        # the body is streamed to the client as it is produced
+        response = request.make_response(self.from_data_iter(columns_headers, rows),
             headers=[('Content-Disposition',
                             content_disposition(self.filename(model))),
                      ('Content-Type', self.content_type)],
             cookies={'fileToken': token})
+        response.direct_passthrough = True
+        return response
 
 class CSVExport(ExportFormat, http.Controller):
+    # number of rows per chunk of streamed output
+    CHUNK_ROWS = 1000
 
     @http.route('/web/export/csv', type='http', auth="user")
     @serialize_exception
@@ -1360,12 +1459,15 @@ class CSVExport(ExportFormat, http.Controller):
         return base + '.csv'
 
     def from_data(self, fields, rows):
+        return ''.join(self.from_data_iter(fields, rows))
+
+    def from_data_iter(self, fields, rows):
         fp = StringIO()
         writer = csv.writer(fp, quoting=csv.QUOTE_ALL)
 
         writer.writerow([name.encode('utf-8') for name in fields])
 
-        for data in rows:
+        for index, data in enumerate(rows, 1):
             row = []
             for d in data:
                 if isinstance(d, basestring):
@@ -1378,10 +1480,15 @@ class CSVExport(ExportFormat, http.Controller):
                 row.append(d)
             writer.writerow(row)
 
-        fp.seek(0)
-        data = fp.read()
+            if index % self.CHUNK_ROWS == 0:
+                yield fp.getvalue()
+                fp.seek(0)
+                fp.truncate()
+
+        data = fp.getvalue()
         fp.close()
-        return data
+        if data:
+            yield data
 
 class ExcelExport(ExportFormat, http.Controller):
     # Excel needs raw data to correctly handle numbers and date values
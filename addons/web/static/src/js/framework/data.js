@@ -179,6 +179,39 @@ var Query = Class.extend({
             });
         });
     },
+    /**
+     * Performs non-lazy groups reads for several grouping criteria at once,
+     * in a single request
+     *
+     * @param {Array<Array<String>>} groupings
+     * @returns {jQuery.Deferred<Array<Array<openerp.web.QueryGroup>>>}
+     */
+    group_by_sets: function (groupings) {
+        var ctx = pyeval.eval(
+            'context', this._model.context(this._context));
+        var raw_fields = _.map(_.flatten(groupings).concat(this._fields || []), function (field) {
+            return field.split(':')[0];
+        });
+
+        var self = this;
+        return this._model.call('read_group_sets', {
+            groupby_sets: groupings,
+            fields: _.uniq(raw_fields),
+            domain: this._model.domain(this._filter),
+            context: ctx,
+            orderby: serialize_sort(this._order_by) || false
+        }).then(function (results) {
+            return _.map(results, function (groups, index) {
+                return _(groups).map(function (result) {
+                    result.__context = result.__context || {};
+                    result.__context.group_by = result.__context.group_by || [];
+                    _.defaults(result.__context, ctx);
+                    return new QueryGroup(
+                        self._model.name, groupings[index], result);
+                });
+            });
+        });
+    },
     /**
      * Creates a new query with the union of the current query's context and
      * the new context.
@@ -338,41 +338,38 @@ var PivotView = View.extend({
         for (var i = 0; i <= other_groupbys.length; i++) {
             groupbys.push([field].concat(other_groupbys.slice(0,i)));
         }
-        return $.when.apply(null, groupbys.map(function (groupby) {
-            return self.model.query(fields)
-                .filter(header.domain.length ? header.domain : self.domain)
-                .context(self.context)
-                .lazy(false)
-                .group_by(groupby);
-        })).then(function () {
-            var data = Array.prototype.slice.call(arguments),
-                datapt, attrs, j, k, l, row, col, cell_value, field_name;
-            for (i = 0; i < data.length; i++) {
-                for (j = 0; j < data[i].length; j++){
-                    datapt = data[i][j];
-                    attrs = datapt.attributes;
-                    if (i === 0) attrs.value = [attrs.value];
-                    for (k = 0; k < attrs.value.length; k++) {
-                        if (k < 1) field_name = field;
-                        else field_name = other_groupbys[k - 1];
-                        attrs.value[k] = self.sanitize_value(attrs.value[k], field_name);
-                    }
-                    if (i === 0) {
-                        row = self.make_header(datapt, header.root, 0, 1, header);
-                    } else {
-                        row = self.get_header(datapt, header.root, 0, 1, header);
-                    }
-                    col = self.get_header(datapt, other_root, 1, i + 1);
-                    if (!col) continue;
-                    for (cell_value = {}, l=0; l < self.active_measures.length; l++) {
-                        cell_value[self.active_measures[l]] = attrs.aggregates[self.active_measures[l]];
+        return self.model.query(fields)
+            .filter(header.domain.length ? header.domain : self.domain)
+            .context(self.context)
+            .group_by_sets(groupbys)
+            .then(function (data) {
+                var datapt, attrs, j, k, l, row, col, cell_value, field_name;
+                for (i = 0; i < data.length; i++) {
+                    for (j = 0; j < data[i].length; j++){
+                        datapt = data[i][j];
+                        attrs = datapt.attributes;
+                        if (i === 0) attrs.value = [attrs.value];
+                        for (k = 0; k < attrs.value.length; k++) {
+                            if (k < 1) field_name = field;
+                            else field_name = other_groupbys[k - 1];
+                            attrs.value[k] = self.sanitize_value(attrs.value[k], field_name);
+                        }
+                        if (i === 0) {
+                            row = self.make_header(datapt, header.root, 0, 1, header);
+                        } else {
+                            row = self.get_header(datapt, header.root, 0, 1, header);
+                        }
+                        col = self.get_header(datapt, other_root, 1, i + 1);
+                        if (!col) continue;
+                        for (cell_value = {}, l=0; l < self.active_measures.length; l++) {
+                            cell_value[self.active_measures[l]] = attrs.aggregates[self.active_measures[l]];
+                        }
+                        cell_value.__count__ = attrs.length;
+                        if (!self.cells[row.id]) self.cells[row.id] = [];
+                        self.cells[row.id][col.id] = cell_value;
                     }
-                    cell_value.__count__ = attrs.length;
-                    if (!self.cells[row.id]) self.cells[row.id] = [];
-                    self.cells[row.id][col.id] = cell_value;
                 }
-            }
-        });
+            });
     },
     expand_all: function () {
         this.load_data(false).then(this.proxy('display_table'));
@@ -391,17 +388,13 @@ var PivotView = View.extend({
                 groupbys.push(row_gbs.slice(0,i).concat(col_gbs.slice(0,j)));
             }
         }
-        return $.when.apply(null, groupbys.map(function (groupby) {
-            return self.model.query(fields)
-                .filter(self.domain)
-                .context(self.context)
-                .lazy(false)
-                // .order_by(['probable_revenue'])
-                .group_by(groupby);
-        })).then(function () {
-            var data = Array.prototype.slice.call(arguments);
-            self.prepare_data(data, should_update);
-        });
+        return self.model.query(fields)
+            .filter(self.domain)
+            .context(self.context)
+            .group_by_sets(groupbys)
+            .then(function (data) {
+                self.prepare_data(data, should_update);
+            });
     },
     prepare_data: function (data, should_update) {
         var i, j, k, l, m,
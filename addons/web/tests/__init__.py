@@ -2,3 +2,4 @@
 import test_js
 import test_menu
 import test_serving_base
+import test_export
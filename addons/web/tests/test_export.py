@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import csv
+import json
+import urllib
+from cStringIO import StringIO
+
+import openerp.tests
+
+
+class TestExport(openerp.tests.HttpCase):
+    def test_export_csv(self):
+        """ the streamed body of a CSV export contains all the rows """
+        self.authenticate('admin', 'admin')
+        partners = self.env['res.partner'].search([], limit=5, order='id')
+        data = json.dumps({
+            'model': 'res.partner',
+            'fields': [{'name': 'id', 'label': 'ID'}, {'name': 'name', 'label': 'Name'}],
+            'ids': False,
+            'domain': [('id', 'in', partners.ids)],
+            'import_compat': False,
+        })
+        query = urllib.urlencode({'data': data, 'token': 'test'})
+        response = self.url_open('/web/export/csv?%s' % query)
+        self.assertEqual(response.getcode(), 200)
+
+        rows = list(csv.reader(StringIO(response.read())))
+        self.assertEqual(rows[0], ['ID', 'Name'])
+        self.assertItemsEqual([row[1].decode('utf-8') for row in rows[1:]], partners.mapped('name'))
@@ -118,13 +118,18 @@ class sale_order_line(osv.osv):
             values['website_description'] = product.quote_description or product.website_description
         return values
 
-    def create(self, cr, uid, values, context=None):
-        values = self._inject_quote_description(cr, uid, values, context)
-        ret = super(sale_order_line, self).create(cr, uid, values, context=context)
+    @api.model_create_multi
+    def create(self, vals_list):
+        vals_list = [self._inject_quote_description(values) for values in vals_list]
+        lines = super(sale_order_line, self).create(vals_list)
         # hack because create don t make the job for a related field
-        if values.get('website_description'):
-            self.write(cr, uid, ret, {'website_description': values['website_description']}, context=context)
-        return ret
+        for line, values in zip(lines, vals_list):
+            if values.get('website_description'):
+                line.write({'website_description': values['website_description']})
+        return lines
+
+    def _write_multi_fields(self, cr, uid, fnames, context=None):
+        return [name for name in fnames if name in ('product_id', 'website_description')]
 
     def write(self, cr, uid, ids, values, context=None):
         values = self._inject_quote_description(cr, uid, values, context)
@@ -172,7 +172,7 @@ class website_sale(http.Controller):
         '/shop/page/<int:page>',
         '/shop/category/<model("product.public.category"):category>',
         '/shop/category/<model("product.public.category"):category>/page/<int:page>'
-    ], type='http', auth="public", website=True)
+    ], type='http', auth="public", website=True, readonly=True)
     def shop(self, page=0, category=None, search='', ppg=False, **post):
         cr, uid, context, pool = request.cr, request.uid, request.context, request.registry
 
@@ -1,2 +1,3 @@
 import test_sale_process
 import test_website_sale_pricelist
+import test_readonly_routes
@@ -0,0 +1,26 @@
+from mock import patch
+
+import openerp.tests
+from openerp.modules.registry import Registry
+
+
+@openerp.tests.common.at_install(False)
+@openerp.tests.common.post_install(True)
+class TestReadonlyRoutes(openerp.tests.HttpCase):
+
+    def test_shop_readonly_cursor(self):
+        """ the website route /shop, which is read-only, uses a read-only
+            cursor, although website dispatching uses it before the handler
+            of the route is set
+        """
+        readonly_flags = []
+        cursor = Registry.cursor
+
+        def recording_cursor(registry, readonly=False):
+            readonly_flags.append(readonly)
+            return cursor(registry, readonly=readonly)
+
+        with patch.object(Registry, 'cursor', recording_cursor):
+            response = self.url_open('/shop')
+        self.assertEqual(response.getcode(), 200)
+        self.assertIn(True, readonly_flags)
@@ -11,7 +11,7 @@ import pytz
 import openerp
 from openerp import SUPERUSER_ID, netsvc, api
 from openerp.osv import fields, osv
-from openerp.tools import DEFAULT_SERVER_DATETIME_FORMAT
+from openerp.tools import DEFAULT_SERVER_DATETIME_FORMAT, sql_profiler
 from openerp.tools.safe_eval import safe_eval as eval
 from openerp.tools.translate import _
 from openerp.modules import load_information_from_description_file
@@ -126,7 +126,18 @@ class ir_cron(osv.osv):
                     netsvc.log(_logger, logging.DEBUG, 'cron.object.execute', (cr.dbname,uid,'*',model_name,method_name)+tuple(args), depth=log_depth)
                     if _logger.isEnabledFor(logging.DEBUG):
                         start_time = time.time()
-                    getattr(model, method_name)(cr, uid, *args)
+                    profiler = None
+                    if openerp.tools.config['sql_profiler'] in ('cron', 'all'):
+                        profiler = sql_profiler.SQLProfiler('%s.%s' % (model_name, method_name))
+                    with sql_profiler.profiling(profiler):
+                        getattr(model, method_name)(cr, uid, *args)
+                    if profiler is not None:
+                        try:
+                            _logger.info('SQL profile of job %s (%s.%s): %s', job_id, model_name,
+                                         method_name, profiler.summary(profiler.save()))
+                        except Exception:
+                            _logger.exception('Cannot save the SQL profile of job %s (%s.%s)',
+                                              job_id, model_name, method_name)
                     if _logger.isEnabledFor(logging.DEBUG):
                         end_time = time.time()
                         _logger.debug('%.3fs (%s, %s)' % (end_time - start_time, model_name, method_name))
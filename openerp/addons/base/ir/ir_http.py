@@ -72,7 +72,11 @@ class ir_http(osv.AbstractModel):
         return {'model': ModelConverter, 'models': ModelsConverter, 'int': SignedIntConverter}
 
     def _find_handler(self, return_rule=False):
-        return self.routing_map().bind_to_environ(request.httprequest.environ).match(return_rule=return_rule)
+        rule, arguments = self.routing_map().bind_to_environ(request.httprequest.environ).match(return_rule=True)
+        # the cursor of the request may be used before the handler is set
+        # (authentication, website lookup), so decide which one to use now
+        request.readonly = bool(rule.endpoint.routing.get('readonly'))
+        return (rule if return_rule else rule.endpoint), arguments
 
     def _auth_method_user(self):
         request.uid = request.session.uid
@@ -573,7 +573,7 @@ class ir_model_constraint(Model):
             required=True, select=1),
         'type': fields.char('Constraint Type', required=True, size=1, select=1,
             help="Type of the constraint: `f` for a foreign key, "
-                "`u` for other constraints."),
+                "`i` for an index, `u` for other constraints."),
         'date_update': fields.datetime('Update Date'),
         'date_init': fields.datetime('Initialization Date')
     }
@@ -585,7 +585,7 @@ class ir_model_constraint(Model):
 
     def _module_data_uninstall(self, cr, uid, ids, context=None):
         """
-        Delete PostgreSQL foreign keys and constraints tracked by this model.
+        Delete PostgreSQL foreign keys, constraints and indexes tracked by this model.
         """ 
 
         if uid != SUPERUSER_ID and not self.pool['ir.model.access'].check_groups(cr, uid, "base.group_system"):
@@ -625,6 +625,13 @@ class ir_model_constraint(Model):
                     cr.execute('ALTER TABLE "%s" DROP CONSTRAINT "%s"' % (model_obj._table, name),)
                     _logger.info('Dropped CONSTRAINT %s@%s', name, model)
 
+            if typ == 'i':
+                # test if index exists
+                cr.execute("""SELECT 1 FROM pg_indexes WHERE indexname=%s AND tablename=%s""", (name, model_obj._table))
+                if cr.fetchone():
+                    cr.execute('DROP INDEX "%s"' % (name,))
+                    _logger.info('Dropped INDEX %s@%s', name, model)
+
         self.unlink(cr, uid, ids, context)
 
 class ir_model_relation(Model):
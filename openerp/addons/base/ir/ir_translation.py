@@ -32,6 +32,9 @@ class ir_translation_import_cursor(object):
     finish() it in order to insert multiple translations in a batch.
     """
     _table_name = 'tmp_ir_translation_import'
+    _columns = ['name', 'lang', 'res_id', 'src', 'type', 'imd_model', 'module',
+                'imd_name', 'value', 'state', 'comments']
+    _flush_size = 10000         # number of translations copied at once
 
     def __init__(self, cr, uid, parent, context):
         """ Initializer
@@ -46,6 +49,7 @@ class ir_translation_import_cursor(object):
         self._overwrite = context.get('overwrite', False)
         self._debug = False
         self._parent_table = parent._table
+        self._rows = []
 
         # Note that Postgres will NOT inherit the constraints or indexes
         # of ir_translation, so this copy will be much faster.
@@ -93,15 +97,21 @@ class ir_translation_import_cursor(object):
             params['name'] = 'ir.ui.view,arch_db'
             params['imd_model'] = "ir.ui.view"
 
-        self._cr.execute("""INSERT INTO %s (name, lang, res_id, src, type, imd_model, module, imd_name, value, state, comments)
-                            VALUES (%%(name)s, %%(lang)s, %%(res_id)s, %%(src)s, %%(type)s, %%(imd_model)s, %%(module)s,
-                                    %%(imd_name)s, %%(value)s, %%(state)s, %%(comments)s)""" % self._table_name,
-                         params)
+        self._rows.append(tuple(params[column] for column in self._columns))
+        if len(self._rows) >= self._flush_size:
+            self._flush()
+
+    def _flush(self):
+        """ Insert the pending translations into the temp table with COPY """
+        if self._rows:
+            self._cr.copy_from_rows(self._table_name, self._columns, self._rows)
+            self._rows = []
 
     def finish(self):
         """ Transfer the data from the temp table to ir.translation
         """
         cr = self._cr
+        self._flush()
         if self._debug:
             cr.execute("SELECT count(*) FROM %s" % self._table_name)
             c = cr.fetchone()[0]
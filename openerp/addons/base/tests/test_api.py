@@ -1,6 +1,9 @@
+from mock import patch
 
 from openerp import models
-from openerp.tools import mute_logger
+from openerp.api import ColumnCache, Environments
+from openerp.models import SpecialValue
+from openerp.tools import config, mute_logger
 from openerp.tests import common
 from openerp.exceptions import AccessError
 
@@ -348,6 +351,123 @@ class TestAPI(common.TransactionCase):
             countries |= p.country_id
         self.assertLessEqual(set(countries.ids), set(country_ids))
 
+    def patch_module(self, module, name, value):
+        self.addCleanup(setattr, module, name, getattr(module, name))
+        setattr(module, name, value)
+
+    @mute_logger('openerp.models')
+    def test_60_cache_prefetching_related(self):
+        """ Check the prefetching of records following many2one fields """
+        self.patch_module(models, 'PREFETCH_MAX', 2)
+        self.env.invalidate_all()
+        partners = self.env['res.partner'].search([])
+        self.assertGreater(len(partners), 2)
+
+        # following a many2one field reads it on the whole prefetch set, but
+        # reads the other fields on PREFETCH_MAX records only
+        partners[0].country_id
+        name_cache = self.env.cache[partners._fields['name']]
+        country_cache = self.env.cache[partners._fields['country_id']]
+        self.assertLessEqual(len(set(partners._ids) & set(name_cache)), 2)
+        self.assertLessEqual(set(partners._ids), set(country_cache))
+
+        # the records they reference are in the prefetch set of the comodel,
+        # and each level of the path is read without further queries
+        countries = partners.mapped('country_id')
+        self.assertLessEqual(set(countries._ids), self.env.prefetch['res.country'])
+        countries[0].currency_id
+        count = self.cr.sql_log_count
+        for partner in partners:
+            partner.country_id.currency_id
+        self.assertEqual(self.cr.sql_log_count, count)
+
+    def test_60_cache_columnar(self):
+        """ Check the columnar cache backend """
+        partners = self.env['res.partner'].search([], limit=3)
+        p1, p2, p3 = partners
+        fields = partners._fields
+        cache = ColumnCache(self.env)
+
+        # values are stored and retrieved by record id
+        cache[fields['name']].update({p1.id: u'One', p2.id: u'Two'})
+        cache[fields['active']][p1.id] = True
+        cache[fields['color']][p2.id] = 42
+        cache[fields['country_id']][p1.id] = self.env.ref('base.be')
+        cache[fields['country_id']][p2.id] = self.env['res.country']
+        self.assertEqual(cache[fields['name']][p2.id], u'Two')
+        self.assertIs(cache[fields['active']][p1.id], True)
+        self.assertEqual(cache[fields['color']][p2.id], 42)
+        self.assertEqual(cache[fields['country_id']][p1.id], self.env.ref('base.be'))
+        self.assertFalse(cache[fields['country_id']][p2.id])
+        self.assertEqual(set(cache[fields['name']]), set([p1.id, p2.id]))
+        self.assertNotIn(p3.id, cache[fields['name']])
+        self.assertNotIn(p2.id, cache[fields['active']])
+
+        # values that do not fit in the column are kept as well
+        special = SpecialValue(None)
+        cache[fields['color']][p1.id] = special
+        self.assertIs(cache[fields['color']][p1.id], special)
+        self.assertEqual(len(cache[fields['color']]), 2)
+
+        # values are removed, and slots are reused after eviction
+        del cache[fields['name']][p1.id]
+        self.assertEqual(dict(cache[fields['name']]), {p2.id: u'Two'})
+        cache.evict('res.partner', [p2.id])
+        self.assertFalse(cache[fields['name']])
+        self.assertNotIn(p2.id, cache[fields['color']])
+        cache[fields['name']][p3.id] = u'Three'
+        self.assertEqual(dict(cache[fields['name']]), {p3.id: u'Three'})
+
+    @mute_logger('openerp.models')
+    def test_60_cache_evict(self):
+        """ Check the eviction of records from the cache """
+        partners = self.env['res.partner'].search([])
+        partners[0].name
+        name_cache = self.env.cache[partners._fields['name']]
+        self.assertIn(partners[0].id, name_cache)
+        self.env.evict(partners)
+        self.assertNotIn(partners[0].id, name_cache)
+        self.assertFalse(self.env.prefetch['res.partner'] & set(partners.ids))
+        self.assertEqual(partners[0].name, partners[0].sudo().name)
+
+    @mute_logger('openerp.models')
+    def test_60_cache_evict_columnar(self):
+        """ Check the eviction of records with the option --columnar-cache """
+        with patch.dict(config.options, {'columnar_cache': True}):
+            env = self.env(context=dict(self.env.context, columnar_cache_test=True))
+        self.assertIsInstance(env.cache, ColumnCache)
+        partners = env['res.partner'].search([])
+        partners[0].name
+        name_cache = env.cache[partners._fields['name']]
+        self.assertIn(partners[0].id, name_cache)
+        env.evict(partners)
+        self.assertNotIn(partners[0].id, name_cache)
+        self.assertFalse(env.prefetch['res.partner'] & set(partners.ids))
+        self.assertEqual(partners[0].name, partners[0].sudo().name)
+
+    @mute_logger('openerp.models')
+    def test_60_cache_shared(self):
+        """ Check the cache shared by the environments of a cursor """
+        self.env.invalidate_all()
+        partners = self.env['res.partner'].search([])
+        partner = partners[0]
+        partner.name, partner.ref, partner.country_id
+
+        # another environment takes the values without querying the database
+        other = partner.with_context(lang='fr_FR', shared_cache_test=True)
+        self.assertNotEqual(other.env, partner.env)
+        count = self.cr.sql_log_count
+        self.assertEqual(other.name, partner.name)
+        self.assertEqual(other.country_id.id, partner.country_id.id)
+        self.assertEqual(other.country_id.env, other.env)
+        self.assertEqual(self.cr.sql_log_count, count)
+
+        # the shared cache is invalidated by modifications
+        partner.write({'ref': 'shared cache'})
+        self.assertEqual(other.ref, 'shared cache')
+        self.assertEqual(partner.sudo().ref, 'shared cache')
+        other.env.check_cache()
+
     @mute_logger('openerp.models')
     def test_70_one(self):
         """ Check method one(). """
@@ -462,3 +582,17 @@ class TestAPI(common.TransactionCase):
             ps.mapped('parent_id.name'),
             [p.name for p in parents]
         )
+
+    def test_90_environment_lookup(self):
+        """ Check that environments are retrieved by key, without scanning
+            all of them.
+        """
+        envs = [self.env(context={'test_env_lookup': i}) for i in xrange(100)]
+        self.assertIs(self.env.all.get(envs[-1].args), envs[-1])
+
+        def scan(environments):
+            raise AssertionError("Environments are scanned to retrieve one of them.")
+
+        with patch.object(Environments, '__iter__', scan):
+            for i, env in enumerate(envs):
+                self.assertIs(self.env(context={'test_env_lookup': i}), env)
@@ -1,7 +1,7 @@
 import unittest
 
 import openerp.tests.common as common
-from openerp.exceptions import ValidationError
+from openerp.exceptions import UserError, ValidationError
 
 class test_base(common.TransactionCase):
 
@@ -376,6 +376,46 @@ class test_base(common.TransactionCase):
         self.assertEqual([2, 4], [g['title_count'] for g in groups_data], 'Incorrect number of results')
         self.assertEqual([-1, 10], [g['color'] for g in groups_data], 'Incorrect aggregation of int column')
 
+    def test_61_read_group_aggregates(self):
+        cr, uid = self.cr, self.uid
+        title_sir = self.res_partner_title.create(cr, uid, {'name': 'Sir'})
+        title_lady = self.res_partner_title.create(cr, uid, {'name': 'Lady'})
+        test_users = [
+            {'name': 'Alice', 'login': 'alice', 'color': 1, 'function': 'Friend', 'title': title_lady},
+            {'name': 'Alice', 'login': 'alice2', 'color': 0, 'function': 'Friend', 'title': title_lady},
+            {'name': 'Bob', 'login': 'bob', 'color': 2, 'function': 'Friend', 'title': title_sir},
+            {'name': 'Eve', 'login': 'eve', 'color': 3, 'function': 'Eavesdropper', 'title': title_lady},
+            {'name': 'Nab', 'login': 'nab', 'color': -3, 'function': '5$ Wrench', 'title': title_sir},
+            {'name': 'Nab', 'login': 'nab-she', 'color': 6, 'function': '5$ Wrench', 'title': title_lady},
+        ]
+        ids = [self.res_users.create(cr, uid, u) for u in test_users]
+        domain = [('id', 'in', ids)]
+
+        # explicit aggregates on inherited and local fields
+        fields = ['function', 'color:max', 'min_color:min(color)', 'avg_color:avg(color)',
+                  'name:count_distinct', 'ids:array_agg(id)']
+        groups_data = self.res_users.read_group(cr, uid, domain, fields=fields, groupby=['function'])
+        self.assertEqual(['5$ Wrench', 'Eavesdropper', 'Friend'], [g['function'] for g in groups_data], 'Incorrect ordering of the list')
+        self.assertEqual([6, 3, 2], [g['color'] for g in groups_data], 'Incorrect max aggregate')
+        self.assertEqual([-3, 3, 0], [g['min_color'] for g in groups_data], 'Incorrect min aggregate')
+        self.assertEqual([1.5, 3, 1], [g['avg_color'] for g in groups_data], 'Incorrect avg aggregate')
+        self.assertEqual([1, 1, 2], [g['name'] for g in groups_data], 'Incorrect count_distinct aggregate')
+        self.assertEqual([sorted(ids[4:]), ids[3:4], sorted(ids[:3])], [sorted(g['ids']) for g in groups_data], 'Incorrect array_agg aggregate')
+
+        with self.assertRaises(UserError):
+            self.res_users.read_group(cr, uid, domain, fields=['function', 'id:count_distinct'], groupby=['function'])
+
+        # several groupings at once give the same results as separate calls
+        fields = ['function', 'title', 'color', 'color_max:max(color)']
+        groupby_sets = [[], ['function'], ['function', 'title'], ['title']]
+        sets_data = self.res_users.read_group_sets(cr, uid, domain, fields=fields, groupby_sets=groupby_sets)
+        self.assertEqual(len(sets_data), len(groupby_sets), "Incorrect number of results for grouping sets")
+        for groupby, groups_data in zip(groupby_sets, sets_data):
+            expected = self.res_users.read_group(cr, uid, domain, fields=fields, groupby=groupby, lazy=False)
+            self.assertEqual(groups_data, expected, "Incorrect result for grouping set %s" % groupby)
+        self.assertEqual([(title_lady, 'Lady'), (title_sir, 'Sir')], [g['title'] for g in sets_data[3]], 'Incorrect ordering of the list')
+        self.assertEqual([4, 2], [g['__count'] for g in sets_data[3]], 'Incorrect number of results')
+
 
 class test_partner_recursion(common.TransactionCase):
 
@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 
+import time
 import unittest
 
+import psycopg2
+
 import openerp
+from openerp.http import is_readonly_error
+from openerp.tools import sql_profiler
 from openerp.tools.misc import mute_logger
 from openerp.tests import common
 
@@ -27,3 +32,151 @@ class test_cr_execute(unittest.TestCase):
                 cr.execute("SELECT id FROM res_users WHERE id=%s", 1)
             with self.assertRaises(ValueError):
                 cr.execute("SELECT id FROM res_users WHERE id=%s", '1')
+
+
+class test_cr_stream(unittest.TestCase):
+    """ Stream the rows of a query with a server-side cursor """
+
+    def test_stream(self):
+        with registry().cursor() as cr:
+            cr.execute("SELECT generate_series(1, 25)")
+            expected = cr.fetchall()
+            rows = cr.stream("SELECT generate_series(1, %s)", [25], itersize=10)
+            # the cursor remains usable while streaming
+            cr.execute("SELECT 1")
+            self.assertEqual(list(rows), expected)
+
+    @mute_logger('openerp.sql_db')
+    def test_stream_bad_params(self):
+        with registry().cursor() as cr:
+            with self.assertRaises(ValueError):
+                cr.stream("SELECT id FROM res_users WHERE id=%s", 1)
+
+
+class test_cr_copy(unittest.TestCase):
+    """ Copy rows from and to the database """
+
+    def test_copy_rows(self):
+        with registry().cursor() as cr:
+            cr.execute("CREATE TEMP TABLE test_cr_copy (name VARCHAR, value FLOAT, flag BOOLEAN)")
+            rows = [
+                (u'plain', 1.5, True),
+                (u'tab\tnewline\ncr\rbackslash\\ \xe9', -2.0, False),
+                (None, None, None),
+            ]
+            count = cr.copy_from_rows('test_cr_copy', ['name', 'value', 'flag'], iter(rows))
+            self.assertEqual(count, 3)
+
+            cr.execute("SELECT name, value, flag FROM test_cr_copy ORDER BY value NULLS LAST")
+            self.assertEqual(cr.fetchall(), [rows[1], rows[0], rows[2]])
+
+            result = cr.copy_to_rows(
+                "SELECT name, flag FROM test_cr_copy WHERE value IS NULL OR value < %s ORDER BY value", [0])
+            self.assertEqual(result, [
+                (rows[1][0].encode('utf-8'), 'f'),
+                (None, None),
+            ])
+
+
+class test_connection_pool(unittest.TestCase):
+    """ Borrow and give back connections to a pool """
+
+    def setUp(self):
+        self.dsn = openerp.sql_db.dsn(common.get_db_name())[1]
+
+    def test_pool_limits(self):
+        pool = openerp.sql_db.ConnectionPool(maxconn=4, db_maxconn=2)
+        self.addCleanup(pool.close_all)
+
+        cnx1 = pool.borrow(self.dsn)
+        cnx2 = pool.borrow(self.dsn)
+        with self.assertRaises(openerp.sql_db.PoolError):
+            pool.borrow(self.dsn)
+
+        # idle connections are reused in LIFO order
+        pool.give_back(cnx1)
+        pool.give_back(cnx2)
+        self.assertIs(pool.borrow(self.dsn), cnx2)
+
+        stats = pool.stats()
+        self.assertEqual(stats['count'], 2)
+        db_stats = stats['databases'][common.get_db_name()]
+        self.assertEqual(db_stats['borrowed'], 1)
+        self.assertEqual(db_stats['idle'], 1)
+        self.assertEqual(db_stats['borrows'], 3)
+        self.assertEqual(db_stats['created'], 2)
+        self.assertEqual(db_stats['timeouts'], 1)
+
+    def test_pool_reaping(self):
+        pool = openerp.sql_db.ConnectionPool(maxconn=4, db_minconn=1, idle_timeout=60)
+        self.addCleanup(pool.close_all)
+
+        cnx1 = pool.borrow(self.dsn)
+        cnx2 = pool.borrow(self.dsn)
+        pool.give_back(cnx1)
+        pool.give_back(cnx2)
+
+        # the most recent idle connection is kept
+        pool._reap(time.time() + 120)
+        self.assertTrue(cnx1.closed)
+        self.assertFalse(cnx2.closed)
+        self.assertEqual(pool.stats()['databases'][common.get_db_name()]['reaped'], 1)
+
+
+class test_cr_readonly(unittest.TestCase):
+    """ Read-only cursors, as used on a read replica """
+
+    @mute_logger('openerp.sql_db')
+    def test_readonly(self):
+        # without a replica, the connection goes to the primary database
+        connection = openerp.sql_db.db_connect(common.get_db_name(), readonly=True)
+        cr = connection.cursor()
+        try:
+            self.assertTrue(cr.readonly)
+            cr.execute("SELECT login FROM res_users WHERE id=%s", [ADMIN_USER_ID])
+            with self.assertRaises(psycopg2.InternalError) as context:
+                cr.execute("UPDATE res_users SET login=login WHERE id=%s", [ADMIN_USER_ID])
+            self.assertTrue(is_readonly_error(context.exception))
+
+            # fall back on the primary database with the same cursor
+            registry().readwrite(cr)
+            self.assertFalse(cr.readonly)
+            cr.execute("UPDATE res_users SET login=login WHERE id=%s", [ADMIN_USER_ID])
+            cr.rollback()
+        finally:
+            cr.close()
+
+
+class test_cr_profiler(unittest.TestCase):
+    """ Profile the queries executed by cursors """
+
+    def test_normalize(self):
+        self.assertEqual(
+            sql_profiler.normalize("SELECT id FROM res_partner  WHERE id IN (1, 2, 3) AND name='it''s'"),
+            "SELECT id FROM res_partner WHERE id IN (...) AND name=?",
+        )
+        self.assertEqual(
+            sql_profiler.normalize("SELECT id FROM res_partner WHERE id=%s AND ref=%(ref)s"),
+            "SELECT id FROM res_partner WHERE id=? AND ref=?",
+        )
+
+    def test_n_plus_one(self):
+        profiler = sql_profiler.SQLProfiler('test')
+        with registry().cursor() as cr:
+            with sql_profiler.profiling(profiler):
+                self.assertIs(sql_profiler.current(), profiler)
+                cr.execute("SELECT id FROM res_users")
+                for (user_id,) in cr.fetchall() * sql_profiler.NPLUS1_THRESHOLD:
+                    cr.execute("SELECT login FROM res_users WHERE id=%s", [user_id])
+            # queries are no longer recorded
+            self.assertIsNone(sql_profiler.current())
+            cr.execute("SELECT 1")
+
+        report = profiler.report()
+        self.assertGreater(report['query_count'], sql_profiler.NPLUS1_THRESHOLD)
+        self.assertEqual(report['query_count'], len(profiler.queries))
+        self.assertEqual(len(report['n_plus_one']), 1)
+        n_plus_one = report['n_plus_one'][0]
+        self.assertEqual(n_plus_one['shape'], "SELECT login FROM res_users WHERE id=?")
+        self.assertEqual(n_plus_one['count'], report['query_count'] - 1)
+        self.assertIn('test_n_plus_one', n_plus_one['stack'][-1])
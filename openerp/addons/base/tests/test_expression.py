@@ -533,6 +533,115 @@ class test_expression(common.TransactionCase):
             ids = Country.search(self.cr, self.uid, domain)
             self.assertListEqual([be], ids)
 
+        # the translated value takes precedence over the column
+        self.cr.execute("""INSERT INTO ir_translation (name, lang, type, res_id, src, value, state)
+                           VALUES ('res.country,name', 'fr_FR', 'model', %s, 'Belgium', 'Belgique', 'translated')""", (be,))
+        context = {'lang': 'fr_FR'}
+        ids = Country.search(self.cr, self.uid, [('name', 'ilike', 'Belgiq')], context=context)
+        self.assertListEqual([be], ids)
+        ids = Country.search(self.cr, self.uid, [('name', '=', 'Belgium')], context=context)
+        self.assertListEqual([], ids)
+        ids = Country.search(self.cr, self.uid, [('name', 'not ilike', 'Belgiq')], context=context)
+        self.assertNotIn(be, ids)
+        ids = Country.search(self.cr, self.uid, [('name', 'ilike', 'Franc')], context=context)
+        self.assertIn(self.ref('base.fr'), ids)
+
+    def test_hierarchy_without_parent_store(self):
+        Partner = self.env['res.partner']
+        Bank = self.env['res.partner.bank']
+        self.assertFalse(Partner._parent_store)
+        a = Partner.create({'name': 'A'})
+        b = Partner.create({'name': 'B', 'parent_id': a.id})
+        c = Partner.create({'name': 'C', 'parent_id': b.id})
+        d = Partner.create({'name': 'D', 'parent_id': a.id})
+        bank_c = Bank.create({'acc_number': '123', 'acc_type': 'bank', 'partner_id': c.id})
+        bank_d = Bank.create({'acc_number': '456', 'acc_type': 'bank', 'partner_id': d.id})
+
+        self.assertEqual(Partner.search([('id', 'child_of', a.id)]), a + b + c + d)
+        self.assertEqual(Partner.search([('id', 'child_of', b.id)]), b + c)
+        self.assertEqual(Partner.search([('id', 'parent_of', c.id)]), a + b + c)
+        self.assertEqual(Partner.search([('id', 'parent_of', [c.id, d.id])]), a + b + c + d)
+        self.assertEqual(Partner.search([('id', 'child_of', [])]), Partner)
+        self.assertEqual(Bank.search([('partner_id', 'child_of', a.id)]), bank_c + bank_d)
+        self.assertEqual(Bank.search([('partner_id', 'child_of', b.id)]), bank_c)
+
+        # the hierarchy is resolved within the search query
+        query = Partner._where_calc([('id', 'child_of', a.id)])
+        from_clause, where_clause, where_params = query.get_sql()
+        self.assertIn('WITH RECURSIVE', where_clause)
+
+    def test_path_subquery(self):
+        Partner = self.env['res.partner']
+        Bank = self.env['res.partner.bank']
+        a = Partner.create({'name': 'Subquery A'})
+        b = Partner.create({'name': 'Subquery B', 'parent_id': a.id})
+        c = Partner.create({'name': 'Subquery C', 'category_id': [(0, 0, {'name': 'Subquery Cat'})]})
+        Bank.create({'acc_number': 'SUBQ-789', 'acc_type': 'bank', 'partner_id': b.id})
+
+        self.assertEqual(Partner.search([('parent_id.name', '=', 'Subquery A')]), b)
+        self.assertEqual(Partner.search([('bank_ids.acc_number', '=', 'SUBQ-789')]), b)
+        self.assertEqual(Partner.search([('category_id.name', '=', 'Subquery Cat')]), c)
+        self.assertEqual(Bank.search([('partner_id.parent_id.name', '=', 'Subquery A')]).partner_id, b)
+
+        # the subdomains are evaluated within the search query
+        for domain in ([('parent_id.name', '=', 'Subquery A')],
+                       [('bank_ids.acc_number', '=', 'SUBQ-789')],
+                       [('category_id.name', '=', 'Subquery Cat')]):
+            query = Partner._where_calc(domain)
+            from_clause, where_clause, where_params = query.get_sql()
+            self.assertIn('SELECT', where_clause)
+
+    def test_empty_like(self):
+        Country = self.registry('res.country')
+        all_ids = Country.search(self.cr, self.uid, [])
+        self.assertListEqual(all_ids, Country.search(self.cr, self.uid, [('code', 'ilike', '')]))
+        self.assertListEqual([], Country.search(self.cr, self.uid, [('code', 'not ilike', '')]))
+
+    def test_domain_cache(self):
+        Partner = self.env['res.partner'].with_context(active_test=False)
+        alpha = Partner.create({'name': 'test_cache_alpha', 'ref': 'A'})
+        beta = Partner.create({'name': 'test_cache_beta', 'ref': 'B'})
+        domain1 = ['|', ('name', '=', 'test_cache_alpha'), ('ref', 'in', ['X', 'Y'])]
+        domain2 = ['|', ('name', '=', 'test_cache_beta'), ('ref', 'in', ['B', 'Z'])]
+
+        # both domains have the same structure
+        signature = expression.domain_signature(Partner, domain1)
+        self.assertTrue(signature)
+        self.assertEqual(signature, expression.domain_signature(Partner, domain2))
+
+        # the first search compiles the domain, the second one reuses it
+        self.registry.domain_cache.clear()
+        self.assertEqual(Partner.search(domain1), alpha)
+        self.assertTrue(self.registry.domain_cache.get((Partner._name, signature)))
+        self.assertEqual(Partner.search(domain2), beta)
+        self.assertEqual(Partner.search(domain1), alpha)
+
+        # the number of values is part of the structure
+        domain3 = [('ref', 'in', ['A', 'B', False])]
+        self.assertNotEqual(expression.domain_signature(Partner, domain3),
+                            expression.domain_signature(Partner, [('ref', 'in', ['A'])]))
+        self.assertEqual(Partner.search(domain3 + [('name', 'like', 'test_cache_')]), alpha + beta)
+
+        # the SQL code of those domains depends on their values
+        for domain in [[('parent_id.name', '=', 'test')],
+                       [('country_id', '=', 'Belgium')],
+                       [('category_id', 'in', [1])],
+                       [('id', 'child_of', [1])]]:
+            self.assertIsNone(expression.domain_signature(Partner, domain))
+
+    def test_trigram_index(self):
+        # the b-tree index is kept for equality searches and ordering
+        self.cr.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'res_partner_name_index'")
+        [indexdef] = self.cr.fetchone()
+        self.assertNotIn('gin_trgm_ops', indexdef)
+
+        self.cr.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'res_partner_name_trgm_index'")
+        res = self.cr.fetchone()
+        self.assertEqual(bool(res), self.registry.has_trigram)
+        if res:
+            self.assertIn('gin_trgm_ops', res[0])
+            self.assertEqual('unaccent(' in res[0], self.registry.has_unaccent_index)
+
     def test_long_table_alias(self):
         # To test the 64 characters limit for table aliases in PostgreSQL
         self.patch_order('res.users', 'partner_id')
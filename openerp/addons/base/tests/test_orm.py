@@ -1,5 +1,10 @@
 from collections import defaultdict
-from openerp.tools import mute_logger
+
+from mock import patch
+
+from openerp import models
+from openerp.sql_db import Cursor
+from openerp.tools import mute_logger, sql_profiler
 from openerp.tests import common
 
 UID = common.ADMIN_USER_ID
@@ -182,6 +187,146 @@ class TestORM(common.TransactionCase):
         group_user.write({'users': [(3, user.id)]})
         self.assertTrue(user.share)
 
+    def test_create_multi(self):
+        """ create() with a list of values creates all records in one call """
+        partners = self.env['res.partner'].create([
+            {'name': 'Multi1'},
+            {'name': 'Multi2', 'email': 'multi2@example.com'},
+            {'name': 'Multi3'},
+        ])
+        self.assertEqual(len(partners), 3)
+        self.assertEqual(partners.mapped('name'), ['Multi1', 'Multi2', 'Multi3'])
+        self.assertEqual(partners.mapped('email'), [False, 'multi2@example.com', False])
+        # defaults are applied on every record
+        self.assertTrue(all(partners.mapped('active')))
+
+        # traditional style returns a list of ids
+        ids = self.partner.create(self.cr, UID, [{'name': 'Multi4'}, {'name': 'Multi5'}])
+        self.assertEqual(len(ids), 2)
+        self.assertEqual([p['name'] for p in self.partner.read(self.cr, UID, ids, ['name'])],
+                         ['Multi4', 'Multi5'])
+
+        # a single dictionary still returns a single record
+        partner = self.env['res.partner'].create({'name': 'Single'})
+        self.assertEqual(len(partner), 1)
+        self.assertIsInstance(self.partner.create(self.cr, UID, {'name': 'Single2'}), (int, long))
+
+        # an empty list creates nothing
+        self.assertFalse(self.env['res.partner'].create([]))
+
+    def test_create_multi_batch(self):
+        """ create() inserts the records in a single query """
+        # res.partner overrides create(), which creates records one by one;
+        # res.partner.category does not
+        Category = self.env['res.partner.category']
+        profiler = sql_profiler.SQLProfiler('create_multi')
+        with sql_profiler.profiling(profiler):
+            categories = Category.create([{'name': 'batch-%s' % i, 'color': i} for i in xrange(3)])
+        inserts = [query for query, _duration, _rows, _stack in profiler.queries
+                   if query.lstrip().startswith('INSERT INTO "res_partner_category"')]
+        self.assertEqual(len(inserts), 1)
+
+        categories.invalidate_cache()
+        self.assertEqual(categories.mapped('name'), ['batch-0', 'batch-1', 'batch-2'])
+        self.assertEqual(categories.mapped('color'), [0, 1, 2])
+
+    def test_create_multi_copy(self):
+        """ create() inserts large batches of records with COPY """
+        count = models.COPY_CREATE_MIN
+        vals_list = [{'name': 'Copy%d\t\\' % i, 'color': i} for i in xrange(count)]
+        # res.partner overrides create(), which creates records one by one;
+        # res.partner.category does not
+        with patch.object(Cursor, 'copy_from_rows', autospec=True,
+                          side_effect=Cursor.copy_from_rows) as copy_from_rows:
+            categories = self.env['res.partner.category'].create(vals_list)
+        self.assertEqual(len(categories), count)
+        self.assertEqual(len(set(categories.ids)), count)
+        self.assertEqual(copy_from_rows.call_count, 1)
+        self.assertEqual(copy_from_rows.call_args[0][1], 'res_partner_category')
+
+        categories.invalidate_cache()
+        self.assertEqual(categories.mapped('name'), [vals['name'] for vals in vals_list])
+        self.assertEqual(categories.mapped('color'), range(count))
+        self.assertTrue(all(categories.mapped('create_date')))
+        self.assertEqual(categories.mapped('create_uid'), self.env.user)
+
+    def test_write_multi(self):
+        """ write_multi() writes different values on each record """
+        partners = self.env['res.partner'].create([
+            {'name': 'A', 'color': 1},
+            {'name': 'B', 'color': 2},
+            {'name': 'C', 'color': 3},
+        ])
+        a, b, c = partners
+        partners.write_multi({
+            a.id: {'color': 10, 'ref': 'ref-a'},
+            b.id: {'color': None},
+            c.id: {'name': 'CC', 'category_id': [(6, 0, [])]},
+        })
+        partners.invalidate_cache()
+        self.assertEqual(partners.mapped('color'), [10, 0, 3])
+        self.assertEqual(partners.mapped('ref'), ['ref-a', False, False])
+        self.assertEqual(partners.mapped('name'), ['A', 'B', 'CC'])
+        # stored computed fields depending on written fields are recomputed
+        self.assertEqual(c.display_name, 'CC')
+
+        # writing on a deleted record raises an error
+        b.unlink()
+        with self.assertRaises(Exception):
+            partners.write_multi({a.id: {'color': 11}, b.id: {'color': 12}})
+
+    def test_write_multi_override(self):
+        """ write_multi() goes through write() when the model overrides it """
+        parent = self.env['res.partner'].create({'name': 'Parent', 'is_company': True})
+        child = self.env['res.partner'].create({'name': 'Child', 'parent_id': parent.id})
+        parent.write_multi({parent.id: {'vat': 'BE0477472701'}})
+        # res.partner.write() syncs the commercial fields to the contacts
+        self.assertEqual(child.vat, 'BE0477472701')
+
+    def test_write_multi_batch(self):
+        """ write_multi() updates plain columns in batch """
+        Category = self.env['res.partner.category']
+        categories = Category
+        for index in range(3):
+            categories += Category.create({'name': 'batch-%s' % index})
+        a, b, c = categories
+
+        profiler = sql_profiler.SQLProfiler('write_multi')
+        with sql_profiler.profiling(profiler):
+            categories.write_multi({a.id: {'color': 1}, b.id: {'color': 2}, c.id: {'color': 3}})
+        updates = [query for query, _duration, _rows, _stack in profiler.queries
+                   if query.lstrip().upper().startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        categories.invalidate_cache()
+        self.assertEqual(categories.mapped('color'), [1, 2, 3])
+
+    def test_unlink_bulk(self):
+        """ unlink_bulk() deletes records and their references by chunks """
+        Category = self.env['res.partner.category']
+        categories = Category
+        for index in range(5):
+            categories += Category.create({'name': 'bulk-%s' % index})
+        partner = self.env['res.partner'].create({'name': 'P', 'category_id': [(6, 0, categories.ids)]})
+        self.env['ir.model.data'].create({
+            'module': '__test__', 'name': 'bulk_category',
+            'model': Category._name, 'res_id': categories[0].id,
+        })
+        self.env['ir.attachment'].create({
+            'name': 'bulk', 'res_model': Category._name, 'res_id': categories[1].id,
+        })
+        other = Category.create({'name': 'other'})
+
+        counts = Category.unlink_bulk([('name', 'like', 'bulk-')], chunk_size=2)
+        self.assertEqual(counts[Category._table], 5)
+        self.assertEqual(counts['res_partner_res_partner_category_rel'], 5)
+        self.assertEqual(counts['ir_model_data'], 1)
+        self.assertEqual(counts['ir_attachment'], 1)
+
+        self.assertFalse(categories.exists())
+        self.assertTrue(other.exists())
+        self.assertFalse(partner.category_id)
+        self.assertFalse(self.env['ir.model.data'].search([('name', '=', 'bulk_category')]))
+
 
 class TestInherits(common.TransactionCase):
     """ test the behavior of the orm for models that use _inherits;
@@ -207,6 +352,19 @@ class TestInherits(common.TransactionCase):
 
         self.assertNotIn(foo.partner_id.id, partners_before)
 
+    def test_create_multi(self):
+        """ creating several users creates one new partner for each of them """
+        partners_before = self.partner.search(self.cr, UID, [])
+        users = self.env['res.users'].create([
+            {'name': 'Foo', 'login': 'foo', 'password': 'foo'},
+            {'name': 'Bar', 'login': 'bar', 'password': 'bar'},
+        ])
+        self.assertEqual(users.mapped('name'), ['Foo', 'Bar'])
+        self.assertEqual(len(users.mapped('partner_id')), 2)
+        for user in users:
+            self.assertNotIn(user.partner_id.id, partners_before)
+            self.assertEqual(user.name, user.partner_id.name)
+
     def test_create_with_ancestor(self):
         """ creating a user with a specific 'partner_id' should not create a new partner """
         par_id = self.partner.create(self.cr, UID, {'name': 'Foo'})
@@ -160,5 +160,101 @@ class test_search(common.TransactionCase):
         search_result = list(Users.search(domain)._ids)
         self.assertEqual(search_result, expected_order)
 
+    def test_20_search_keyset(self):
+        Partner = self.env['res.partner']
+        names = ['test_keyset_%s' % c for c in 'ABCDEFG']
+        refs = ['1', None, '2', None, '1', '3', None]
+        for name, ref in zip(names, refs):
+            Partner.create({'name': name, 'ref': ref})
+        domain = [('name', 'like', 'test_keyset_%')]
+
+        for order in ['name asc', 'name desc', 'ref asc, name desc', 'ref desc, id asc',
+                      'active desc, ref asc, id desc', 'id desc']:
+            expected = Partner.search(domain, order=order)
+            pages, token = [], None
+            while True:
+                records, token = Partner.search_keyset(domain, limit=3, order=order, token=token)
+                pages.append(records)
+                if not token:
+                    break
+            self.assertEqual(sum(pages, Partner), expected,
+                             "Keyset pagination with order %r failed." % order)
+            self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+        # tokens are checked against the search
+        records, token = Partner.search_keyset(domain, limit=3, order='name asc')
+        with self.assertRaises(Exception):
+            Partner.search_keyset(domain, limit=3, order='name desc', token=token)
+        with self.assertRaises(Exception):
+            Partner.search_keyset(domain, limit=3, order='name asc', token='garbage')
+
+        # traditional style returns ids
+        ids, token = self.registry('res.partner').search_keyset(self.cr, self.uid, domain, 3, 'name')
+        self.assertEqual(ids, Partner.search(domain, limit=3, order='name').ids)
+        self.assertTrue(token)
+
+    def test_21_search_keyset_many2one(self):
+        """ keyset pagination on a required many2one, whose comodel is
+            ordered on a column with NULL values
+        """
+        Users = self.env['res.users']
+        users = Users
+        for index in range(7):
+            users += Users.create({'name': 'test_keyset_%s' % index, 'login': 'test_keyset_%s' % index})
+        # res.users.partner_id is required, and res.partner is ordered by display_name
+        self.cr.execute("UPDATE res_partner SET display_name=NULL WHERE id IN %s",
+                        [tuple(users[1::2].mapped('partner_id').ids)])
+        self.env.invalidate_all()
+        domain = [('id', 'in', users.ids)]
+
+        for order in ['partner_id', 'partner_id desc', 'partner_id, id desc']:
+            expected = Users.search(domain, order=order)
+            pages, token = [], None
+            while True:
+                records, token = Users.search_keyset(domain, limit=3, order=order, token=token)
+                pages.append(records)
+                if not token:
+                    break
+            self.assertEqual(sum(pages, Users), expected,
+                             "Keyset pagination with order %r failed." % order)
+
+    def test_30_search_count(self):
+        Partner = self.env['res.partner']
+        for index in range(5):
+            Partner.create({'name': 'test_count_%s' % index})
+        domain = [('name', 'like', 'test_count_%')]
+        self.assertEqual(Partner.search_count(domain), 5)
+
+        # capped count
+        self.assertEqual(Partner.search_count(domain, limit=3), 3)
+        self.assertEqual(Partner.search_count(domain, limit=10), 5)
+        self.assertEqual(self.registry('res.partner').search_count(self.cr, self.uid, domain, limit=3), 3)
+
+        # capped counts apply the same filters as search()
+        Partner.search(domain, limit=1).active = False
+        self.assertEqual(Partner.search_count(domain, limit=10), 4)
+        self.assertEqual(Partner.with_context(active_test=False).search_count(domain, limit=10), 5)
+
+        # estimated count: only check that the planner gives a plausible value
+        self.assertGreaterEqual(Partner.search_count(domain, estimate=True), 0)
+        self.assertGreater(Partner.search_count([], estimate=True), 0)
+
+    def test_40_search_iter(self):
+        Partner = self.env['res.partner']
+        for index in range(7):
+            Partner.create({'name': 'test_iter_%s' % index})
+        domain = [('name', 'like', 'test_iter_%')]
+        expected = Partner.search(domain, order='name desc')
+
+        batches = list(Partner.search_iter(domain, order='name desc', batch_size=3))
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+        self.assertEqual(sum(batches, Partner), expected)
+
+        # the records of processed batches are evicted from the cache
+        expected.invalidate_cache()
+        for batch in Partner.search_iter(domain, batch_size=3):
+            batch.mapped('name')
+        self.assertFalse(set(expected.ids) & set(self.env.cache[Partner._fields['name']]))
+
 if __name__ == '__main__':
     unittest.main()
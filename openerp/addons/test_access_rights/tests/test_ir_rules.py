@@ -31,3 +31,46 @@ class TestRules(TransactionCase):
         # but this should
         with self.assertRaises(openerp.exceptions.AccessError):
             self.assertEqual(browse2.val, -1)
+
+    def test_check_cache(self):
+        env = self.env(user=self.browse_ref('base.public_user'))
+        record1 = env['test_access_right.some_obj'].browse(self.id1)
+        record2 = env['test_access_right.some_obj'].browse(self.id2)
+        access = env.all.access_cache(env.cr)
+        key = (record1._name, 'write', env.uid)
+
+        # the records satisfying the rule are remembered
+        record1.check_access_rule('write')
+        self.assertIn(self.id1, access[key][3])
+        with self.assertRaises(openerp.exceptions.AccessError):
+            record2.check_access_rule('write')
+        self.assertNotIn(self.id2, access[key][3])
+
+        # modifying a field used by the rule discards the result
+        self.env['test_access_right.some_obj'].browse(self.id1).write({'val': -2})
+        self.assertNotIn(self.id1, access[key][3])
+        with self.assertRaises(openerp.exceptions.AccessError):
+            record1.check_access_rule('write')
+
+        # a record modified to satisfy the rule is accepted
+        self.env['test_access_right.some_obj'].browse(self.id2).write({'val': 2})
+        record2.check_access_rule('write')
+        self.assertIn(self.id2, access[key][3])
+
+    def test_check_cache_savepoint(self):
+        env = self.env(user=self.browse_ref('base.public_user'))
+        record2 = env['test_access_right.some_obj'].browse(self.id2)
+        access = env.all.access_cache(env.cr)
+        key = (record2._name, 'write', env.uid)
+
+        # a record modified to satisfy the rule in a savepoint that is rolled
+        # back does not satisfy it anymore
+        with self.assertRaises(ValueError):
+            with self.cr.savepoint():
+                self.env['test_access_right.some_obj'].browse(self.id2).write({'val': 2})
+                record2.check_access_rule('write')
+                self.assertIn(self.id2, access[key][3])
+                raise ValueError()
+        self.assertNotIn(key, access)
+        with self.assertRaises(openerp.exceptions.AccessError):
+            record2.check_access_rule('write')
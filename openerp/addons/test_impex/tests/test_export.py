@@ -578,3 +578,21 @@ class test_function(CreatorCase):
         self.assertEqual(
             self.export(42),
             [[u'3']])
+
+class test_export_iter(CreatorCase):
+    model_name = 'export.integer'
+
+    def test_chunks(self):
+        """ export_data_iter() yields the same rows as export_data(), across
+        several chunks of records
+        """
+        size = openerp.models.PREFETCH_MAX + 10
+        records = self.model.browse(self.cr, openerp.SUPERUSER_ID, [])
+        for value in xrange(size):
+            records += self.make(value)
+
+        rows = records.export_data_iter(['value'])
+        self.assertNotIsInstance(rows, list)
+        rows = list(rows)
+        self.assertEqual(len(rows), size)
+        self.assertEqual(rows, records.export_data(['value'])['datas'])
@@ -78,10 +78,14 @@ from openerp import models, fields, api, _
 
 class Category(models.Model):
     _name = 'test_new_api.category'
+    _parent_name = 'parent'
+    _parent_store = 'path'
 
     name = fields.Char(required=True)
     color = fields.Integer('Color Index')
-    parent = fields.Many2one('test_new_api.category')
+    parent = fields.Many2one('test_new_api.category', ondelete='cascade')
+    parent_path = fields.Char(index=True)
+    origin = fields.Many2one('test_new_api.category', ondelete='set null')
     display_name = fields.Char(compute='_compute_display_name', inverse='_inverse_display_name')
     dummy = fields.Char(store=False)
     discussions = fields.Many2many('test_new_api.discussion', 'test_new_api_discussion_category',
@@ -149,6 +153,7 @@ class Message(models.Model):
     size = fields.Integer(compute='_compute_size', search='_search_size')
     double_size = fields.Integer(compute='_compute_double_size')
     discussion_name = fields.Char(related='discussion.name')
+    author_partner = fields.Many2one(related='author.partner_id', store=True)
 
     @api.one
     @api.constrains('author', 'discussion')
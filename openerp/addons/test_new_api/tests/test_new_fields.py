@@ -3,7 +3,7 @@
 #
 from datetime import date, datetime
 
-from openerp.exceptions import AccessError
+from openerp.exceptions import AccessError, UserError
 from openerp.tests import common
 
 
@@ -130,6 +130,52 @@ class TestNewFields(common.TransactionCase):
         })
         check_stored(discussion3)
 
+    def test_11_stored_timings(self):
+        """ test recomputation timings of stored fields """
+        Message = self.env['test_new_api.message']
+        field = Message._fields['name']
+        discussion = self.env.ref('test_new_api.discussion_0')
+        self.assertTrue(discussion.messages)
+
+        duration0, count0 = self.env.recompute_timings.get(field, (0.0, 0))
+        discussion.name = 'Talking about timings...'
+        duration1, count1 = self.env.recompute_timings[field]
+        self.assertGreaterEqual(count1 - count0, len(discussion.messages))
+        self.assertGreaterEqual(duration1, duration0)
+
+    def test_11_stored_related(self):
+        """ test stored related fields computed in SQL """
+        Message = self.env['test_new_api.message']
+        field = Message._fields['author_partner']
+        self.assertTrue(Message._related_sql_fields(field))
+        # non-stored related fields and computed fields are not concerned
+        self.assertFalse(Message._related_sql_fields(Message._fields['discussion_name']))
+        self.assertFalse(Message._related_sql_fields(Message._fields['name']))
+
+        def check_stored(message, partner):
+            self.assertEqual(message.author_partner, partner)
+            self.env.cr.execute('SELECT author_partner FROM test_new_api_message WHERE id=%s',
+                                [message.id])
+            self.assertEqual(self.env.cr.fetchone()[0], partner.id or None)
+
+        user_root = self.env.ref('base.user_root')
+        user_demo = self.env.ref('base.user_demo')
+        message = Message.create({'body': 'Stuff', 'author': user_root.id})
+        check_stored(message, user_root.partner_id)
+
+        # change the author of the message
+        message.author = user_demo
+        check_stored(message, user_demo.partner_id)
+
+        # change the partner of the author
+        partner = self.env['res.partner'].create({'name': 'Mike'})
+        user_demo.partner_id = partner
+        check_stored(message, partner)
+
+        # empty the author
+        message.author = False
+        check_stored(message, self.env['res.partner'])
+
     def test_12_recursive(self):
         """ test recursively dependent fields """
         Category = self.env['test_new_api.category']
@@ -159,6 +205,48 @@ class TestNewFields(common.TransactionCase):
         cath.parent = finn
         self.assertEqual(ewan.display_name, "Gabriel / Finnley / Catherine / Ewan")
 
+    def test_12_parent_path(self):
+        """ test materialized path of a hierarchy """
+        Category = self.env['test_new_api.category']
+        abel = Category.create({'name': 'Abel'})
+        beth = Category.create({'name': 'Bethany', 'parent': abel.id})
+        cath = Category.create({'name': 'Catherine', 'parent': beth.id})
+        dean = Category.create({'name': 'Dean'})
+
+        def path(*records):
+            return ''.join('%d/' % record.id for record in records)
+
+        self.assertEqual(cath.parent_path, path(abel, beth, cath))
+        self.assertEqual(Category.search([('id', 'child_of', abel.id)]), abel + beth + cath)
+        self.assertEqual(Category.search([('id', 'parent_of', cath.id)]), abel + beth + cath)
+        # the hierarchy operators include the given records
+        self.assertEqual(Category.search([('parent', 'child_of', abel.id)]), abel + beth + cath)
+
+        # moving a node updates its subtree only
+        beth.parent = dean
+        self.assertEqual(abel.parent_path, path(abel))
+        self.assertEqual(cath.parent_path, path(dean, beth, cath))
+        self.assertEqual(Category.search([('id', 'child_of', abel.id)]), abel)
+        self.assertEqual(Category.search([('id', 'child_of', dean.id)]), beth + cath + dean)
+
+        beth.parent = False
+        self.assertEqual(cath.parent_path, path(beth, cath))
+
+        with self.assertRaises(UserError):
+            beth.parent = cath
+
+    def test_12_parent_path_other_field(self):
+        """ test hierarchy operators on another field than the materialized path """
+        Category = self.env['test_new_api.category']
+        abel = Category.create({'name': 'Abel'})
+        beth = Category.create({'name': 'Bethany', 'origin': abel.id})
+        cath = Category.create({'name': 'Catherine', 'origin': beth.id, 'parent': abel.id})
+
+        self.assertEqual(Category.search([('origin', 'child_of', abel.id)]), abel + beth + cath)
+        self.assertEqual(Category.search([('origin', 'child_of', beth.id)]), beth + cath)
+        self.assertEqual(Category.search([('origin', 'parent_of', cath.id)]), abel + beth + cath)
+        self.assertEqual(Category.search([('parent', 'child_of', abel.id)]), abel + cath)
+
     def test_12_cascade(self):
         """ test computed field depending on computed field """
         message = self.env.ref('test_new_api.message_0_0')
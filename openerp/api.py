@@ -34,7 +34,7 @@
 __all__ = [
     'Environment',
     'Meta', 'guess', 'noguess',
-    'model', 'multi', 'one',
+    'model', 'model_create_multi', 'model_create_single', 'multi', 'one',
     'cr', 'cr_context',
     'cr_uid', 'cr_uid_context',
     'cr_uid_id', 'cr_uid_id_context',
@@ -47,13 +47,14 @@ import logging
 import operator
 
 from inspect import currentframe, getargspec
-from collections import defaultdict, MutableMapping
+from collections import defaultdict, Mapping, MutableMapping
 from contextlib import contextmanager
 from pprint import pformat
-from weakref import WeakSet
+from array import array
+from weakref import ref, WeakKeyDictionary, WeakValueDictionary
 from werkzeug.local import Local, release_local
 
-from openerp.tools import frozendict, classproperty
+from openerp.tools import config, frozendict, classproperty
 
 _logger = logging.getLogger(__name__)
 
@@ -97,6 +98,11 @@ class Meta(type):
                     except TypeError:
                         pass
 
+                # make overrides of create() that take a single dict accept
+                # a list of dicts as well
+                if key == 'create' and not getattr(value, '_model_create_multi', False):
+                    value = model_create_single(value)
+
                 attrs[key] = value
 
         return type.__new__(meta, name, bases, attrs)
@@ -348,6 +354,74 @@ def model(method):
     return make_wrapper(model, method, old_api, method)
 
 
+def model_create_multi(method):
+    """ Decorate a record-style method that creates records from a list of
+        dictionaries, where ``self`` is a model. Such a method::
+
+            @api.model_create_multi
+            def create(self, vals_list):
+                ...
+
+        may be called with either a single dictionary or a list of
+        dictionaries, in both record and traditional styles, like::
+
+            record = model.create(vals)
+            records = model.create([vals, ...])
+
+            id = model.create(cr, uid, vals, context=context)
+            ids = model.create(cr, uid, [vals, ...], context=context)
+
+        The method itself always receives a list of dictionaries.
+    """
+    split = get_context_split(method)
+
+    def old_api(self, cr, uid, *args, **kwargs):
+        context, args, kwargs = split(args, kwargs)
+        recs = self.browse(cr, uid, [], context)
+        result = new_api(recs, *args, **kwargs)
+        return result.id if isinstance(args[0], Mapping) else result.ids
+
+    def new_api(self, arg, *args, **kwargs):
+        if isinstance(arg, Mapping):
+            return method(self, [arg], *args, **kwargs)
+        return method(self, arg, *args, **kwargs)
+
+    wrapper = make_wrapper(model_create_multi, method, old_api, new_api)
+    wrapper._model_create_multi = True
+    return wrapper
+
+
+def model_create_single(method):
+    """ Decorate a method ``create`` that takes a single dictionary, so that
+        it may also be called with a list of dictionaries. In that case, the
+        records are created one by one, and the method returns a recordset
+        (record style) or a list of ids (traditional style).
+
+        This decorator is applied automatically by the model's metaclass on
+        overrides of ``create`` that are not decorated with
+        :func:`model_create_multi`.
+    """
+    def wrapper(self, *args, **kwargs):
+        # avoid hasattr(self, '_ids') because __getattr__() is overridden
+        new_style = '_ids' in self.__dict__
+        pos = 0 if new_style else 2
+        if len(args) <= pos or not isinstance(args[pos], list):
+            return method(self, *args, **kwargs)
+        args = list(args)
+        result = []
+        for vals in args[pos]:
+            args[pos] = vals
+            result.append(method(self, *args, **kwargs))
+        return sum(result, self.browse()) if new_style else result
+
+    # propagate specific openerp attributes from method to wrapper
+    for attr in WRAPPED_ATTRS + ('_api', '_orig'):
+        if hasattr(method, attr):
+            setattr(wrapper, attr, getattr(method, attr))
+
+    return wrapper
+
+
 def multi(method):
     """ Decorate a record-style method where ``self`` is a recordset. The method
         typically defines an operation on records. Such a method::
@@ -771,19 +845,23 @@ class Environment(object):
 
     def __new__(cls, cr, uid, context):
         assert context is not None
-        args = (cr, uid, context)
+        args = (cr, uid, frozendict(context))
 
         # if env already exists, return it
-        env, envs = None, cls.envs
-        for env in envs:
-            if env.args == args:
-                return env
+        envs = cls.envs
+        env = envs.get(args)
+        if env is not None:
+            return env
 
         # otherwise create environment, and add it in the set
         self = object.__new__(cls)
-        self.cr, self.uid, self.context = self.args = (cr, uid, frozendict(context))
+        self.cr, self.uid, self.context = self.args = args
         self.registry = RegistryManager.get(cr.dbname)
-        self.cache = defaultdict(dict)      # {field: {id: value, ...}, ...}
+        if config.get('columnar_cache'):
+            self.cache = ColumnCache(self)  # {field: {id: value, ...}, ...}
+        else:
+            self.cache = defaultdict(dict)  # {field: {id: value, ...}, ...}
+        self.shared = envs.shared_cache(cr) # {field: {id: value, ...}, ...}
         self.prefetch = defaultdict(set)    # {model_name: set(id), ...}
         self.computed = defaultdict(set)    # {field: set(id), ...}
         self.dirty = defaultdict(set)       # {record: set(field_name), ...}
@@ -877,8 +955,8 @@ class Environment(object):
         """
         if not spec:
             return
-        for env in list(self.all):
-            c = env.cache
+        caches = [env.cache for env in list(self.all)] + self.all.shared.values()
+        for c in caches:
             for field, ids in spec:
                 if ids is None:
                     if field in c:
@@ -895,6 +973,57 @@ class Environment(object):
             env.prefetch.clear()
             env.computed.clear()
             env.dirty.clear()
+        for shared in self.all.shared.values():
+            shared.clear()
+        for access in self.all.access.values():
+            access.clear()
+
+    def invalidate_access(self, records, fnames):
+        """ Discard the results of record rules checks that depend on the
+            fields ``fnames`` of ``records`` (see :meth:`access_cache`).
+        """
+        model_name = records._name
+        for access in self.all.access.values():
+            for (root, mode, uid), (domain, fields, paths, ids) in access.iteritems():
+                if not ids:
+                    continue
+                if paths is None or (model_name, None) in paths or \
+                        any((model_name, fname) in paths for fname in fnames):
+                    ids.clear()
+                elif root == model_name and not fields.isdisjoint(fnames):
+                    ids.difference_update(records._ids)
+
+    def evict(self, records):
+        """ Remove ``records`` from the cache of all environments, in order to
+            release memory when processing large batches of records that are
+            only read. Records with pending modifications or recomputations are
+            kept in cache.
+        """
+        keep = set()
+        for env in self.all:
+            keep.update(rec.id for rec in env.dirty if rec._name == records._name)
+        for field, recs_list in self.all.todo.iteritems():
+            if field.model_name == records._name:
+                keep.update(rid for recs in recs_list for rid in recs._ids)
+        ids = [id for id in records._ids if id not in keep]
+        fields = records._fields.values()
+        for env in list(self.all):
+            cache = env.cache
+            if isinstance(cache, ColumnCache):
+                cache.evict(records._name, ids)
+            else:
+                for field in fields:
+                    if field in cache:
+                        field_cache = cache[field]
+                        for id in ids:
+                            field_cache.pop(id, None)
+            env.prefetch[records._name].difference_update(ids)
+        for shared in self.all.shared.values():
+            for field in fields:
+                if field in shared:
+                    field_cache = shared[field]
+                    for id in ids:
+                        field_cache.pop(id, None)
 
     def clear(self):
         """ Clear all record caches, and discard all fields to recompute.
@@ -955,6 +1084,20 @@ class Environment(object):
         field = min(self.all.todo, key=self.registry.field_sequence)
         return field, self.all.todo[field][0]
 
+    @property
+    def recompute_timings(self):
+        """ Return the time spent recomputing stored fields in the current
+            request, as a dictionary ``{field: (duration, count)}`` where
+            ``count`` is the number of recomputed records.
+        """
+        return dict(self.all.timings)
+
+    def add_recompute_timing(self, field, count, duration):
+        """ Account for the recomputation of ``field`` on ``count`` records. """
+        timing = self.all.timings[field]
+        self.all.timings[field] = (timing[0] + duration, timing[1] + count)
+        _logger.debug("Recomputed %s on %d records in %.3fs", field, count, duration)
+
     def check_cache(self):
         """ Check the cache consistency. """
         # make a full copy of the cache, and invalidate it
@@ -1006,19 +1149,281 @@ class Environment(object):
 class Environments(object):
     """ A common object for all environments in a request. """
     def __init__(self):
-        self.envs = WeakSet()           # weak set of environments
+        self.envs = WeakValueDictionary()   # environments {args: env}
         self.todo = {}                  # recomputations {field: [records]}
         self.mode = False               # flag for draft/onchange
         self.recompute = True
         self.recompute_old = []        # list of old api compute fields to recompute
+        self.timings = defaultdict(lambda: (0.0, 0))    # recomputations {field: (duration, count)}
+        self.shared = WeakKeyDictionary()   # caches shared by cursor {cr: cache}
+        self.access = WeakKeyDictionary()   # record rules checks by cursor {cr: access}
 
     def add(self, env):
         """ Add the environment ``env``. """
-        self.envs.add(env)
+        self.envs[env.args] = env
+
+    def get(self, args):
+        """ Return the environment with the given ``(cr, uid, context)``, or
+            ``None``. The context must be a :class:`frozendict`, which makes
+            the lookup independent of the number of environments.
+        """
+        return self.envs.get(args)
+
+    def shared_cache(self, cr):
+        """ Return the cache shared by the environments with cursor ``cr``. It
+            holds the values of the fields that do not depend on the user and
+            the context (see :attr:`Field.context_free`).
+        """
+        try:
+            return self.shared[cr]
+        except KeyError:
+            cache = self.shared[cr] = defaultdict(dict)
+            return cache
+
+    def access_cache(self, cr):
+        """ Return the results of the record rules checks made with cursor
+            ``cr``, as a dictionary ``{(model_name, mode, uid): entry}``, where
+            ``entry`` is a tuple ``(domain, fields, paths, ids)``: ``ids`` is
+            the set of record ids satisfying the rule ``domain``, and
+            ``fields`` and ``paths`` are the dependencies of ``domain`` (see
+            :meth:`~openerp.models.BaseModel._rule_dependencies`).
+        """
+        try:
+            return self.access[cr]
+        except KeyError:
+            access = self.access[cr] = {}
+            # the checks are no longer valid once the transaction is rolled back
+            cr.rollback_caches.append(access)
+            return access
 
     def __iter__(self):
         """ Iterate over environments. """
-        return iter(self.envs)
+        return iter(self.envs.values())
+
+
+class ColumnCache(defaultdict):
+    """ A record cache ``{field: {id: value}}`` that stores the values of each
+        field in an array-backed :class:`Column`. The record ids of a model
+        are mapped to slots by a single index shared by all the columns of the
+        model, and the values of numeric, boolean and many2one fields are
+        stored in typed arrays. This makes the cache much more compact than
+        dictionaries when many records are prefetched.
+
+        It is enabled by the server option ``--columnar-cache``.
+    """
+    def __init__(self, env):
+        super(ColumnCache, self).__init__()
+        self._env = ref(env)
+        self._slots = {}                # {model_name: Slots}
+
+    def __missing__(self, field):
+        slots = self._slots.get(field.model_name)
+        if slots is None:
+            slots = self._slots[field.model_name] = Slots()
+        column = self[field] = Column.create(field, slots, self._env)
+        return column
+
+    def clear(self):
+        super(ColumnCache, self).clear()
+        self._slots.clear()
+
+    def evict(self, model_name, ids):
+        """ Remove the values of the records ``ids`` of model ``model_name``
+            from all columns, and release their slots.
+        """
+        for field, column in self.iteritems():
+            if field.model_name == model_name:
+                for id in ids:
+                    column.pop(id, None)
+        slots = self._slots.get(model_name)
+        if slots is not None:
+            slots.release(ids)
+
+
+class Slots(object):
+    """ The mapping of the record ids of a model to positions in columns. """
+    __slots__ = ['index', 'ids', 'free']
+
+    def __init__(self):
+        self.index = {}                 # {id: slot}
+        self.ids = []                   # [id], indexed by slot
+        self.free = []                  # released slots
+
+    def add(self, id):
+        """ Return the slot of ``id``, and allocate it if necessary. """
+        slot = self.index.get(id)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+                self.ids[slot] = id
+            else:
+                slot = len(self.ids)
+                self.ids.append(id)
+            self.index[id] = slot
+        return slot
+
+    def release(self, ids):
+        """ Release the slots of ``ids``; the columns must not hold values for
+            them anymore.
+        """
+        for id in ids:
+            slot = self.index.pop(id, None)
+            if slot is not None:
+                self.ids[slot] = None
+                self.free.append(slot)
+
+
+# returned by Column.encode() for values that cannot be stored in the sequence
+NOFIT = object()
+
+
+class Column(MutableMapping):
+    """ The cached values of a field ``{id: value}``, stored in a sequence
+        indexed by the slots of the records. Values that cannot be encoded in
+        the sequence, like special values, are stored in a dictionary.
+    """
+    __slots__ = ['_slots', '_values', '_present', '_others']
+
+    typecode = None                     # array type code, or None for a list
+    default = None                      # value of unused positions
+
+    @staticmethod
+    def create(field, slots, env_ref):
+        """ Return an empty column for the values of ``field``. """
+        if field.type in ('float', 'monetary'):
+            return FloatColumn(slots)
+        if field.type == 'integer':
+            return IntegerColumn(slots)
+        if field.type == 'boolean':
+            return BooleanColumn(slots)
+        if field.type == 'many2one':
+            return Many2oneColumn(slots, field.comodel_name, env_ref)
+        return Column(slots)
+
+    def __init__(self, slots):
+        self._slots = slots
+        self._values = array(self.typecode) if self.typecode else []
+        self._present = bytearray()     # 1 for slots with a value in _values
+        self._others = {}               # {id: value}
+
+    def encode(self, value):
+        return value
+
+    def decode(self, value):
+        return value
+
+    def _slot(self, id):
+        """ Return the slot of ``id`` if ``self`` holds a value for it in its
+            sequence, or ``None``.
+        """
+        slot = self._slots.index.get(id)
+        if slot is not None and slot < len(self._present) and self._present[slot]:
+            return slot
+
+    def __contains__(self, id):
+        return id in self._others or self._slot(id) is not None
+
+    def __getitem__(self, id):
+        if id in self._others:
+            return self._others[id]
+        slot = self._slot(id)
+        if slot is None:
+            raise KeyError(id)
+        return self.decode(self._values[slot])
+
+    def __setitem__(self, id, value):
+        encoded = self.encode(value)
+        if encoded is NOFIT:
+            slot = self._slot(id)
+            if slot is not None:
+                self._present[slot] = 0
+            self._others[id] = value
+            return
+        self._others.pop(id, None)
+        slot = self._slots.add(id)
+        size = len(self._present)
+        if slot >= size:
+            self._values.extend([self.default] * (slot + 1 - size))
+            self._present.extend(bytearray(slot + 1 - size))
+        self._values[slot] = encoded
+        self._present[slot] = 1
+
+    def __delitem__(self, id):
+        if id in self._others:
+            del self._others[id]
+            return
+        slot = self._slot(id)
+        if slot is None:
+            raise KeyError(id)
+        self._present[slot] = 0
+        if not self.typecode:
+            self._values[slot] = None
+
+    def __iter__(self):
+        for id in self._others.keys():
+            yield id
+        ids = self._slots.ids
+        for slot, present in enumerate(self._present):
+            if present:
+                yield ids[slot]
+
+    def __len__(self):
+        return len(self._others) + self._present.count(1)
+
+
+class FloatColumn(Column):
+    __slots__ = []
+    typecode = 'd'
+    default = 0.0
+
+    def encode(self, value):
+        return value if type(value) is float else NOFIT
+
+
+class IntegerColumn(Column):
+    __slots__ = []
+    typecode = 'l'
+    default = 0
+
+    def encode(self, value):
+        return value if type(value) is int else NOFIT
+
+
+class BooleanColumn(Column):
+    __slots__ = []
+    typecode = 'b'
+    default = 0
+
+    def encode(self, value):
+        return int(value) if type(value) is bool else NOFIT
+
+    def decode(self, value):
+        return bool(value)
+
+
+class Many2oneColumn(Column):
+    """ Many2one values are stored as record ids, and decoded as records of
+        the environment of the cache.
+    """
+    __slots__ = ['_comodel_name', '_env']
+    typecode = 'l'
+    default = 0
+
+    def __init__(self, slots, comodel_name, env_ref):
+        super(Many2oneColumn, self).__init__(slots)
+        self._comodel_name = comodel_name
+        self._env = env_ref
+
+    def encode(self, value):
+        ids = getattr(value, '_ids', None)
+        if ids is None or value.env is not self._env() or len(ids) > 1:
+            return NOFIT
+        if ids and type(ids[0]) is not int:
+            return NOFIT
+        return ids[0] if ids else 0
+
+    def decode(self, value):
+        return self._env()[self._comodel_name].browse(value or ())
 
 
 # keep those imports here in order to handle cyclic dependencies correctly
@@ -136,7 +136,10 @@ class Field(object):
             default ``False``)
 
         :param index: whether the field is indexed in database (boolean, by
-            default ``False``)
+            default ``False``); the value ``'trigram'`` creates a trigram
+            index next to the b-tree index, which speeds up ``like`` and
+            ``ilike`` searches on text fields (requires the PostgreSQL
+            extension ``pg_trgm``)
 
         :param default: the default value for the field; this is either a static
             value, or a function taking a recordset and returning a value
@@ -589,6 +592,18 @@ class Field(object):
         """ Return the base field of an inherited field, or ``self``. """
         return self.related_field.base_field if self.inherited else self
 
+    @property
+    def context_free(self):
+        """ Return whether the value of the field in cache depends neither on
+            the user nor on the context, in which case it may be shared by all
+            the environments of a cursor.
+        """
+        return bool(
+            self.store and self.column and self.column._classic_write
+            and not self.inherited and not self.groups and self.type != 'binary'
+            and not getattr(self, 'translate', False)
+        )
+
     #
     # Setup of field triggers
     #
@@ -27,6 +27,7 @@ from zlib import adler32
 import babel.core
 import passlib.utils
 import psycopg2
+import psycopg2.errorcodes
 import json
 import werkzeug.contrib.sessions
 import werkzeug.datastructures
@@ -46,7 +47,7 @@ import openerp
 from openerp.service.server import memory_info
 from openerp.service import security, model as service_model
 from openerp.tools.func import lazy_property
-from openerp.tools import ustr, consteq
+from openerp.tools import ustr, consteq, sql_profiler
 
 _logger = logging.getLogger(__name__)
 rpc_request = logging.getLogger(__name__ + '.rpc.request')
@@ -186,6 +187,8 @@ class WebRequest(object):
         self.endpoint = None
         self.endpoint_arguments = None
         self.auth_method = None
+        # whether the matched route only reads, set as soon as it is matched
+        self.readonly = False
         self._cr = None
 
         # prevents transaction commit, use when you catch an exception during handling
@@ -244,7 +247,8 @@ class WebRequest(object):
         if not self.db:
             return RuntimeError('request not bound to a database')
         if not self._cr:
-            self._cr = self.registry.cursor()
+            readonly = self.readonly or bool(self.endpoint and self.endpoint.routing.get('readonly'))
+            self._cr = self.registry.cursor(readonly=readonly)
         return self._cr
 
     def __enter__(self):
@@ -306,10 +310,20 @@ class WebRequest(object):
             if self._cr:
                 self._cr.rollback()
                 self.env.clear()
-            result = self.endpoint(*a, **kw)
-            if isinstance(result, Response) and result.is_qweb:
-                # Early rendering of lazy responses to benefit from @service_model.check protection
-                result.flatten()
+            try:
+                result = self.endpoint(*a, **kw)
+                if isinstance(result, Response) and result.is_qweb:
+                    # Early rendering of lazy responses to benefit from @service_model.check protection
+                    result.flatten()
+            except Exception, e:
+                if not (self._cr and self._cr.readonly and is_readonly_error(e)):
+                    raise
+                # The read-only route attempted a write: run it again on the
+                # primary database.
+                _logger.info("%s: write in read-only route, retrying on the primary database",
+                             self.httprequest.path)
+                self.registry.readwrite(self._cr)
+                return checked_call(___dbname, *a, **kw)
             return result
 
         if self.db:
@@ -419,6 +433,15 @@ class WebRequest(object):
         hm_expected = hmac.new(str(secret), msg, hashlib.sha1).hexdigest()
         return consteq(hm, hm_expected)
 
+def is_readonly_error(exception):
+    """ Return whether ``exception`` is due to a write in a read-only
+        transaction.
+    """
+    if isinstance(exception, openerp.exceptions.QWebException):
+        exception = exception.qweb.get('cause')
+    return isinstance(exception, psycopg2.Error) and \
+        exception.pgcode == psycopg2.errorcodes.READ_ONLY_SQL_TRANSACTION
+
 def route(route=None, **kw):
     """
     Decorator marking the decorated method as being a handler for
@@ -444,6 +467,13 @@ def route(route=None, **kw):
     :param methods: A sequence of http methods this route applies to. If not
                     specified, all methods are allowed.
     :param cors: The Access-Control-Allow-Origin cors directive value.
+    :param bool readonly: Whether the route may use a read-only cursor on the
+                          read replica of the database, if one is configured.
+                          The replica may lag slightly behind the primary
+                          database. If the route attempts to write, it is run
+                          again on the primary database.
+
+                          Defaults to ``False``.
     :param bool csrf: Whether CSRF protection should be enabled for the route.
 
                       Defaults to ``True``.
@@ -1496,6 +1526,29 @@ class Root(object):
         else:
             return HttpRequest(httprequest)
 
+    def setup_profiler(self, httprequest):
+        """ Return a SQL profiler for the request if it asks for one (with the
+            header ``X-Odoo-SQL-Profile`` or the parameter ``sql_profile``),
+            and may be profiled: the server is in debug mode, or the session
+            is authenticated as an administrator. Otherwise return None.
+        """
+        if openerp.tools.config['sql_profiler'] not in ('request', 'all'):
+            return None
+        if not (httprequest.headers.get('X-Odoo-SQL-Profile') or 'sql_profile' in httprequest.args):
+            return None
+        if not openerp.tools.config['debug_mode']:
+            session = httprequest.session
+            try:
+                session.check_security()
+                registry = openerp.registry(session.db)
+                with openerp.api.Environment.manage(), registry.cursor() as cr:
+                    if not registry['res.users']._is_admin(cr, session.uid, [session.uid]):
+                        return None
+            except Exception:
+                _logger.debug("SQL profile of %s refused", httprequest.path, exc_info=True)
+                return None
+        return sql_profiler.SQLProfiler(httprequest.path)
+
     def get_response(self, httprequest, result, explicit_session):
         if isinstance(result, Response) and result.is_qweb:
             try:
@@ -1553,6 +1606,8 @@ class Root(object):
 
             request = self.get_request(httprequest)
 
+            profiler = self.setup_profiler(httprequest)
+
             def _dispatch_nodb():
                 try:
                     func, arguments = self.nodb_routing_map.bind_to_environ(request.httprequest.environ).match()
@@ -1562,7 +1617,7 @@ class Root(object):
                 result = request.dispatch()
                 return result
 
-            with request:
+            with sql_profiler.profiling(profiler), request:
                 db = request.session.db
                 if db:
                     openerp.modules.registry.RegistryManager.check_registry_signaling(db)
@@ -1589,6 +1644,12 @@ class Root(object):
                     result = _dispatch_nodb()
 
                 response = self.get_response(httprequest, result, explicit_session)
+            if profiler is not None:
+                # the full report is available at /web/sql_profile/<id>
+                try:
+                    response.headers['X-Odoo-SQL-Profile'] = profiler.summary(profiler.save())
+                except Exception:
+                    _logger.exception("Cannot save the SQL profile of %s", httprequest.path)
             return response(environ, start_response)
 
         except werkzeug.exceptions.HTTPException, e:
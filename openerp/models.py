@@ -21,10 +21,12 @@
 
 """
 
+import base64
 import datetime
 import dateutil
 import functools
 import itertools
+import json
 import logging
 import operator
 import pickle
@@ -63,6 +65,7 @@ regex_order = re.compile('^(\s*([a-z0-9:_]+|"[a-z0-9:_]+")(\s+(desc|asc))?\s*(,|
 regex_object_name = re.compile(r'^[a-z0-9_.]+$')
 regex_pg_name = re.compile(r'^[a-z_][a-z0-9_$]*$', re.I)
 onchange_v7 = re.compile(r"^(\w+)\((.*)\)$")
+regex_field_agg = re.compile(r'^(\w+)(?::(\w+)(?:\((\w+)\))?)?$')
 
 AUTOINIT_RECALCULATE_STORED_FIELDS = 1000
 
@@ -213,6 +216,26 @@ def get_pg_type(f, type_override=None):
     return pg_type
 
 
+def index_kind(index_def):
+    """ Return what distinguishes an index from the others on the same column:
+        its operator class and its use of unaccent().
+    """
+    return ('gin_trgm_ops' in index_def, 'unaccent(' in index_def, 'text_pattern_ops' in index_def)
+
+
+# (dbname, message) of the schema warnings already logged
+_schema_warnings = set()
+
+def _schema_warning_once(cr, message):
+    """ Log a schema warning about the database once, instead of once per
+        column and per module update.
+    """
+    key = (cr.dbname, message)
+    if key not in _schema_warnings:
+        _schema_warnings.add(key)
+        _schema.warning("Database '%s': %s", cr.dbname, message)
+
+
 class MetaModel(api.Meta):
     """ Metaclass for the models.
 
@@ -270,6 +293,27 @@ IdType = (int, long, basestring, NewId)
 # maximum number of prefetched records
 PREFETCH_MAX = 1000
 
+# maximum number of records on which a many2one field is read at once, in order
+# to collect the records it references and prefetch them together
+PREFETCH_RELATED_MAX = 20 * PREFETCH_MAX
+
+# minimum number of records with the same columns to insert with COPY when
+# creating records in batch
+COPY_CREATE_MIN = 100
+
+# aggregate functions available in read_group() field specifications
+READ_GROUP_AGGREGATES = {
+    'sum': 'sum(%s)',
+    'avg': 'avg(%s)',
+    'min': 'min(%s)',
+    'max': 'max(%s)',
+    'count': 'count(%s)',
+    'count_distinct': 'count(DISTINCT %s)',
+    'array_agg': 'array_agg(%s)',
+    'bool_and': 'bool_and(%s)',
+    'bool_or': 'bool_or(%s)',
+}
+
 # special columns automatically created by the ORM
 LOG_ACCESS_COLUMNS = ['create_uid', 'create_date', 'write_uid', 'write_date']
 MAGIC_COLUMNS = ['id'] + LOG_ACCESS_COLUMNS
@@ -345,6 +389,11 @@ class BaseModel(object):
     _log_create = False
     _sql_constraints = []
 
+    # indexes on the model's table, given as [(key, definition), ...] where
+    # definition follows "ON <table>" in CREATE INDEX, for instance
+    # "(partner_id, date DESC)" or "(name) WHERE active"
+    _sql_indexes = []
+
     # model dependencies, for models backed up by sql views:
     # {model_name: field_names, ...}
     _depends = {}
@@ -619,6 +668,7 @@ class BaseModel(object):
         depends = {}
         constraints = {}
         sql_constraints = []
+        sql_indexes = {}
 
         for base in reversed(bases):
             inherits.update(base._inherits)
@@ -632,6 +682,10 @@ class BaseModel(object):
 
             sql_constraints += base._sql_constraints
 
+            for index in base._sql_indexes:
+                # index may override an index with the same key
+                sql_indexes[index[0]] = index
+
         # build the actual class of the model
         ModelClass = type(name, tuple(bases), {
             '_name': name,
@@ -643,6 +697,7 @@ class BaseModel(object):
             '_depends': depends,
             '_constraints': constraints.values(),
             '_sql_constraints': sql_constraints,
+            '_sql_indexes': sql_indexes.values(),
             '_original_module': original_module,
         })
 
@@ -950,6 +1005,24 @@ class BaseModel(object):
             self = self.with_context(export_raw_data=True)
         return {'datas': self.__export_rows(fields_to_export)}
 
+    @api.multi
+    def export_data_iter(self, fields_to_export, raw_data=False):
+        """ Export fields for selected objects, like :meth:`~.export_data`,
+            but return an iterator over the exported rows.
+
+            The records are exported by chunks of ``PREFETCH_MAX`` records,
+            and the record cache is cleared before each chunk, so that memory
+            usage does not depend on the number of exported records.
+        """
+        fields_to_export = map(fix_import_export_id_paths, fields_to_export)
+        if raw_data:
+            self = self.with_context(export_raw_data=True)
+        for sub_ids in tools.misc.split_every(PREFETCH_MAX, self._ids):
+            # clearing the cache also resets the prefetching of records
+            self.invalidate_cache()
+            for line in self.browse(sub_ids).__export_rows(fields_to_export):
+                yield line
+
     def import_data(self, cr, uid, fields, datas, mode='init', current_module='', noupdate=False, context=None, filename=None):
         """
         .. deprecated:: 7.0
@@ -1634,17 +1707,82 @@ class BaseModel(object):
         return self.pool['ir.ui.view'].postprocess_and_fields(
             cr, uid, self._name, node, view_id, context=context)
 
-    def search_count(self, cr, user, args, context=None):
-        """ search_count(args) -> int
+    def search_count(self, cr, user, args, context=None, limit=None, estimate=False):
+        """ search_count(args[, limit=None][, estimate=False]) -> int
 
         Returns the number of records in the current model matching :ref:`the
         provided domain <reference/orm/domains>`.
-        """
+
+        Counting all the matching records can be slow on large tables. The
+        count is exact by default, but it may be capped or estimated instead:
+
+        :param int limit: stop counting after ``limit`` records; the result
+            is then at most ``limit``
+        :param bool estimate: return the number of records estimated by the
+            database: the size of the table given by its statistics if the
+            domain filters nothing, or the number of rows expected by the
+            query planner otherwise
+        """
+        if estimate and not self.is_transient():
+            return self._search_count_estimate(cr, user, args, context=context)
+        if limit:
+            if type(self)._search.im_func is not BaseModel._search.im_func:
+                # _search() may restrict the records further: count its result
+                return len(self.search(cr, user, args, limit=limit, order='id', context=context))
+            return self._search_count_limit(cr, user, args, limit, context=context)
         res = self.search(cr, user, args, context=context, count=True)
         if isinstance(res, list):
             return len(res)
         return res
 
+    def _search_count_limit(self, cr, user, args, limit, context=None):
+        """ Return the number of records matching ``args``, counting at most
+            ``limit`` of them (see :meth:`search_count`).
+        """
+        if context is None:
+            context = {}
+        self.check_access_rights(cr, user, 'read')
+
+        # For transient models, restrict access to the current user, as in _search()
+        if self.is_transient() and self._log_access and user != SUPERUSER_ID:
+            args = expression.AND(([('create_uid', '=', user)], args or []))
+
+        query = self._where_calc(cr, user, args, context=context)
+        self._apply_ir_rules(cr, user, query, 'read', context=context)
+        from_clause, where_clause, where_clause_params = query.get_sql()
+
+        # the subquery stops scanning the table after limit rows
+        where_str = where_clause and (" WHERE %s" % where_clause) or ''
+        query_str = 'SELECT count(1) FROM (SELECT 1 FROM ' + from_clause + where_str + ' LIMIT %s) t'
+        cr.execute(query_str, where_clause_params + [limit])
+        return cr.fetchone()[0]
+
+    def _search_count_estimate(self, cr, user, args, context=None):
+        """ Return the estimated number of records matching ``args``, without
+            counting them (see :meth:`search_count`).
+        """
+        if context is None:
+            context = {}
+        self.check_access_rights(cr, user, 'read')
+
+        query = self._where_calc(cr, user, args, context=context)
+        self._apply_ir_rules(cr, user, query, 'read', context=context)
+        from_clause, where_clause, where_clause_params = query.get_sql()
+
+        if not where_clause and len(query.tables) == 1:
+            # reltuples is not set (0 or -1) before the table is analyzed
+            cr.execute("SELECT reltuples FROM pg_class WHERE relname=%s AND relkind='r'",
+                       (self._table,))
+            row = cr.fetchone()
+            if row and row[0] > 0:
+                return int(row[0])
+
+        where_str = where_clause and (" WHERE %s" % where_clause) or ''
+        query_str = 'EXPLAIN SELECT "%s".id FROM ' % self._table + from_clause + where_str
+        cr.execute(query_str, where_clause_params)
+        match = re.search(r'rows=(\d+)', cr.fetchone()[0])
+        return int(match.group(1)) if match else 0
+
     @api.returns('self',
         upgrade=lambda self, value, args, offset=0, limit=None, order=None, count=False: value if count else self.browse(value),
         downgrade=lambda self, value, args, offset=0, limit=None, order=None, count=False: value if count else value.ids)
@@ -1971,6 +2109,67 @@ class BaseModel(object):
             'qualified_field': qualified_field
         }
 
+    @api.model
+    def _read_group_check_groupby(self, fields, groupby_fields):
+        """
+            Helper method to check that the grouped fields are stored fields
+            that appear in ``fields``.
+        """
+        for gb in groupby_fields:
+            assert gb in fields, "Fields in 'groupby' must appear in the list of fields to read (perhaps it's missing in the list view?)"
+            groupby_def = self._columns.get(gb) or (self._inherit_fields.get(gb) and self._inherit_fields.get(gb)[2])
+            assert groupby_def and groupby_def._classic_write, "Fields in 'groupby' must be regular database-persisted fields (no function or related fields), or function fields with store=True"
+            if not (gb in self._fields):
+                # Don't allow arbitrary values, as this would be a SQL injection vector!
+                raise UserError(_('Invalid group_by specification: "%s".\nA group_by specification must be a list of valid fields.') % (gb,))
+
+    @api.model
+    def _read_group_aggregates(self, fields, groupby_fields, query):
+        """
+            Helper method to collect the aggregates requested by ``fields``.
+            A field specification is either:
+
+            * ``field``: the field is aggregated with its ``group_operator``
+              (``sum`` by default) if it is a stored numeric field, and
+              ignored otherwise;
+            * ``field:agg``: the field is aggregated with the function ``agg``;
+            * ``name:agg(field)``: same as above, with the result under the
+              key ``name``, e.g. ``'ids:array_agg(id)'``.
+
+            The available functions are given by ``READ_GROUP_AGGREGATES``.
+
+            :return: list of pairs ``(name, select_term)``
+        """
+        aggregates = []
+        for spec in fields:
+            match = regex_field_agg.match(spec)
+            if not match or (match.group(2) and match.group(2) not in READ_GROUP_AGGREGATES):
+                # not an aggregate, like 'date:month'
+                continue
+            name, func, fname = match.groups()
+            if func:
+                fname = fname or name
+                field = self._fields.get(fname)
+                if not field or not (fname == 'id' or getattr(field.base_field.column, '_classic_write', False)):
+                    raise UserError(_('Invalid aggregate specification "%s": "%s" is not a stored field.') % (spec, fname))
+                if name == 'id' or name in groupby_fields:
+                    raise UserError(_('Invalid aggregate specification "%s": use "name:%s(%s)" to give it another name.') % (spec, func, fname))
+                template = READ_GROUP_AGGREGATES[func]
+            else:
+                field = self._fields.get(name)
+                if name in ('id', 'sequence') or name in groupby_fields or not field \
+                        or field.type not in ('integer', 'float', 'monetary') \
+                        or not getattr(field.base_field.column, '_classic_write', False):
+                    continue
+                fname = name
+                template = (field.group_operator or 'sum') + '(%s)'
+            if fname == 'id':
+                qualified_field = '"%s".id' % self._table
+            else:
+                qualified_field = self._inherits_join_calc(self._table, fname, query)
+            aggregates.append((name, '%s AS "%s"' % (template % qualified_field, name)))
+        return aggregates
+
     def _read_group_prepare_data(self, key, value, groupby_dict, context):
         """
             Helper method to sanitize the data received by read_group. The None
@@ -2030,7 +2229,12 @@ class BaseModel(object):
         :param cr: database cursor
         :param uid: current user id
         :param domain: list specifying search criteria [['field_name', 'operator', 'value'], ...]
-        :param list fields: list of fields present in the list view specified on the object
+        :param list fields: list of fields present in the list view specified on the object;
+                numeric fields are aggregated with their ``group_operator``, and
+                other aggregates may be requested as ``'field:agg'`` or
+                ``'name:agg(field)'``, where ``agg`` is one of ``sum``, ``avg``,
+                ``min``, ``max``, ``count``, ``count_distinct``, ``array_agg``,
+                ``bool_and`` or ``bool_or``
         :param list groupby: list of groupby descriptions by which the records will be grouped.  
                 A groupby description is either a field (then it will be grouped by that field)
                 or a string 'field:groupby_function'.  Right now, the only functions supported
@@ -2072,29 +2276,11 @@ class BaseModel(object):
         groupby_dict = {gb['groupby']: gb for gb in annotated_groupbys}
 
         self._apply_ir_rules(cr, uid, query, 'read', context=context)
-        for gb in groupby_fields:
-            assert gb in fields, "Fields in 'groupby' must appear in the list of fields to read (perhaps it's missing in the list view?)"
-            groupby_def = self._columns.get(gb) or (self._inherit_fields.get(gb) and self._inherit_fields.get(gb)[2])
-            assert groupby_def and groupby_def._classic_write, "Fields in 'groupby' must be regular database-persisted fields (no function or related fields), or function fields with store=True"
-            if not (gb in self._fields):
-                # Don't allow arbitrary values, as this would be a SQL injection vector!
-                raise UserError(_('Invalid group_by specification: "%s".\nA group_by specification must be a list of valid fields.') % (gb,))
+        self._read_group_check_groupby(cr, uid, fields, groupby_fields, context=context)
 
-        aggregated_fields = [
-            f for f in fields
-            if f not in ('id', 'sequence')
-            if f not in groupby_fields
-            if f in self._fields
-            if self._fields[f].type in ('integer', 'float', 'monetary')
-            if getattr(self._fields[f].base_field.column, '_classic_write', False)
-        ]
-
-        field_formatter = lambda f: (
-            self._fields[f].group_operator or 'sum',
-            self._inherits_join_calc(cr, uid, self._table, f, query, context=context),
-            f,
-        )
-        select_terms = ["%s(%s) AS %s" % field_formatter(f) for f in aggregated_fields]
+        aggregates = self._read_group_aggregates(cr, uid, fields, groupby_fields, query, context=context)
+        aggregated_fields = [name for name, term in aggregates]
+        select_terms = [term for name, term in aggregates]
 
         for gb in annotated_groupbys:
             select_terms.append('%s as "%s" ' % (gb['qualified_field'], gb['groupby']))
@@ -2155,6 +2341,125 @@ class BaseModel(object):
                                                        context=context)
         return result
 
+    def read_group_sets(self, cr, uid, domain, fields, groupby_sets, orderby=False, context=None):
+        """
+        Get the results of :meth:`read_group` (with ``lazy=False``) for several
+        lists of groupbys at once.  All the groupings are computed by a single
+        ``GROUP BY GROUPING SETS`` query, so that the domain and the access
+        rules are only evaluated once.  For instance, the groupby sets
+        ``[[], ['a'], ['a', 'b']]`` are equivalent to ``ROLLUP(a, b)``.
+
+        :param domain: list specifying search criteria [['field_name', 'operator', 'value'], ...]
+        :param list fields: list of fields to read, see :meth:`read_group`
+        :param list groupby_sets: list of groupby lists, see :meth:`read_group`
+        :param orderby: optional ``order by`` specification, applied to every grouping
+        :param dict context: context arguments, like lang, time zone
+        :return: list of :meth:`read_group` results, one per groupby list
+        :raise AccessError: * if user has no read rights on the requested object
+                            * if user tries to bypass access rules for read on the requested object
+        """
+        if context is None:
+            context = {}
+        groupby_sets = [[gbs] if isinstance(gbs, basestring) else list(gbs) for gbs in groupby_sets]
+        if cr._cnx.server_version < 90500 or \
+                getattr(type(self).read_group, 'im_func', None) is not BaseModel.read_group.im_func:
+            # GROUPING SETS are only available since PostgreSQL 9.5, and
+            # overrides of read_group() expect a single list of groupbys
+            return [
+                self.read_group(cr, uid, domain, fields, gbs, orderby=orderby, lazy=False, context=context)
+                for gbs in groupby_sets
+            ]
+
+        self.check_access_rights(cr, uid, 'read')
+        query = self._where_calc(cr, uid, domain, context=context)
+        fields = fields or self._columns.keys()
+
+        groupby_list = []
+        for gbs in groupby_sets:
+            groupby_list.extend(gb for gb in gbs if gb not in groupby_list)
+        annotated_groupbys = [
+            self._read_group_process_groupby(cr, uid, gb, query, context=context)
+            for gb in groupby_list
+        ]
+        groupby_fields = [g['field'] for g in annotated_groupbys]
+        order = orderby or ','.join(groupby_list)
+        groupby_dict = {gb['groupby']: gb for gb in annotated_groupbys}
+
+        self._apply_ir_rules(cr, uid, query, 'read', context=context)
+        self._read_group_check_groupby(cr, uid, fields, groupby_fields, context=context)
+
+        aggregates = self._read_group_aggregates(cr, uid, fields, groupby_fields, query, context=context)
+        aggregated_fields = [name for name, term in aggregates]
+        select_terms = [term for name, term in aggregates]
+
+        for gb in annotated_groupbys:
+            select_terms.append('%s as "%s" ' % (gb['qualified_field'], gb['groupby']))
+        if annotated_groupbys:
+            # GROUPING() tells which grouping set a row belongs to: the bit of
+            # each argument is set when it is not part of the grouping set
+            select_terms.append('GROUPING(%s) AS __grouping' % ','.join(
+                gb['qualified_field'] for gb in annotated_groupbys))
+
+        dummy, orderby_terms = self._read_group_prepare(cr, uid, order, aggregated_fields, annotated_groupbys, query, context=context)
+
+        # the grouping sets, and the indexes of groupby_sets for each bitmask
+        grouping_sets = []
+        set_indexes = defaultdict(list)
+        for index, gbs in enumerate(groupby_sets):
+            mask = sum(1 << (len(groupby_list) - 1 - groupby_list.index(gb))
+                       for gb in groupby_list if gb not in gbs)
+            if mask not in set_indexes:
+                # group by the terms used to order many2one fields, too
+                set_order = ','.join(part for part in order.split(',') if part.split()[0] in gbs)
+                groupby_terms, dummy = self._read_group_prepare(
+                    cr, uid, set_order, aggregated_fields,
+                    [groupby_dict[gb] for gb in gbs], query, context=context)
+                grouping_sets.append('(%s)' % ','.join(groupby_terms))
+            set_indexes[mask].append(index)
+
+        from_clause, where_clause, where_clause_params = query.get_sql()
+        prefix_terms = lambda prefix, terms: (prefix + " " + ",".join(terms)) if terms else ''
+        prefix_term = lambda prefix, term: ('%s %s' % (prefix, term)) if term else ''
+
+        query = """
+            SELECT min(%(table)s.id) AS id, count(%(table)s.id) AS __count %(extra_fields)s
+            FROM %(from)s
+            %(where)s
+            GROUP BY GROUPING SETS (%(groupby)s)
+            %(orderby)s
+        """ % {
+            'table': self._table,
+            'extra_fields': prefix_terms(',', select_terms),
+            'from': from_clause,
+            'where': prefix_term('WHERE', where_clause),
+            'groupby': ','.join(grouping_sets),
+            'orderby': prefix_terms('ORDER BY', orderby_terms),
+        }
+        cr.execute(query, where_clause_params)
+        fetched_data = cr.dictfetchall()
+
+        many2onefields = list(set(gb['field'] for gb in annotated_groupbys if gb['type'] == 'many2one'))
+        data_dict = {}
+        if many2onefields:
+            data_ids = list(set(r['id'] for r in fetched_data))
+            data_dict = {d['id']: d for d in self.read(cr, uid, data_ids, many2onefields, context=context)}
+
+        results = [[] for gbs in groupby_sets]
+        for row in fetched_data:
+            mask = row.pop('__grouping', 0)
+            for index in set_indexes[mask]:
+                gbs = groupby_sets[index]
+                data = {k: v for k, v in row.iteritems() if k not in groupby_dict or k in gbs}
+                if not gbs:
+                    results[index].append(data)
+                    continue
+                annotated = [groupby_dict[gb] for gb in gbs]
+                data.update((gb['field'], data_dict[row['id']][gb['field']])
+                            for gb in annotated if gb['type'] == 'many2one')
+                data = {k: self._read_group_prepare_data(k, v, groupby_dict, context) for k, v in data.iteritems()}
+                results[index].append(self._read_group_format_result(data, annotated, gbs, groupby_dict, domain, context))
+        return results
+
     def _inherits_join_add(self, current_model, parent_model_name, query):
         """
         Add missing table SELECT and JOIN clause to ``query`` for reaching the parent table (no duplicates)
@@ -2201,6 +2506,8 @@ class BaseModel(object):
     def _parent_store_compute(self, cr):
         if not self._parent_store:
             return
+        if self._parent_store == 'path':
+            return self._parent_path_compute(cr)
         _logger.info('Computing parent left and right for table %s...', self._table)
         def browse_rec(root, pos=0):
             # TODO: set order
@@ -2225,6 +2532,52 @@ class BaseModel(object):
         self.invalidate_cache(cr, SUPERUSER_ID, ['parent_left', 'parent_right'])
         return True
 
+    def _parent_path_compute(self, cr):
+        """ Recompute the materialized path ``parent_path`` of all records:
+            the ids of a record's ancestors and of the record itself, each
+            followed by a slash, e.g. ``'1/4/12/'``.
+        """
+        _logger.info('Computing parent path for table %s...', self._table)
+        query = """
+            WITH RECURSIVE __parent_path(id, parent_path) AS (
+                SELECT row.id, row.id || '/'
+                FROM "{table}" row WHERE row."{parent}" IS NULL
+              UNION
+                SELECT row.id, comp.parent_path || row.id || '/'
+                FROM "{table}" row, __parent_path comp
+                WHERE row."{parent}" = comp.id
+            )
+            UPDATE "{table}" row SET parent_path = comp.parent_path
+            FROM __parent_path comp WHERE row.id = comp.id
+        """.format(table=self._table, parent=self._parent_name)
+        cr.execute(query)
+        self.invalidate_cache(cr, SUPERUSER_ID, ['parent_path'])
+        return True
+
+    def _parent_path_update(self, cr, ids):
+        """ Update the materialized path of the given records and of their
+            descendants after a change of parent. Only the rows of the moved
+            subtrees are updated.
+        """
+        query = """
+            SELECT node.parent_path, parent.parent_path
+            FROM "{table}" node LEFT JOIN "{table}" parent ON (node."{parent}" = parent.id)
+            WHERE node.id = %s
+        """.format(table=self._table, parent=self._parent_name)
+        for id in ids:
+            cr.execute(query, (id,))
+            old_path, parent_path = cr.fetchone()
+            new_path = '%s%s/' % (parent_path or '', id)
+            if not old_path:
+                cr.execute('UPDATE "%s" SET parent_path=%%s WHERE id=%%s' % self._table, (new_path, id))
+                continue
+            if parent_path and parent_path.startswith(old_path):
+                raise UserError(_('Recursivity Detected.'))
+            # paths only contain digits and slashes, no LIKE wildcard
+            cr.execute('UPDATE "%s" SET parent_path=%%s || substr(parent_path, %%s) WHERE parent_path LIKE %%s' % self._table,
+                       (new_path, len(old_path) + 1, old_path + '%'))
+        self.invalidate_cache(cr, SUPERUSER_ID, ['parent_path'])
+
     def _update_store(self, cr, f, k):
         _logger.info("storing computed values of fields.function '%s'", k)
         ss = self._columns[k]._symbol_set
@@ -2278,13 +2631,14 @@ class BaseModel(object):
         """
         Record the creation of a constraint for this model, to make it possible
         to delete it later when the module is uninstalled. Type can be either
-        'f' or 'u' depending on the constraint being a foreign key or not.
+        'f', 'u' or 'i' depending on the constraint being a foreign key, an
+        index or another constraint.
         """
         if not self._module:
             # no need to save constraints for custom models as they're not part
             # of any module
             return
-        assert type in ('f', 'u')
+        assert type in ('f', 'u', 'i')
         cr.execute("""
             SELECT type, definition FROM ir_model_constraint, ir_module_module
             WHERE ir_model_constraint.module=ir_module_module.id
@@ -2613,10 +2967,16 @@ class BaseModel(object):
                                     self._table, k)
                             # Verify index
                             indexname = '%s_%s_index' % (self._table, k)
-                            cr.execute("SELECT indexname FROM pg_indexes WHERE indexname = %s and tablename = %s", (indexname, self._table))
+                            cr.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s and tablename = %s", (indexname, self._table))
                             res2 = cr.dictfetchall()
+                            index_def = f.select and self._index_definition(cr, k, f)
+                            if res2 and index_def and index_kind(res2[0]['indexdef']) != index_kind(index_def):
+                                # the index type has changed, e.g. from b-tree to trigram
+                                cr.execute('DROP INDEX "%s_%s_index"' % (self._table, k))
+                                _schema.debug("Table '%s': dropped index for column '%s' to change its type", self._table, k)
+                                res2 = []
                             if not res2 and f.select:
-                                cr.execute('CREATE INDEX "%s_%s_index" ON "%s" ("%s")' % (self._table, k, self._table, k))
+                                cr.execute('CREATE INDEX "%s_%s_index" ON "%s" %s' % (self._table, k, self._table, index_def))
                                 cr.commit()
                                 if f._type == 'text':
                                     # FIXME: for fields.text columns we should try creating GIN indexes instead (seems most suitable for an ERP context)
@@ -2630,6 +2990,7 @@ class BaseModel(object):
                                 cr.commit()
                                 msg = "Table '%s': dropping index for column '%s' of type '%s' as it is not required anymore"
                                 _schema.debug(msg, self._table, k, f._type)
+                            self._check_trigram_index(cr, k, f)
 
                             if isinstance(f, fields.many2one) or (isinstance(f, fields.function) and f._type == 'many2one' and f.store):
                                 dest_model = self.pool[f._obj]
@@ -2670,7 +3031,8 @@ class BaseModel(object):
                                 if dest_model._auto and ref != 'ir_actions':
                                     self._m2o_add_foreign_key_checked(k, dest_model, f.ondelete)
                             if f.select:
-                                cr.execute('CREATE INDEX "%s_%s_index" ON "%s" ("%s")' % (self._table, k, self._table, k))
+                                cr.execute('CREATE INDEX "%s_%s_index" ON "%s" %s' % (self._table, k, self._table, self._index_definition(cr, k, f)))
+                                self._check_trigram_index(cr, k, f)
                             if f.required:
                                 try:
                                     cr.commit()
@@ -2693,6 +3055,7 @@ class BaseModel(object):
 
         if self._auto:
             self._add_sql_constraints(cr)
+            self._add_sql_indexes(cr)
 
         if create:
             self._execute_sql(cr)
@@ -2708,10 +3071,20 @@ class BaseModel(object):
                 _logger.info("Storing computed values of %s fields %s",
                              self._name, ', '.join(sorted(fnames)))
                 recs = self.browse(cr, SUPERUSER_ID, [], {'active_test': False})
-                recs = recs.search([])
+                # related fields that only follow plain columns are computed
+                # right away in SQL; the others are recomputed in dependency
+                # order by method recompute()
+                todo = []
+                for field in stored_fields:
+                    path = recs._related_sql_fields(field)
+                    if path and not any(f.compute for f in path):
+                        recs._compute_related_sql(field)
+                    else:
+                        todo.append(field)
+                recs = recs.search([]) if todo else recs
                 if recs:
-                    recs.invalidate_cache(fnames, recs.ids)
-                    map(recs._recompute_todo, stored_fields)
+                    recs.invalidate_cache([f.name for f in todo], recs.ids)
+                    map(recs._recompute_todo, todo)
 
             todo_end.append((1000, func, ()))
 
@@ -2723,6 +3096,49 @@ class BaseModel(object):
         cr.commit()
         del self._foreign_keys
 
+    def _index_definition(self, cr, column_name, column):
+        """ Return the definition of the b-tree index on the given column, as
+            it follows ``ON <table>`` in ``CREATE INDEX``. The materialized
+            path of a ``_parent_store = 'path'`` model gets an index usable for
+            prefix matches.
+        """
+        if column_name == 'parent_path' and self._parent_store == 'path':
+            return '("%s" text_pattern_ops)' % column_name
+        return '("%s")' % column_name
+
+    def _trigram_index_definition(self, cr, column_name):
+        """ Return the definition of the pg_trgm GIN index on the given column,
+            on the expression compared by ``like`` and ``ilike`` domains, or
+            ``None`` if the database does not provide pg_trgm.
+        """
+        if not self.pool.has_trigram:
+            _schema_warning_once(cr, "Trigram indexes are not created, because the "
+                                 "extension pg_trgm is not installed")
+            return None
+        expression = '"%s"::text' % column_name
+        if self.pool.has_unaccent_index:
+            expression = 'unaccent(%s)' % expression
+        elif self.pool.has_unaccent:
+            _schema_warning_once(cr, "Trigram indexes cannot be used by unaccented searches, "
+                                 "because function unaccent() is not immutable")
+        return 'USING gin (%s gin_trgm_ops)' % expression
+
+    def _check_trigram_index(self, cr, column_name, column):
+        """ Create, update or drop the trigram index of the given column, which
+            exists next to its b-tree index when ``select='trigram'``.
+        """
+        indexname = '%s_%s_trgm_index' % (self._table, column_name)
+        cr.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s and tablename = %s", (indexname, self._table))
+        res = cr.fetchone()
+        index_def = column.select == 'trigram' and self._trigram_index_definition(cr, column_name)
+        if res and (not index_def or index_kind(res[0]) != index_kind(index_def)):
+            cr.execute('DROP INDEX "%s"' % indexname)
+            _schema.debug("Table '%s': dropped trigram index for column '%s'", self._table, column_name)
+            res = None
+        if index_def and not res:
+            cr.execute('CREATE INDEX "%s" ON "%s" %s' % (indexname, self._table, index_def))
+            _schema.debug("Table '%s': created trigram index for column '%s'", self._table, column_name)
+
     def init(self, cr):
         """ This method is called after :meth:`~._auto_init`, and may be
             overridden to create or modify a model's database schema.
@@ -2744,11 +3160,13 @@ class BaseModel(object):
         cr.execute("""SELECT c.relname
             FROM pg_class c, pg_attribute a
             WHERE c.relname=%s AND a.attname=%s AND c.oid=a.attrelid
-            """, (self._table, 'parent_left'))
+            """, (self._table, 'parent_path' if self._parent_store == 'path' else 'parent_left'))
         return cr.rowcount
 
 
     def _create_parent_columns(self, cr):
+        if self._parent_store == 'path':
+            return self._create_parent_path_column(cr)
         cr.execute('ALTER TABLE "%s" ADD COLUMN "parent_left" INTEGER' % (self._table,))
         cr.execute('ALTER TABLE "%s" ADD COLUMN "parent_right" INTEGER' % (self._table,))
         if 'parent_left' not in self._columns:
@@ -2773,6 +3191,22 @@ class BaseModel(object):
 
         cr.commit()
 
+    def _create_parent_path_column(self, cr):
+        cr.execute('ALTER TABLE "%s" ADD COLUMN "parent_path" VARCHAR' % (self._table,))
+        if 'parent_path' not in self._columns:
+            _logger.error('create a column parent_path on object %s: fields.char(\'Parent Path\', select=1)',
+                          self._table)
+            _schema.debug("Table '%s': added column '%s' with definition=%s",
+                self._table, 'parent_path', 'VARCHAR')
+        elif not self._columns['parent_path'].select:
+            _logger.error('parent_path column on object %s must be indexed! Add select=1 to the field definition)',
+                          self._table)
+        if self._columns[self._parent_name].ondelete not in ('cascade', 'restrict'):
+            _logger.error("The column %s on object %s must be set as ondelete='cascade' or 'restrict'",
+                          self._parent_name, self._name)
+
+        cr.commit()
+
 
     def _select_column_data(self, cr):
         # attlen is the number of bytes necessary to represent the type when
@@ -2893,6 +3327,67 @@ class BaseModel(object):
                     cr.rollback()
 
 
+    def _add_sql_indexes(self, cr):
+        """
+        Modify this model's database table indexes so they match the ones in
+        _sql_indexes: create the missing ones, recreate the ones whose
+        definition changed, and drop the ones that are no longer declared by
+        the modules loaded so far.
+        """
+        def unify_index_text(txt):
+            return ' '.join(txt.lower().replace(', ', ',').replace(' (', '(').split())
+
+        cr.execute("""SELECT imc.name, imc.definition, imm.name AS module
+                      FROM ir_model_constraint imc
+                      JOIN ir_module_module imm ON (imm.id = imc.module)
+                      JOIN ir_model im ON (im.id = imc.model)
+                      WHERE imc.type = 'i' AND im.model = %s""", (self._name,))
+        # the same index may be recorded by several modules
+        recorded = {(row['name'], row['module']): row for row in cr.dictfetchall()}
+
+        declared = set()
+        for (key, definition) in self._sql_indexes:
+            indexname = '%s_%s' % (self._table, key)
+            declared.add(indexname)
+            cr.execute("SELECT 1 FROM pg_indexes WHERE indexname=%s AND tablename=%s", (indexname, self._table))
+            exists = bool(cr.fetchone())
+            definitions = set(row['definition'] for (name, module), row in recorded.iteritems() if name == indexname)
+            if exists and unify_index_text(definition) in definitions:
+                if (indexname, self._module) not in recorded:
+                    self._save_constraint(cr, indexname, 'i', unify_index_text(definition))
+                    cr.commit()
+                continue
+            if exists:
+                cr.execute('DROP INDEX "%s"' % indexname)
+                _schema.debug("Table '%s': dropped index '%s' to change its definition", self._table, indexname)
+            try:
+                with cr.savepoint():
+                    cr.execute('CREATE INDEX "%s" ON "%s" %s' % (indexname, self._table, definition))
+                _schema.debug("Table '%s': added index '%s' with definition=%s", self._table, indexname, definition)
+            except Exception:
+                _schema.warning("Table '%s': unable to create index '%s' with definition=%s",
+                                self._table, indexname, definition, exc_info=True)
+                continue
+            self._save_constraint(cr, indexname, 'i', unify_index_text(definition))
+            cr.commit()
+
+        # indexes recorded by modules whose declarations are all known
+        loaded = self.pool._init_modules | {self._module}
+        stale = set(key for key in recorded if key[0] not in declared and key[1] in loaded)
+        for indexname, module in stale:
+            cr.execute("""DELETE FROM ir_model_constraint
+                          WHERE name=%s AND type='i'
+                            AND module=(SELECT id FROM ir_module_module WHERE name=%s)""",
+                       (indexname, module))
+        # keep the indexes still recorded by modules not loaded yet
+        for indexname in set(name for name, module in stale):
+            if any(name == indexname for name, module in set(recorded) - stale):
+                continue
+            cr.execute('DROP INDEX IF EXISTS "%s"' % indexname)
+            _schema.debug("Table '%s': dropped index '%s' as it is not declared anymore", self._table, indexname)
+        if stale:
+            cr.commit()
+
     def _execute_sql(self, cr):
         """ Execute the SQL code from the _sql attribute (if any)."""
         if hasattr(self, "_sql"):
@@ -3285,8 +3780,30 @@ class BaseModel(object):
                 else:
                     records &= self._in_cache_without(f)
 
-        # prefetch at most PREFETCH_MAX records
+        # take the values of the records in the cache shared by the
+        # environments of the cursor, and read the other records only
+        if field.context_free and records._shared_cache_allowed():
+            cached = records.browse([id for id in records._ids if id in self.env.shared[field]])
+            if cached:
+                cached._shared_cache_load([f for f in fs if f.context_free])
+                if self._cache.contains(field):
+                    return
+                records -= cached
+
+        # prefetch at most PREFETCH_MAX records; when following a many2one
+        # field, read that field alone on the rest of the prefetch set: the
+        # records referenced by the whole prefetch set are then in the prefetch
+        # set of the comodel, and are read together when accessed
         if len(records) > PREFETCH_MAX:
+            if field.type == 'many2one' and field.store and not self.env.in_onchange:
+                others = records[PREFETCH_MAX:PREFETCH_RELATED_MAX] - self
+                try:
+                    others_result = others.read([field.name], load='_classic_write')
+                except AccessError:
+                    others_result = []
+                for values in others_result:
+                    record = self.browse(values.pop('id'))
+                    record._cache.update(record._convert_to_cache(values, validate=False))
             records = records[:PREFETCH_MAX] | self
 
         # fetch records with read()
@@ -3307,6 +3824,38 @@ class BaseModel(object):
                 e = AccessError("No value found for %s.%s" % (self, field.name))
                 self._cache[field] = FailedValue(e)
 
+    @api.model
+    def _shared_cache_allowed(self):
+        """ Return whether the records of model ``self`` may take their values
+            from the cache shared by the environments of the cursor, i.e., the
+            current user may read all the records of the model.
+        """
+        env = self.env
+        if env.in_draft:
+            return False
+        if env.uid == SUPERUSER_ID:
+            return True
+        if not self.check_access_rights('read', raise_exception=False):
+            return False
+        Rule = self.pool['ir.rule']
+        return not any(Rule._compute_domain(env.cr, env.uid, model_name, 'read')
+                       for model_name in [self._name] + self._inherits.keys())
+
+    @api.multi
+    def _shared_cache_load(self, fields):
+        """ Copy the values of ``fields`` for ``self`` from the cache shared by
+            the environments of the cursor to the cache of ``self.env``.
+        """
+        env = self.env
+        for field in fields:
+            shared_cache, field_cache = env.shared[field], env.cache[field]
+            for id in self._ids:
+                if id in shared_cache and id not in field_cache:
+                    value = shared_cache[id]
+                    if field.type == 'many2one':
+                        value = value.with_env(env)
+                    field_cache[id] = value
+
     @api.multi
     def _read_from_database(self, field_names, inherited_field_names=[]):
         """ Read the given fields of the records in ``self`` from the database,
@@ -3432,6 +3981,14 @@ class BaseModel(object):
             record = self.browse(vals.pop('id'))
             record._cache.update(record._convert_to_cache(vals, validate=False))
 
+        # share the values that depend neither on the user nor on the context
+        # with the other environments of the cursor
+        if ids and not env.in_draft:
+            for field in fields_pre:
+                if field.context_free:
+                    field_cache = env.cache[field]
+                    env.shared[field].update((id, field_cache[id]) for id in ids if id in field_cache)
+
         # store failed values in cache for the records that could not be read
         missing = self - fetched
         if missing:
@@ -3573,6 +4130,22 @@ class BaseModel(object):
             if len(uids) != 1 or uids[0] != uid:
                 raise AccessError(_('For this kind of document, you may only access records you created yourself.\n\n(Document type: %s)') % (self._description,))
         else:
+            domain = self.pool['ir.rule']._compute_domain(cr, uid, self._name, operation)
+            if not domain:
+                return
+            # the records that satisfied the rules in the current transaction
+            # do not need to be checked again, until their dependencies change
+            access = api.Environment(cr, uid, context or {}).all.access_cache(cr)
+            key = (self._name, operation, uid)
+            entry = access.get(key)
+            if entry is None or entry[0] != domain:
+                fields, paths = self._rule_dependencies(cr, domain)
+                entry = access[key] = (domain, fields, paths, set())
+            allowed_ids = entry[3]
+            ids = [id for id in ids if id not in allowed_ids]
+            if not ids:
+                return
+
             where_clause, where_params, tables = self.pool.get('ir.rule').domain_get(cr, uid, self._name, operation, context=context)
             if where_clause:
                 where_clause = ' and ' + ' and '.join(where_clause)
@@ -3582,6 +4155,52 @@ class BaseModel(object):
                                [sub_ids] + where_params)
                     returned_ids = [x['id'] for x in cr.dictfetchall()]
                     self._check_record_rules_result_count(cr, uid, sub_ids, returned_ids, operation, context=context)
+                    allowed_ids.update(returned_ids)
+
+    def _rule_dependencies(self, cr, domain):
+        """ Return what the result of the record rule ``domain`` on ``self``
+            depends on, as a pair ``(fields, paths)``: ``fields`` is the set of
+            the names of the fields of ``self`` in ``domain``, and ``paths`` is
+            the set of pairs ``(model_name, field_name)`` reached by following
+            relational fields, where ``field_name`` is ``None`` when any field
+            of the model matters. ``paths`` is ``None`` when the dependencies
+            cannot be determined.
+        """
+        fields, paths = set(), set()
+
+        def depends(model, name, root):
+            if root:
+                fields.add(name)
+            else:
+                paths.add((model._name, name))
+
+        for leaf in domain:
+            if not expression.is_leaf(leaf) or tuple(leaf) in (expression.TRUE_LEAF, expression.FALSE_LEAF):
+                continue
+            left, operator = leaf[0], leaf[1]
+            model, names, root = self, left.split('.'), True
+            while names:
+                field = model._fields.get(names[0])
+                if field is None:
+                    return fields, None
+                if field.inherited:
+                    # follow the link to the parent model, with the same name
+                    parent = self.pool[field.related_field.model_name]
+                    depends(model, model._inherits[parent._name], root)
+                    model, root = parent, False
+                    continue
+                if not field.store:
+                    return fields, None
+                depends(model, field.name, root)
+                if field.type in ('one2many', 'many2many'):
+                    paths.add((field.comodel_name, None))
+                if operator in ('child_of', 'parent_of') and len(names) == 1:
+                    comodel = self.pool[field.comodel_name] if field.relational else model
+                    paths.add((comodel._name, comodel._parent_name))
+                if field.relational:
+                    model, root = self.pool[field.comodel_name], False
+                names = names[1:]
+        return fields, paths
 
     def create_workflow(self, cr, uid, ids, context=None):
         """Create a workflow instance for each given record IDs."""
@@ -3702,6 +4321,20 @@ class BaseModel(object):
         # changes made in the database, like cascading delete!
         recs.invalidate_cache()
 
+        self._unlink_store_set_values(cr, uid, ids, result_store, context)
+
+        # recompute new-style fields
+        recs.recompute()
+
+        # auditing: deletions are infrequent and leave no trace in the database
+        _unlink.info('User #%s deleted %s records with IDs: %r', uid, self._name, ids)
+
+        return True
+
+    def _unlink_store_set_values(self, cr, uid, ids, result_store, context=None):
+        """ Recompute the old-style stored function fields given by
+            ``result_store`` after the deletion of the records ``ids``.
+        """
         for order, obj_name, store_ids, fields in result_store:
             if obj_name == self._name:
                 effective_store_ids = set(store_ids) - set(ids)
@@ -3714,13 +4347,117 @@ class BaseModel(object):
                 if rids:
                     obj._store_set_values(cr, uid, rids, fields, context)
 
-        # recompute new-style fields
-        recs.recompute()
+    def unlink_bulk(self, cr, uid, domain, chunk_size=10000, commit=False, context=None):
+        """ unlink_bulk(domain[, chunk_size=10000][, commit=False]) -> dict
+
+        Deletes the records matching ``domain``, including inactive ones, by
+        chunks of consecutive ids. This is meant for purging large amounts of
+        records, like expired transient records or logs: the method
+        :meth:`unlink` and its overrides are not called, and the records
+        hidden by the access rules of the user are skipped instead of raising
+        an error.
+
+        The references to the records (ir.model.data, ir.values,
+        ir.attachment, ir.property, workflow instances) are removed with
+        set-based queries, and so are the rows of the tables referencing them
+        with ``ON DELETE CASCADE`` or ``SET NULL`` foreign keys.
+
+        :param int chunk_size: the maximum number of records deleted at once
+        :param bool commit: whether to commit the transaction after each
+            chunk, so that an interrupted purge keeps its progress
+        :returns: the number of deleted (or updated) rows, as a dictionary
+            ``{table: count}``
+        :raise AccessError: if user has no unlink rights on the model
+        :raise UserError: if a record is a default property
+        """
+        self.check_access_rights(cr, uid, 'unlink')
 
-        # auditing: deletions are infrequent and leave no trace in the database
-        _unlink.info('User #%s deleted %s records with IDs: %r', uid, self._name, ids)
+        # for transient models, restrict to the records of the user, as in _search()
+        if self.is_transient() and self._log_access and uid != SUPERUSER_ID:
+            domain = expression.AND(([('create_uid', '=', uid)], domain or []))
 
-        return True
+        query = self._where_calc(cr, uid, domain, active_test=False, context=context)
+        self._apply_ir_rules(cr, uid, query, 'unlink', context=context)
+        from_clause, where_clause, where_params = query.get_sql()
+        select = 'SELECT "%s".id FROM %s WHERE %s "%s".id > %%s ORDER BY "%s".id LIMIT %%s' % (
+            self._table, from_clause, where_clause and ('%s AND' % where_clause) or '',
+            self._table, self._table,
+        )
+
+        # the foreign keys to the table, except the ones to itself
+        cr.execute(""" SELECT cl.relname, att.attname, con.confdeltype
+                        FROM pg_constraint con
+                        JOIN pg_class cl ON cl.oid = con.conrelid
+                        JOIN pg_attribute att ON att.attrelid = con.conrelid
+                                             AND att.attnum = con.conkey[1]
+                        WHERE con.contype = 'f' AND con.confdeltype IN ('c', 'n')
+                          AND array_length(con.conkey, 1) = 1
+                          AND con.confrelid = %s::regclass AND con.conrelid != con.confrelid
+                   """, (self._table,))
+        foreign_keys = cr.fetchall()
+
+        counts = defaultdict(int)
+
+        def execute(table, query, params):
+            cr.execute(query, params)
+            counts[table] += cr.rowcount
+
+        last_id = 0
+        while True:
+            cr.execute(select, where_params + [last_id, chunk_size])
+            ids = [row[0] for row in cr.fetchall()]
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            result_store = self._store_get_values(cr, uid, ids, self._fields.keys(), context)
+            recs = self.browse(cr, uid, ids, context)
+            recs.modified(self._fields)
+
+            refs = ['%s,%s' % (self._name, id) for id in ids]
+            cr.execute("SELECT 1 FROM ir_property WHERE res_id IS NULL AND value_reference = ANY(%s) LIMIT 1",
+                       (refs,))
+            if cr.fetchone():
+                raise UserError(_('Unable to delete this document because it is used as a default property'))
+            execute('ir_property', "DELETE FROM ir_property WHERE res_id = ANY(%s)", (refs,))
+            execute('ir_model_data', """DELETE FROM ir_model_data d USING unnest(%s) AS r(id)
+                                         WHERE d.model = %s AND d.res_id = r.id""", (ids, self._name))
+            execute('ir_values', """DELETE FROM ir_values v USING unnest(%s) AS r(id)
+                                     WHERE v.model = %s AND v.res_id = r.id""", (ids, self._name))
+            execute('ir_values', "DELETE FROM ir_values WHERE value = ANY(%s)", (refs,))
+            execute('wkf_instance', """DELETE FROM wkf_instance w USING unnest(%s) AS r(id)
+                                        WHERE w.res_type = %s AND w.res_id = r.id""", (ids, self._name))
+            cr.execute("""DELETE FROM ir_attachment a USING unnest(%s) AS r(id)
+                          WHERE a.res_model = %s AND a.res_id = r.id
+                          RETURNING a.store_fname""", (ids, self._name))
+            fnames = set(row[0] for row in cr.fetchall() if row[0])
+            counts['ir_attachment'] += cr.rowcount
+
+            for table, column, kind in foreign_keys:
+                if kind == 'c':
+                    query = 'DELETE FROM "{0}" t USING unnest(%s) AS r(id) WHERE t."{1}" = r.id'
+                else:
+                    query = 'UPDATE "{0}" t SET "{1}" = NULL FROM unnest(%s) AS r(id) WHERE t."{1}" = r.id'
+                execute(table, query.format(table, column), (ids,))
+            execute(self._table, 'DELETE FROM "%s" WHERE id = ANY(%%s)' % self._table, (ids,))
+
+            ir_attachment = self.pool['ir.attachment']
+            for fname in fnames:
+                ir_attachment._file_delete(cr, SUPERUSER_ID, fname)
+
+            recs.invalidate_cache()
+            self._unlink_store_set_values(cr, uid, ids, result_store, context)
+            recs.recompute()
+            if commit:
+                cr.commit()
+
+        if counts['ir_model_data']:
+            self.pool['ir.model.data'].clear_caches()
+        if counts['ir_values']:
+            self.pool['ir.values'].clear_caches()
+
+        _unlink.info('User #%s deleted %d %s records in bulk', uid, counts[self._table], self._name)
+        return dict((table, count) for table, count in counts.iteritems() if count)
 
     #
     # TODO: Validate
@@ -3812,7 +4549,7 @@ class BaseModel(object):
         self.check_access_rights('write')
 
         # No user-driven update of these columns
-        for field in itertools.chain(MAGIC_COLUMNS, ('parent_left', 'parent_right')):
+        for field in itertools.chain(MAGIC_COLUMNS, ('parent_left', 'parent_right', 'parent_path')):
             vals.pop(field, None)
 
         # split up fields into old-style and pure new-style ones
@@ -3843,6 +4580,133 @@ class BaseModel(object):
 
         return True
 
+    @api.model
+    def write_multi(self, vals_by_id):
+        """ write_multi(vals_by_id)
+
+        Updates several records of the current model, each one with its own
+        values. This is equivalent to::
+
+            for id, vals in vals_by_id.iteritems():
+                self.browse(id).write(vals)
+
+        The values of plain stored columns are written with one
+        ``UPDATE ... FROM (VALUES ...)`` statement per set of columns, and
+        dependent fields are recomputed once for the whole batch; the other
+        fields are written with :meth:`~.write`.
+
+        The overrides of :meth:`~.write` are taken into account: a class that
+        overrides it declares the fields its override reacts to by defining
+        :meth:`~._write_multi_fields` as well, and the records whose values
+        contain such fields are written with :meth:`~.write`. If a class
+        overrides :meth:`~.write` without declaring them, all the records are
+        written with :meth:`~.write`.
+
+        :param dict vals_by_id: the values to write, given as a dictionary
+            ``{id: vals}``, where ``vals`` is a dictionary like in
+            :meth:`~.write`
+        :raise AccessError: * if user has no write rights on the requested object
+                            * if user tries to bypass access rules for write on the requested object
+        :raise MissingError: if one of the records has been deleted
+        """
+        if not vals_by_id:
+            return True
+
+        hooks = self._write_multi_hooks()
+        if hooks is None:
+            # business logic in write(): go through it for every record
+            for id, vals in vals_by_id.iteritems():
+                self.browse(id).write(vals)
+            return True
+
+        # go through write() for the records whose values the overrides of
+        # write() react to
+        fnames = list(set(key for vals in vals_by_id.itervalues() for key in vals))
+        reacting = set()
+        for hook in hooks:
+            reacting.update(hook(self, fnames))
+        if reacting:
+            vals_by_id = dict(vals_by_id)
+            for id, vals in vals_by_id.items():
+                if not reacting.isdisjoint(vals):
+                    self.browse(id).write(vals)
+                    del vals_by_id[id]
+            if not vals_by_id:
+                return True
+
+        records = self.browse(list(vals_by_id))
+        records._check_concurrency(records._ids)
+        self.check_access_rights('write')
+
+        # split up values into the ones written in batch and the other ones
+        batch_vals, other_vals, unknown = {}, {}, set()
+        for id, vals in vals_by_id.iteritems():
+            bvals, ovals = {}, {}
+            for key, val in vals.iteritems():
+                if key in MAGIC_COLUMNS or key in ('parent_left', 'parent_right', 'parent_path'):
+                    continue
+                elif key not in self._fields:
+                    unknown.add(key)
+                elif self._write_multi_supported(key):
+                    bvals[key] = val
+                else:
+                    ovals[key] = val
+            if bvals:
+                batch_vals[id] = bvals
+            if ovals:
+                other_vals[id] = ovals
+
+        if unknown:
+            _logger.warning("%s.write_multi() with unknown fields: %s", self._name, ', '.join(sorted(unknown)))
+
+        if batch_vals:
+            self._write_multi(batch_vals)
+
+        for id, vals in other_vals.iteritems():
+            self.browse(id).write(vals)
+
+        return True
+
+    @classmethod
+    def _write_multi_hooks(cls):
+        """ Return the methods :meth:`~._write_multi_fields` of the classes
+            that override :meth:`~.write`, or ``None`` if one of those classes
+            does not define it.
+        """
+        hooks = []
+        for klass in cls.__mro__:
+            if klass is BaseModel:
+                break
+            if 'write' in vars(klass):
+                if '_write_multi_fields' not in vars(klass):
+                    return None
+                hooks.append(vars(klass)['_write_multi_fields'])
+        return hooks
+
+    @api.model
+    def _write_multi_fields(self, fnames):
+        """ Return the names among ``fnames`` of the fields that the override
+            of :meth:`~.write` in the same class reacts to. A class overriding
+            :meth:`~.write` defines this method in order to let
+            :meth:`~.write_multi` write the other fields in batch.
+        """
+        return []
+
+    @api.model
+    def _write_multi_supported(self, name):
+        """ Return whether the field ``name`` may be written by
+            :meth:`~._write_multi`, i.e., whether it is a plain column of the
+            model's table, without any side effect when written.
+        """
+        column = self._columns.get(name)
+        return bool(
+            column is not None and column._classic_write
+            and not hasattr(column, '_fnct_inv') and not column.translate
+            and not column.write and not self._fields[name].inverse
+            and not (self._parent_store and name == self._parent_name)
+            and get_pg_type(column)
+        )
+
     def _write(self, cr, user, ids, vals, context=None):
         # low-level implementation of write()
         if not context:
@@ -4019,7 +4883,10 @@ class BaseModel(object):
         # We can't defer parent_store computation because the stored function
         # fields that are computer may refer (directly or indirectly) to
         # parent_left/right (via a child_of domain)
-        if parents_changed:
+        if parents_changed and self._parent_store == 'path':
+            # only the rows of the moved subtrees are updated
+            self._parent_path_update(cr, parents_changed)
+        elif parents_changed:
             if self.pool._init:
                 self.pool._init_parent[self._name] = True
             else:
@@ -4098,229 +4965,468 @@ class BaseModel(object):
         self.step_workflow(cr, user, ids, context=context)
         return True
 
+    def _write_multi(self, cr, user, vals_by_id, context=None):
+        # low-level implementation of write_multi(), for the fields supported
+        # by _write_multi_supported() only
+        if not context:
+            context = {}
+
+        ids = list(vals_by_id)
+        names = set(name for vals in vals_by_id.itervalues() for name in vals)
+        self.check_field_access_rights(cr, user, 'write', list(names))
+        for vals in vals_by_id.itervalues():
+            for name, value in vals.iteritems():
+                if hasattr(self._columns[name], 'selection') and value:
+                    self._check_selection_field_value(cr, user, name, value, context=context)
+
+        result = self._store_get_values(cr, user, ids, list(names), context) or []
+
+        # for recomputing new-style fields
+        recs = self.browse(cr, user, ids, context)
+        modified_fields = list(names)
+        if self._log_access:
+            modified_fields += ['write_date', 'write_uid']
+        recs.modified(modified_fields)
+
+        self.check_access_rule(cr, user, ids, 'write', context=context)
+        count = self._update_rows(cr, vals_by_id, log_uid=(user if self._log_access else None))
+        if count != len(ids):
+            raise MissingError(_('One of the records you are trying to modify has already been deleted (Document type: %s).') % self._description)
+
+        # invalidate and mark new-style fields to recompute
+        recs.modified(modified_fields)
+
+        # check Python constraints
+        recs._validate_fields(names)
+
+        result += self._store_get_values(cr, user, ids, list(names), context)
+
+        done = {}
+        recs.env.recompute_old.extend(result)
+        while recs.env.recompute_old:
+            sorted_recompute_old = sorted(recs.env.recompute_old)
+            recs.env.clear_recompute_old()
+            for __, model_name, ids_to_update, fields_to_recompute in \
+                    sorted_recompute_old:
+                key = (model_name, tuple(fields_to_recompute))
+                done.setdefault(key, {})
+                # avoid to do several times the same computation
+                todo = []
+                for id in ids_to_update:
+                    if id not in done[key]:
+                        done[key][id] = True
+                        todo.append(id)
+                self.pool[model_name]._store_set_values(
+                    cr, user, todo, fields_to_recompute, context)
+
+        # recompute new-style fields
+        if recs.env.recompute and context.get('recompute', True):
+            recs.recompute()
+
+        self.step_workflow(cr, user, ids, context=context)
+        return True
+
+    def _update_rows(self, cr, vals_by_id, log_uid=None):
+        """ Update the table of ``self`` with the column values given by
+            ``vals_by_id`` (a dictionary ``{id: {column_name: value}}``), and
+            return the number of updated rows. Values are converted by their
+            column. The rows with the same set of columns are updated by a
+            single ``UPDATE ... FROM (VALUES ...)`` statement. If ``log_uid``
+            is given, the columns ``write_uid`` and ``write_date`` are updated
+            as well.
+        """
+        groups = defaultdict(list)
+        for id, vals in vals_by_id.iteritems():
+            if vals:
+                groups[tuple(sorted(vals))].append(id)
+
+        count = 0
+        for names, group_ids in groups.iteritems():
+            columns = [self._columns[name] for name in names]
+            # the values are cast explicitly, because PostgreSQL infers the
+            # type of a column in VALUES from the values themselves
+            assignments = []
+            for name, column in itertools.izip(names, columns):
+                pg_type = get_pg_type(column)
+                cast = '::%s' % pg_type[0] if pg_type else ''
+                assignments.append('"%s"=v."%s"%s' % (name, name, cast))
+            params = []
+            if log_uid is not None:
+                assignments.append('"write_uid"=%s')
+                assignments.append(""""write_date"=(now() at time zone 'UTC')""")
+                params.append(log_uid)
+
+            query_head = 'UPDATE "%s" SET %s FROM (VALUES ' % (self._table, ','.join(assignments))
+            query_tail = ') AS v(id, %s) WHERE "%s".id=v.id' % (
+                ','.join('"%s"' % name for name in names), self._table,
+            )
+            row = '(%s)' % ','.join(['%s'] * (len(names) + 1))
+            for sub_ids in cr.split_for_in_conditions(group_ids):
+                values = []
+                for id in sub_ids:
+                    vals = vals_by_id[id]
+                    values.append(id)
+                    values.extend(column._symbol_set[1](vals[name])
+                                  for name, column in itertools.izip(names, columns))
+                cr.execute(query_head + ','.join([row] * len(sub_ids)) + query_tail, params + values)
+                count += cr.rowcount
+
+        return count
+
     #
     # TODO: Should set perm to user.xxx
     #
-    @api.model
+    @api.model_create_multi
     @api.returns('self', lambda value: value.id)
-    def create(self, vals):
-        """ create(vals) -> record
+    def create(self, vals_list):
+        """ create(vals_list) -> records
+
+        Creates new records for the model.
 
-        Creates a new record for the model.
+        The new records are initialized using the values from the list of
+        dicts ``vals_list``, and if necessary those from :meth:`~.default_get`.
 
-        The new record is initialized using the values from ``vals`` and
-        if necessary those from :meth:`~.default_get`.
+        :param list vals_list:
+            values for the model's fields, as a list of dictionaries::
 
-        :param dict vals:
-            values for the model's fields, as a dictionary::
+                [{'field_name': field_value, ...}, ...]
 
-                {'field_name': field_value, ...}
+            For backward compatibility, ``vals_list`` may be a dictionary.
+            It is treated as a singleton list ``[vals]``, and a single record
+            is returned.
 
             see :meth:`~.write` for details
-        :return: new record created
+        :return: the created records
         :raise AccessError: * if user has no create rights on the requested object
                             * if user tries to bypass access rules for create on the requested object
         :raise ValidateError: if user tries to enter invalid value for a field that is not in selection
         :raise UserError: if a loop would be created in a hierarchy of objects a result of the operation (such as setting an object as its own parent)
         """
-        self.check_access_rights('create')
+        if not vals_list:
+            return self.browse()
 
-        # add missing defaults, and drop fields that may not be set by user
-        vals = self._add_missing_default_values(vals)
-        for field in itertools.chain(MAGIC_COLUMNS, ('parent_left', 'parent_right')):
-            vals.pop(field, None)
+        self.check_access_rights('create')
 
         # split up fields into old-style and pure new-style ones
-        old_vals, new_vals, unknown = {}, {}, []
-        for key, val in vals.iteritems():
-            field = self._fields.get(key)
-            if field:
-                if field.column or field.inherited:
-                    old_vals[key] = val
-                if field.inverse and not field.inherited:
-                    new_vals[key] = val
-            else:
-                unknown.append(key)
+        old_vals_list, new_vals_list, unknown = [], [], set()
+        for vals in self._add_missing_default_values_multi(vals_list):
+            # drop fields that may not be set by user
+            for field in itertools.chain(MAGIC_COLUMNS, ('parent_left', 'parent_right', 'parent_path')):
+                vals.pop(field, None)
+
+            old_vals, new_vals = {}, {}
+            for key, val in vals.iteritems():
+                field = self._fields.get(key)
+                if field:
+                    if field.column or field.inherited:
+                        old_vals[key] = val
+                    if field.inverse and not field.inherited:
+                        new_vals[key] = val
+                else:
+                    unknown.add(key)
+            old_vals_list.append(old_vals)
+            new_vals_list.append(new_vals)
 
         if unknown:
             _logger.warning("%s.create() includes unknown fields: %s", self._name, ', '.join(sorted(unknown)))
 
-        # create record with old-style fields
-        record = self.browse(self._create(old_vals))
+        # create records with old-style fields
+        records = self.browse(self._create(old_vals_list))
 
         # put the values of pure new-style fields into cache, and inverse them
-        record._cache.update(record._convert_to_cache(new_vals))
-        for key in new_vals:
-            self._fields[key].determine_inverse(record)
+        inverse_ids = defaultdict(list)
+        for record, new_vals in itertools.izip(records, new_vals_list):
+            record._cache.update(record._convert_to_cache(new_vals))
+            for key in new_vals:
+                inverse_ids[key].append(record.id)
+        for key, ids in inverse_ids.iteritems():
+            self._fields[key].determine_inverse(self.browse(ids))
 
-        return record
+        return records
+
+    @api.model
+    def _add_missing_default_values_multi(self, vals_list):
+        """ Return a list of dictionaries made of ``vals_list`` completed with
+            their missing default values. Defaults are determined once for
+            each distinct set of given fields; defaults given by a function
+            are evaluated again for every record, since they may differ from
+            one record to another (sequence numbers, for instance).
+        """
+        def has_dynamic_default(name):
+            field, model = self._fields.get(name), self
+            while field and field.inherited:
+                field = field.related_field
+                model = self.env[field.model_name]
+            return bool(field) and callable(model._defaults.get(field.name))
+
+        result = []
+        cache = {}                      # {keys: (defaults, dynamic_names)}
+        for vals in vals_list:
+            keys = frozenset(vals)
+            if keys in cache:
+                defaults, dynamic = cache[keys]
+                defaults = dict(defaults)
+                if dynamic:
+                    static = keys.union(defaults).difference(dynamic)
+                    values = self._add_missing_default_values(dict.fromkeys(static))
+                    defaults.update((name, values[name]) for name in dynamic if name in values)
+            else:
+                defaults = self._add_missing_default_values(dict.fromkeys(keys))
+                for key in keys:
+                    defaults.pop(key)
+                dynamic = [name for name in defaults if has_dynamic_default(name)]
+                cache[keys] = (dict(defaults), dynamic)
+            defaults.update(vals)
+            result.append(defaults)
+        return result
+
+    def _create_copy(self, cr, columns, data_list):
+        """ Insert the rows prepared by :meth:`_create` in ``data_list`` with
+            COPY, and set their ids. The ids are allocated from the sequence
+            beforehand, and the SQL expressions of the rows, like the log
+            access dates, are evaluated once. Return False if the rows cannot
+            be copied, i.e., if they have different SQL expressions.
+        """
+        exprs = {}
+        for data in data_list:
+            for update in data['updates']:
+                if update[0] == 'id':
+                    continue
+                if len(update) > 2:
+                    if update[1] != '%s':
+                        return False
+                elif exprs.setdefault(update[0], update[1]) != update[1]:
+                    return False
+
+        values = {}
+        if exprs:
+            names = list(exprs)
+            cr.execute("SELECT %s" % ", ".join(exprs[name] for name in names))
+            values = dict(zip(names, cr.fetchone()))
+
+        cr.execute("SELECT nextval(%s) FROM generate_series(1, %s)",
+                   (self._sequence, len(data_list)))
+        for data, (id_new,) in itertools.izip(data_list, cr.fetchall()):
+            data['id'] = id_new
+
+        def row(data):
+            for update in data['updates']:
+                if update[0] == 'id':
+                    yield data['id']
+                elif len(update) > 2:
+                    yield update[2]
+                else:
+                    yield values[update[0]]
+
+        cr.copy_from_rows(self._table, columns, (tuple(row(data)) for data in data_list))
+        return True
 
-    def _create(self, cr, user, vals, context=None):
-        # low-level implementation of create()
+    def _create(self, cr, user, vals_list, context=None):
+        # low-level implementation of create(): insert the records given by
+        # vals_list with a multi-row INSERT, and return their ids
         if not context:
             context = {}
 
         if self.is_transient():
             self._transient_vacuum(cr, user)
 
-        tocreate = {}
-        for v in self._inherits:
-            if self._inherits[v] not in vals:
-                tocreate[v] = {}
-            else:
-                tocreate[v] = {'id': vals[self._inherits[v]]}
-
-        updates = [
-            # list of column assignments defined as tuples like:
-            #   (column_name, format_string, column_value)
-            #   (column_name, sql_formula)
-            # Those tuples will be used by the string formatting for the INSERT
-            # statement below.
-            ('id', "nextval('%s')" % self._sequence),
-        ]
-
-        upd_todo = []
-        unknown_fields = []
-        for v in vals.keys():
-            if v in self._inherit_fields and v not in self._columns:
-                (table, col, col_detail, original_parent) = self._inherit_fields[v]
-                tocreate[table][v] = vals[v]
-                del vals[v]
-            else:
-                if (v not in self._inherit_fields) and (v not in self._columns):
-                    del vals[v]
-                    unknown_fields.append(v)
-        if unknown_fields:
-            _logger.warning(
-                'No such field(s) in model %s: %s.',
-                self._name, ', '.join(unknown_fields))
+        def check_write_groups(fobj):
+            # return whether user belongs to one of the write groups of fobj
+            for group in fobj.write:
+                module = group.split(".")[0]
+                grp = group.split(".")[1]
+                cr.execute("select count(*) from res_groups_users_rel where gid IN (select res_id from ir_model_data where name='%s' and module='%s' and model='%s') and uid=%s" % \
+                           (grp, module, 'res.groups', user))
+                readonly = cr.fetchall()
+                if readonly[0][0] >= 1:
+                    return True
+            return False
 
-        for table in tocreate:
-            if self._inherits[table] in vals:
-                del vals[self._inherits[table]]
+        writable = {}                   # {field: whether user may write it}
+        bool_fields = [x for x in self._columns.keys() if self._columns[x]._type=='boolean']
 
-            record_id = tocreate[table].pop('id', None)
+        data_list = []
+        unknown_fields = set()
+        for vals in vals_list:
+            vals = dict(vals)
+            tocreate = {}
+            for v in self._inherits:
+                if self._inherits[v] not in vals:
+                    tocreate[v] = {}
+                else:
+                    tocreate[v] = {'id': vals[self._inherits[v]]}
 
-            if record_id is None or not record_id:
-                record_id = self.pool[table].create(cr, user, tocreate[table], context=context)
-            else:
-                self.pool[table].write(cr, user, [record_id], tocreate[table], context=context)
+            for v in vals.keys():
+                if v in self._inherit_fields and v not in self._columns:
+                    (table, col, col_detail, original_parent) = self._inherit_fields[v]
+                    tocreate[table][v] = vals[v]
+                    del vals[v]
+                else:
+                    if (v not in self._inherit_fields) and (v not in self._columns):
+                        del vals[v]
+                        unknown_fields.add(v)
 
-            updates.append((self._inherits[table], '%s', record_id))
+            for table in tocreate:
+                if self._inherits[table] in vals:
+                    del vals[self._inherits[table]]
 
-        #Start : Set bool fields to be False if they are not touched(to make search more powerful)
-        bool_fields = [x for x in self._columns.keys() if self._columns[x]._type=='boolean']
+            data_list.append({'vals': vals, 'tocreate': tocreate, 'parents': []})
 
-        for bool_field in bool_fields:
-            if bool_field not in vals:
-                vals[bool_field] = False
-        #End
-        for field in vals.keys():
-            fobj = None
-            if field in self._columns:
-                fobj = self._columns[field]
-            else:
-                fobj = self._inherit_fields[field][2]
-            if not fobj:
-                continue
-            groups = fobj.write
-            if groups:
-                edit = False
-                for group in groups:
-                    module = group.split(".")[0]
-                    grp = group.split(".")[1]
-                    cr.execute("select count(*) from res_groups_users_rel where gid IN (select res_id from ir_model_data where name='%s' and module='%s' and model='%s') and uid=%s" % \
-                               (grp, module, 'res.groups', user))
-                    readonly = cr.fetchall()
-                    if readonly[0][0] >= 1:
-                        edit = True
-                        break
-                    elif readonly[0][0] == 0:
-                        edit = False
-                    else:
-                        edit = False
+        if unknown_fields:
+            _logger.warning(
+                'No such field(s) in model %s: %s.',
+                self._name, ', '.join(sorted(unknown_fields)))
+
+        # create or update the parent records, with a batch create per parent
+        for table, parent_field in self._inherits.iteritems():
+            tocreate_data, tocreate_vals = [], []
+            for data in data_list:
+                parent_vals = data['tocreate'][table]
+                record_id = parent_vals.pop('id', None)
+                if record_id is None or not record_id:
+                    tocreate_data.append(data)
+                    tocreate_vals.append(parent_vals)
+                else:
+                    self.pool[table].write(cr, user, [record_id], parent_vals, context=context)
+                    data['parents'].append((parent_field, '%s', record_id))
+            if tocreate_vals:
+                record_ids = self.pool[table].create(cr, user, tocreate_vals, context=context)
+                for data, record_id in itertools.izip(tocreate_data, record_ids):
+                    data['parents'].append((parent_field, '%s', record_id))
+
+        for data in data_list:
+            vals = data['vals']
+            updates = [
+                # list of column assignments defined as tuples like:
+                #   (column_name, format_string, column_value)
+                #   (column_name, sql_formula)
+                # Those tuples will be used by the string formatting for the INSERT
+                # statement below.
+                ('id', "nextval('%s')" % self._sequence),
+            ]
+            updates.extend(data['parents'])
+
+            #Start : Set bool fields to be False if they are not touched(to make search more powerful)
+            for bool_field in bool_fields:
+                if bool_field not in vals:
+                    vals[bool_field] = False
+            #End
+            for field in vals.keys():
+                fobj = None
+                if field in self._columns:
+                    fobj = self._columns[field]
+                else:
+                    fobj = self._inherit_fields[field][2]
+                if not fobj:
+                    continue
+                if fobj.write:
+                    if field not in writable:
+                        writable[field] = check_write_groups(fobj)
+                    if not writable[field]:
+                        vals.pop(field)
 
-                if not edit:
-                    vals.pop(field)
-        for field in vals:
-            column = self._columns[field]
-            if column._classic_write:
-                updates.append((field, '%s', column._symbol_set[1](vals[field])))
-
-                #for the function fields that receive a value, we set them directly in the database
-                #(they may be required), but we also need to trigger the _fct_inv()
-                if (hasattr(column, '_fnct_inv')) and not isinstance(column, fields.related):
-                    #TODO: this way to special case the related fields is really creepy but it shouldn't be changed at
-                    #one week of the release candidate. It seems the only good way to handle correctly this is to add an
-                    #attribute to make a field `really readonly´ and thus totally ignored by the create()... otherwise
-                    #if, for example, the related has a default value (for usability) then the fct_inv is called and it
-                    #may raise some access rights error. Changing this is a too big change for now, and is thus postponed
-                    #after the release but, definitively, the behavior shouldn't be different for related and function
-                    #fields.
-                    upd_todo.append(field)
-            else:
-                #TODO: this `if´ statement should be removed because there is no good reason to special case the fields
-                #related. See the above TODO comment for further explanations.
-                if not isinstance(column, fields.related):
-                    upd_todo.append(field)
-            if hasattr(column, 'selection') and vals[field]:
-                self._check_selection_field_value(cr, user, field, vals[field], context=context)
-        if self._log_access:
-            updates.append(('create_uid', '%s', user))
-            updates.append(('write_uid', '%s', user))
-            updates.append(('create_date', "(now() at time zone 'UTC')"))
-            updates.append(('write_date', "(now() at time zone 'UTC')"))
+            upd_todo = []
+            for field in vals:
+                column = self._columns[field]
+                if column._classic_write:
+                    updates.append((field, '%s', column._symbol_set[1](vals[field])))
+
+                    #for the function fields that receive a value, we set them directly in the database
+                    #(they may be required), but we also need to trigger the _fct_inv()
+                    if (hasattr(column, '_fnct_inv')) and not isinstance(column, fields.related):
+                        #TODO: this way to special case the related fields is really creepy but it shouldn't be changed at
+                        #one week of the release candidate. It seems the only good way to handle correctly this is to add an
+                        #attribute to make a field `really readonly´ and thus totally ignored by the create()... otherwise
+                        #if, for example, the related has a default value (for usability) then the fct_inv is called and it
+                        #may raise some access rights error. Changing this is a too big change for now, and is thus postponed
+                        #after the release but, definitively, the behavior shouldn't be different for related and function
+                        #fields.
+                        upd_todo.append(field)
+                else:
+                    #TODO: this `if´ statement should be removed because there is no good reason to special case the fields
+                    #related. See the above TODO comment for further explanations.
+                    if not isinstance(column, fields.related):
+                        upd_todo.append(field)
+                if hasattr(column, 'selection') and vals[field]:
+                    self._check_selection_field_value(cr, user, field, vals[field], context=context)
+            if self._log_access:
+                updates.append(('create_uid', '%s', user))
+                updates.append(('write_uid', '%s', user))
+                updates.append(('create_date', "(now() at time zone 'UTC')"))
+                updates.append(('write_date', "(now() at time zone 'UTC')"))
+
+            data['updates'] = updates
+            data['upd_todo'] = upd_todo
+
+        # group the records by set of columns, and insert each group with
+        # multi-row INSERT statements; the tuples in updates correspond to
+        # tuple(field_name, format, value), where the value is omitted when the
+        # real value is encoded in the format, like for (id, create_date)
+        groups = defaultdict(list)
+        for data in data_list:
+            groups[tuple(u[0] for u in data['updates'])].append(data)
 
-        # the list of tuples used in this formatting corresponds to
-        # tuple(field_name, format, value)
-        # In some case, for example (id, create_date, write_date) we does not
-        # need to read the third value of the tuple, because the real value is
-        # encoded in the second value (the format).
-        cr.execute(
-            """INSERT INTO "%s" (%s) VALUES(%s) RETURNING id""" % (
-                self._table,
-                ', '.join('"%s"' % u[0] for u in updates),
-                ', '.join(u[1] for u in updates)
-            ),
-            tuple([u[2] for u in updates if len(u) > 2])
-        )
+        for columns, group in groups.iteritems():
+            if len(group) >= COPY_CREATE_MIN and self._create_copy(cr, columns, group):
+                continue
+            for sub_group in cr.split_for_in_conditions(group):
+                rows, params = [], []
+                for data in sub_group:
+                    rows.append('(%s)' % ', '.join(u[1] for u in data['updates']))
+                    params.extend(u[2] for u in data['updates'] if len(u) > 2)
+                cr.execute(
+                    """INSERT INTO "%s" (%s) VALUES %s RETURNING id""" % (
+                        self._table,
+                        ', '.join('"%s"' % column for column in columns),
+                        ', '.join(rows),
+                    ),
+                    params
+                )
+                # the ids are returned in the order of the VALUES rows
+                for data, (id_new,) in itertools.izip(sub_group, cr.fetchall()):
+                    data['id'] = id_new
 
-        id_new, = cr.fetchone()
-        recs = self.browse(cr, user, id_new, context)
+        ids = [data['id'] for data in data_list]
+        recs = self.browse(cr, user, ids, context)
 
         if context.get('lang') and context['lang'] != 'en_US':
             # add translations for context['lang']
-            for field in vals:
-                column = self._columns[field]
-                if column._classic_write and column.translate and not callable(column.translate):
-                    self.pool['ir.translation']._set_ids(
-                        cr, user, self._name+','+field, 'model',
-                        context['lang'], recs.ids, vals[field], vals[field],
-                    )
+            for data in data_list:
+                vals = data['vals']
+                for field in vals:
+                    column = self._columns[field]
+                    if column._classic_write and column.translate and not callable(column.translate):
+                        self.pool['ir.translation']._set_ids(
+                            cr, user, self._name+','+field, 'model',
+                            context['lang'], [data['id']], vals[field], vals[field],
+                        )
 
-        if self._parent_store and not context.get('defer_parent_store_computation'):
+        if self._parent_store == 'path' and not context.get('defer_parent_store_computation'):
+            self._parent_path_update(cr, [data['id'] for data in data_list])
+        elif self._parent_store and not context.get('defer_parent_store_computation'):
             if self.pool._init:
                 self.pool._init_parent[self._name] = True
             else:
-                parent = vals.get(self._parent_name, False)
-                if parent:
-                    cr.execute('select parent_right from '+self._table+' where '+self._parent_name+'=%s order by '+(self._parent_order or self._order), (parent,))
-                    pleft_old = None
-                    result_p = cr.fetchall()
-                    for (pleft,) in result_p:
-                        if not pleft:
-                            break
-                        pleft_old = pleft
-                    if not pleft_old:
-                        cr.execute('select parent_left from '+self._table+' where id=%s', (parent,))
-                        pleft_old = cr.fetchone()[0]
-                    pleft = pleft_old
-                else:
-                    cr.execute('select max(parent_right) from '+self._table)
-                    pleft = cr.fetchone()[0] or 0
-                cr.execute('update '+self._table+' set parent_left=parent_left+2 where parent_left>%s', (pleft,))
-                cr.execute('update '+self._table+' set parent_right=parent_right+2 where parent_right>%s', (pleft,))
-                cr.execute('update '+self._table+' set parent_left=%s,parent_right=%s where id=%s', (pleft+1, pleft+2, id_new))
+                for data in data_list:
+                    parent = data['vals'].get(self._parent_name, False)
+                    if parent:
+                        cr.execute('select parent_right from '+self._table+' where '+self._parent_name+'=%s order by '+(self._parent_order or self._order), (parent,))
+                        pleft_old = None
+                        result_p = cr.fetchall()
+                        for (pleft,) in result_p:
+                            if not pleft:
+                                break
+                            pleft_old = pleft
+                        if not pleft_old:
+                            cr.execute('select parent_left from '+self._table+' where id=%s', (parent,))
+                            pleft_old = cr.fetchone()[0]
+                        pleft = pleft_old
+                    else:
+                        cr.execute('select max(parent_right) from '+self._table)
+                        pleft = cr.fetchone()[0] or 0
+                    cr.execute('update '+self._table+' set parent_left=parent_left+2 where parent_left>%s', (pleft,))
+                    cr.execute('update '+self._table+' set parent_right=parent_right+2 where parent_right>%s', (pleft,))
+                    cr.execute('update '+self._table+' set parent_left=%s,parent_right=%s where id=%s', (pleft+1, pleft+2, data['id']))
                 recs.invalidate_cache(['parent_left', 'parent_right'])
 
         # invalidate and mark new-style fields to recompute; do this before
@@ -4328,27 +5434,31 @@ class BaseModel(object):
         # fields, e.g., a one2many checking constraints on records
         recs.modified(self._fields)
 
-        # call the 'set' method of fields which are not classic_write
-        upd_todo.sort(lambda x, y: self._columns[x].priority-self._columns[y].priority)
-
         # default element in context must be remove when call a one2many or many2many
         rel_context = context.copy()
         for c in context.items():
             if c[0].startswith('default_'):
                 del rel_context[c[0]]
 
+        # call the 'set' method of fields which are not classic_write
         result = []
-        for field in upd_todo:
-            result += self._columns[field].set(cr, self, id_new, field, vals[field], user, rel_context) or []
+        upd_todo_all = set()
+        for data in data_list:
+            upd_todo = data['upd_todo']
+            upd_todo.sort(lambda x, y: self._columns[x].priority-self._columns[y].priority)
+            for field in upd_todo:
+                result += self._columns[field].set(cr, self, data['id'], field, data['vals'][field], user, rel_context) or []
+            upd_todo_all.update(upd_todo)
 
         # for recomputing new-style fields
-        recs.modified(upd_todo)
+        recs.modified(upd_todo_all)
 
         # check Python constraints
-        recs._validate_fields(vals)
+        vals_fields = set(field for data in data_list for field in data['vals'])
+        recs._validate_fields(vals_fields)
 
-        result += self._store_get_values(cr, user, [id_new],
-                list(set(vals.keys() + self._inherits.values())),
+        result += self._store_get_values(cr, user, ids,
+                list(vals_fields.union(self._inherits.values())),
                 context)
         recs.env.recompute_old.extend(result)
 
@@ -4357,25 +5467,24 @@ class BaseModel(object):
             while recs.env.recompute_old:
                 sorted_recompute_old = sorted(recs.env.recompute_old)
                 recs.env.clear_recompute_old()
-                for __, model_name, ids, fields2 in sorted_recompute_old:
-                    if not (model_name, ids, fields2) in done:
+                for __, model_name, ids2, fields2 in sorted_recompute_old:
+                    if not (model_name, ids2, fields2) in done:
                         self.pool[model_name]._store_set_values(
-                            cr, user, ids, fields2, context)
-                        done.append((model_name, ids, fields2))
+                            cr, user, ids2, fields2, context)
+                        done.append((model_name, ids2, fields2))
 
             # recompute new-style fields
             recs.recompute()
 
         if self._log_create and recs.env.recompute and context.get('recompute', True):
-            message = self._description + \
-                " '" + \
-                self.name_get(cr, user, [id_new], context=context)[0][1] + \
-                "' " + _("created.")
-            self.log(cr, user, id_new, message, True, context=context)
+            for id_new, name in self.name_get(cr, user, ids, context=context):
+                message = self._description + \
+                    " '" + name + "' " + _("created.")
+                self.log(cr, user, id_new, message, True, context=context)
 
-        self.check_access_rule(cr, user, [id_new], 'create', context=context)
-        self.create_workflow(cr, user, [id_new], context=context)
-        return id_new
+        self.check_access_rule(cr, user, ids, 'create', context=context)
+        self.create_workflow(cr, user, ids, context=context)
+        return ids
 
     def _store_get_values(self, cr, uid, ids, fields, context):
         """Returns an ordered list of fields.function to call due to
@@ -4466,6 +5575,7 @@ class BaseModel(object):
                 keys.append(self._columns[f]._multi)
             todo.setdefault(self._columns[f]._multi, [])
             todo[self._columns[f]._multi].append(f)
+        vals_by_id = defaultdict(dict)
         for key in keys:
             val = todo[key]
             if key:
@@ -4476,7 +5586,6 @@ class BaseModel(object):
                         for f in value.keys():
                             if f in field_dict[id]:
                                 value.pop(f)
-                    updates = []        # list of (column, pattern, value)
                     for v in value:
                         if v not in val:
                             continue
@@ -4486,13 +5595,7 @@ class BaseModel(object):
                                 value[v] = value[v][0]
                             except:
                                 pass
-                        updates.append((v, '%s', column._symbol_set[1](value[v])))
-                    if updates:
-                        query = 'UPDATE "%s" SET %s WHERE id = %%s' % (
-                            self._table, ','.join('"%s"=%s' % u[:2] for u in updates),
-                        )
-                        params = tuple(u[2] for u in updates)
-                        cr.execute(query, params + (id,))
+                        vals_by_id[id][v] = value[v]
 
             else:
                 for f in val:
@@ -4510,10 +5613,10 @@ class BaseModel(object):
                                 value = value[0]
                             except:
                                 pass
-                        query = 'UPDATE "%s" SET "%s"=%%s WHERE id = %%s' % (
-                            self._table, f,
-                        )
-                        cr.execute(query, (column._symbol_set[1](value), id))
+                        vals_by_id[id][f] = value
+
+        # write the values of all records at once
+        self._update_rows(cr, vals_by_id)
 
         # invalidate and mark new-style fields to recompute
         self.browse(cr, uid, ids, context).modified(fields)
@@ -4545,9 +5648,7 @@ class BaseModel(object):
                 domain = [('active', '=', 1)]
 
         if domain:
-            e = expression.expression(cr, user, domain, self, context)
-            tables = e.get_tables()
-            where_clause, where_params = e.to_sql()
+            tables, where_clause, where_params = expression.compile_domain(cr, user, domain, self, context)
             where_clause = where_clause and [where_clause] or []
         else:
             where_clause, where_params, tables = [], [], ['"%s"' % self._table]
@@ -4791,6 +5892,197 @@ class BaseModel(object):
 
         return _uniquify_list([x[0] for x in res])
 
+    @api.model
+    @api.returns('self', lambda value: (value[0].ids, value[1]))
+    def search_keyset(self, domain, limit=None, order=None, token=None):
+        """ search_keyset(domain[, limit=None, order=None, token=None]) -> (records, token)
+
+        Searches for records based on the ``domain``, and returns them page by
+        page with keyset pagination: instead of skipping ``offset`` records,
+        each page resumes right after the last record of the previous page,
+        by comparing the ordering columns to their values on that record. The
+        cost of fetching a page therefore does not depend on its position.
+
+        :param domain: :ref:`A search domain <reference/orm/domains>`
+        :param int limit: maximum number of records to return in the page
+        :param str order: sort string, see :meth:`~.search`; the ordering is
+            made total by appending the record id when necessary
+        :param str token: the token returned along with the previous page, or
+            ``None`` to get the first page
+        :returns: a pair ``(records, token)``, where ``token`` is an opaque
+            string to pass for getting the next page, or ``False`` if there
+            is no next page
+        :raise UserError: if ``token`` is invalid, or was built for another
+            model or order
+        """
+        ids, token = self._search_keyset(domain, limit=limit, order=order, token=token)
+        return self.browse(ids), token
+
+    def _search_keyset(self, cr, user, args, limit=None, order=None, token=None, context=None, access_rights_uid=None):
+        """ Private implementation of :meth:`~.search_keyset`, returning a
+            pair ``(ids, token)``. See :meth:`~._search` for the meaning of
+            ``access_rights_uid``.
+        """
+        if context is None:
+            context = {}
+        self.check_access_rights(cr, access_rights_uid or user, 'read')
+
+        # For transient models, restrict access to the current user, except for the super-user
+        if self.is_transient() and self._log_access and user != SUPERUSER_ID:
+            args = expression.AND(([('create_uid', '=', user)], args or []))
+
+        query = self._where_calc(cr, user, args, context=context)
+        self._apply_ir_rules(cr, user, query, 'read', context=context)
+        order_spec = order or self._order
+        terms = self._generate_keyset_order(cr, user, order_spec, query, context=context)
+        if token:
+            values = self._keyset_token_values(token, order_spec, len(terms))
+            clause, params = self._generate_keyset_where(terms, values)
+            query.where_clause.append(clause)
+            query.where_clause_params.extend(params)
+
+        from_clause, where_clause, where_clause_params = query.get_sql()
+        where_str = where_clause and (" WHERE %s" % where_clause) or ''
+        order_by = ' ORDER BY %s' % ','.join('%s %s' % term[:2] for term in terms)
+        limit_str = limit and ' LIMIT %d' % limit or ''
+        query_str = 'SELECT "%s".id, %s FROM ' % (self._table, ','.join(term[0] for term in terms)) \
+            + from_clause + where_str + order_by + limit_str
+        cr.execute(query_str, where_clause_params)
+        res = cr.fetchall()
+
+        # uniquify ids while preserving order (see _search)
+        seen = set()
+        ids = [row[0] for row in res if row[0] not in seen and not seen.add(row[0])]
+        next_token = False
+        if limit and len(res) == limit:
+            next_token = self._keyset_token(order_spec, res[-1][1:])
+        return ids, next_token
+
+    @api.model
+    def _generate_keyset_order(self, order_spec, query):
+        """ Return the ordering terms of ``order_spec`` for keyset pagination,
+            as a list of triples ``(expression, direction, notnull)``, where
+            ``notnull`` tells whether the expression cannot be ``NULL``. The
+            record id is appended if necessary, so that the order is total.
+            Joins required by the ordering are added to ``query``.
+        """
+        id_term = '"%s"."id"' % self._table
+        terms, seen = [], set()
+        self._check_qorder(order_spec)
+        for order_part in order_spec.split(','):
+            order_field = order_part.strip().split(' ')[0].strip()
+            column = self._columns.get(order_field)
+            required = bool(column and column._classic_read and column.required)
+            # each element has the form "<expression> <direction>"; only the
+            # columns of the table itself may be not null: the expressions on
+            # joined tables (many2one, inherited fields) come from outer joins
+            own_term = '"%s"."%s"' % (self._table, order_field)
+            for element in self._generate_order_by_inner(self._table, order_part, query, seen=seen):
+                expr, direction = element.rsplit(' ', 1)
+                notnull = expr == id_term or (required and expr == own_term)
+                terms.append((expr, direction or 'ASC', notnull))
+        if not any(term[0] == id_term for term in terms):
+            terms.append((id_term, 'ASC', True))
+        return terms
+
+    def _generate_keyset_where(self, terms, values):
+        """ Return a pair ``(clause, params)`` that selects the rows coming
+            strictly after the row where the ordering ``terms`` (as returned
+            by :meth:`~._generate_keyset_order`) have the given ``values``.
+            PostgreSQL puts ``NULL`` values last in ascending order, and first
+            in descending order.
+        """
+        directions = set(term[1] for term in terms)
+        if len(directions) == 1 and all(term[2] for term in terms) and None not in values:
+            # row comparison, which can be served by an index on the terms
+            clause = '(%s) %s (%s)' % (
+                ','.join(term[0] for term in terms),
+                '>' if directions.pop() == 'ASC' else '<',
+                ','.join(['%s'] * len(terms)),
+            )
+            return clause, list(values)
+
+        clauses, params = [], []
+        equal, equal_params = [], []
+        for (expr, direction, notnull), value in itertools.izip(terms, values):
+            # rows after the given one on this term, and equal on previous terms
+            after, after_params = None, []
+            if direction == 'ASC':
+                if value is not None:
+                    after, after_params = '(%s > %%s OR %s IS NULL)' % (expr, expr), [value]
+            elif value is None:
+                after = '%s IS NOT NULL' % expr
+            else:
+                after, after_params = '%s < %%s' % expr, [value]
+            if after:
+                clauses.append('(%s)' % ' AND '.join(equal + [after]))
+                params.extend(equal_params + after_params)
+            if value is None:
+                equal.append('%s IS NULL' % expr)
+            else:
+                equal.append('%s = %%s' % expr)
+                equal_params.append(value)
+        return '(%s)' % (' OR '.join(clauses) or 'FALSE'), params
+
+    def _keyset_token(self, order_spec, values):
+        """ Return the continuation token for the given ordering values. """
+        data = json.dumps([self._name, order_spec, list(values)])
+        return base64.urlsafe_b64encode(data)
+
+    def _keyset_token_values(self, token, order_spec, size):
+        """ Return the ordering values encoded in ``token``, after checking
+            that it corresponds to the model, ``order_spec`` and the number of
+            ordering terms.
+        """
+        try:
+            model, order, values = json.loads(base64.urlsafe_b64decode(str(token)))
+        except (TypeError, ValueError):
+            raise UserError(_("Invalid pagination token."))
+        if model != self._name or order != order_spec or len(values) != size:
+            raise UserError(_("The pagination token does not match the search."))
+        return values
+
+    @api.model
+    def search_iter(self, domain, order=None, batch_size=PREFETCH_MAX):
+        """ search_iter(domain[, order=None][, batch_size=PREFETCH_MAX]) -> iterator
+
+        Iterates over the records matching the ``domain`` by batches of at
+        most ``batch_size`` records. The ids are streamed from a server-side
+        cursor (see :meth:`~openerp.sql_db.Cursor.stream`), and the records of
+        each batch are evicted from the cache when the next batch is fetched.
+        The memory used therefore depends on the size of a batch only, even
+        when scanning millions of records. The transaction must not be
+        committed while iterating.
+
+        :param domain: :ref:`A search domain <reference/orm/domains>`
+        :param str order: sort string, see :meth:`~.search`
+        :param int batch_size: maximum number of records per batch
+        :returns: an iterator over recordsets
+        """
+        self.check_access_rights('read')
+
+        # For transient models, restrict access to the current user, except for the super-user
+        if self.is_transient() and self._log_access and self._uid != SUPERUSER_ID:
+            domain = expression.AND(([('create_uid', '=', self._uid)], domain or []))
+
+        query = self._where_calc(domain)
+        self._apply_ir_rules(query, 'read')
+        order_by = self._generate_order_by(order, query)
+        from_clause, where_clause, where_clause_params = query.get_sql()
+        where_str = where_clause and (" WHERE %s" % where_clause) or ''
+        query_str = 'SELECT "%s".id FROM ' % self._table + from_clause + where_str + order_by
+        rows = self._cr.stream(query_str, where_clause_params, itersize=batch_size)
+        return self._iter_batches((row[0] for row in rows), batch_size)
+
+    def _iter_batches(self, ids, batch_size):
+        """ Iterate over the records ``ids`` by batches of ``batch_size``,
+            and evict each batch from the cache once it has been processed.
+        """
+        for batch in tools.misc.split_every(batch_size, ids):
+            records = self.browse(batch)
+            yield records
+            self.env.evict(records)
+
     # returns the different values ever entered for one field
     # this is used, for example, in the client when the user hits enter on
     # a char field
@@ -4837,7 +6129,7 @@ class BaseModel(object):
                     default['state'] = self._defaults['state']
 
         # build a black list of fields that should not be copied
-        blacklist = set(MAGIC_COLUMNS + ['parent_left', 'parent_right'])
+        blacklist = set(MAGIC_COLUMNS + ['parent_left', 'parent_right', 'parent_path'])
         whitelist = set(name for name, field in self._fields.iteritems() if not field.inherited)
 
         def blacklist_given_fields(obj):
@@ -5147,7 +6439,13 @@ class BaseModel(object):
             " < ((now() at time zone 'UTC') - interval %s)")
         cr.execute(query, ("%s seconds" % seconds,))
         ids = [x[0] for x in cr.fetchall()]
-        self.unlink(cr, SUPERUSER_ID, ids)
+        if not ids:
+            return
+        if getattr(type(self).unlink, 'im_func', None) is BaseModel.unlink.im_func:
+            # no business logic in unlink(), purge the records in bulk
+            self.unlink_bulk(cr, SUPERUSER_ID, [('id', 'in', ids)])
+        else:
+            self.unlink(cr, SUPERUSER_ID, ids)
 
     def _transient_clean_old_rows(self, cr, max_count):
         # Check how many rows we have in the table
@@ -5319,6 +6617,8 @@ class BaseModel(object):
         method.origin = origin
         # propagate decorators from origin to method, and apply api decorator
         wrapped = api.guess(api.propagate(origin, method))
+        if name == 'create' and not getattr(wrapped, '_model_create_multi', False):
+            wrapped = api.model_create_single(wrapped)
         wrapped.origin = origin
         setattr(cls, name, wrapped)
 
@@ -5805,6 +7105,7 @@ class BaseModel(object):
                 records ``self``
         """
         # each field knows what to invalidate and recompute
+        fnames = set(fnames)
         spec = []
         for fname in fnames:
             spec += self._fields[fname].modified(self)
@@ -5819,6 +7120,7 @@ class BaseModel(object):
                  if f in cached_fields]
 
         self.env.invalidate(spec)
+        self.env.invalidate_access(self, fnames)
 
     def _recompute_check(self, field):
         """ If ``field`` must be recomputed on some record in ``self``, return the
@@ -5834,27 +7136,140 @@ class BaseModel(object):
         """ Mark ``field`` as recomputed. """
         self.env.remove_todo(field, self)
 
+    def _related_sql_fields(self, field):
+        """ Return the fields followed by the stored related field ``field``
+            if its value can be computed in SQL, i.e., if its path is made of
+            many2one columns and ends with a plain column. Otherwise return
+            ``None``.
+        """
+        def plain(f):
+            return bool(
+                f.store and f.column is not None and f.column._classic_write
+                and not f.inherited and not getattr(f, 'translate', False)
+            )
+
+        if not (field.related and field.related_sudo and plain(field)):
+            return None
+        # old-style stored function fields are triggered by write() only
+        for trigger in self.pool._store_function.get(self._name, []):
+            if not trigger[3] or field.name in trigger[3]:
+                return None
+        model = self
+        fields = []
+        for name in field.related:
+            if fields and fields[-1].type != 'many2one':
+                return None
+            f = model._fields[name]
+            if not plain(f):
+                return None
+            fields.append(f)
+            if f.type == 'many2one':
+                model = self.env[f.comodel_name]
+        return fields
+
+    @api.model
+    def _compute_related_sql(self, field, ids=None):
+        """ Compute the stored related field ``field`` in database on the
+            records ``ids`` (all records by default), with an ``UPDATE ...
+            FROM`` query that joins the tables along the path of ``field``.
+            The records whose value has changed are marked as modified, and
+            their ids are returned. The field must be supported by method
+            :meth:`_related_sql_fields`.
+        """
+        fields = self._related_sql_fields(field)
+        assert fields, "Field %s cannot be computed in SQL" % field
+
+        # LEFT JOIN the tables along the path, so that records with an empty
+        # many2one get a NULL value
+        joins = []
+        for index, f in enumerate(fields[:-1]):
+            joins.append('LEFT JOIN "%s" "t%d" ON "t%d".id="t%d"."%s"' % (
+                self.env[f.comodel_name]._table, index + 1, index + 1, index, f.name,
+            ))
+        pg_type = get_pg_type(field.column)
+        query = """
+            UPDATE "{table}" SET "{column}"=sub.value
+            FROM (SELECT "t0".id, "t{last}"."{source}"{cast} AS value
+                  FROM "{table}" "t0" {joins} {where}) AS sub
+            WHERE "{table}".id=sub.id AND "{table}"."{column}" IS DISTINCT FROM sub.value
+            RETURNING "{table}".id
+        """
+        kwargs = dict(
+            table=self._table, column=field.name, joins=' '.join(joins),
+            last=len(fields) - 1, source=fields[-1].name,
+            cast='::%s' % pg_type[0] if pg_type else '',
+        )
+
+        cr = self._cr
+        changed_ids = []
+        if ids is None:
+            cr.execute(query.format(where='', **kwargs))
+            changed_ids.extend(row[0] for row in cr.fetchall())
+        else:
+            query = query.format(where='WHERE "t0".id IN %s', **kwargs)
+            for sub_ids in cr.split_for_in_conditions(ids):
+                cr.execute(query, [sub_ids])
+                changed_ids.extend(row[0] for row in cr.fetchall())
+
+        # invalidate the cache, and trigger the fields that depend on field
+        if changed_ids:
+            self.browse(changed_ids).modified([field.name])
+        return changed_ids
+
     @api.model
     def recompute(self):
         """ Recompute stored function fields. The fields and records to
             recompute have been determined by method :meth:`modified`.
+
+            Fields are recomputed in the topological order of their
+            dependencies, by chunks of at most ``PREFETCH_MAX`` records, and
+            the values of a chunk are written with batched updates. Stored
+            related fields following many2one columns are computed by a single
+            SQL query on all their records (see :meth:`_compute_related_sql`).
+            The time
+            spent on each field is accumulated in
+            :attr:`~openerp.api.Environment.recompute_timings`.
         """
         while self.env.has_todo():
             field, recs = self.env.get_todo()
+            start = time.time()
+            if recs._related_sql_fields(field):
+                # stored related fields are computed in database at once
+                recs._compute_related_sql(field, recs.ids)
+                recs._recompute_done(field)
+                self.env.add_recompute_timing(field, len(recs), time.time() - start)
+                continue
+            # the remaining records are processed by the next iterations
+            recs = recs[:PREFETCH_MAX]
             # determine the fields to recompute
             fs = self.env[field.model_name]._field_computed[field]
             ns = [f.name for f in fs if f.store]
-            # evaluate fields, and group record ids by update
+            # evaluate fields on the whole chunk at once
+            existing = recs.exists()
+            field_cache = existing.env.cache[field]
+            missing = existing.browse([id for id in existing._ids if id not in field_cache])
+            if missing:
+                field.compute_value(missing)
+            # group record ids by update
             updates = defaultdict(set)
-            for rec in recs.exists():
+            for rec in existing:
                 vals = rec._convert_to_write({n: rec[n] for n in ns})
                 updates[frozendict(vals)].add(rec.id)
-            # update records in batch when possible
+            # update records in batch when possible: records sharing the same
+            # values are updated together, and the remaining plain columns
+            # are written with a single heterogeneous update
             with recs.env.norecompute():
+                vals_by_id = {}
                 for vals, ids in updates.iteritems():
-                    recs.browse(ids)._write(dict(vals))
+                    if vals and len(ids) == 1 and all(map(recs._write_multi_supported, vals)):
+                        vals_by_id[next(iter(ids))] = dict(vals)
+                    else:
+                        recs.browse(ids)._write(dict(vals))
+                if vals_by_id:
+                    recs._write_multi(vals_by_id)
             # mark computed fields as done
             map(recs._recompute_done, fs)
+            self.env.add_recompute_timing(field, len(recs), time.time() - start)
 
     #
     # Generic onchange method
@@ -128,3 +128,23 @@ def has_unaccent(cr):
     """
     cr.execute("SELECT proname FROM pg_proc WHERE proname='unaccent'")
     return len(cr.fetchall()) > 0
+
+def has_immutable_unaccent(cr):
+    """ Test if the database has an immutable unaccent function.
+
+    Only immutable functions may be used in index expressions, while the
+    unaccent function of the PostgreSQL contrib module is merely stable.
+    It has to be declared immutable (or replaced) by the administrator for
+    trigram indexes to support unaccented searches.
+
+    """
+    cr.execute("SELECT proname FROM pg_proc WHERE proname='unaccent' AND pronargs=1 AND provolatile='i'")
+    return len(cr.fetchall()) > 0
+
+def has_trigram(cr):
+    """ Test if the database provides the operator classes of the PostgreSQL
+    pg_trgm contrib module, needed by trigram indexes.
+
+    """
+    cr.execute("SELECT opcname FROM pg_opclass WHERE opcname='gin_trgm_ops'")
+    return len(cr.fetchall()) > 0
@@ -8,6 +8,9 @@ from collections import Mapping, defaultdict
 import logging
 import os
 import threading
+import time
+
+import psycopg2
 
 import openerp
 from .. import SUPERUSER_ID
@@ -16,6 +19,9 @@ from openerp.tools.lru import LRU
 
 _logger = logging.getLogger(__name__)
 
+# delay before trying to connect again to a read replica, in seconds
+REPLICA_RETRY_DELAY = 60
+
 class Registry(Mapping):
     """ Model registry for a particular database.
 
@@ -41,6 +47,13 @@ class Registry(Mapping):
         self.db_name = db_name
         self._db = openerp.sql_db.db_connect(db_name)
 
+        # connection to the read replica of the database, if any, and the
+        # time after which it may be used after a connection failure
+        self._db_replica = None
+        if config['db_replica_host'] or config['db_replica_port']:
+            self._db_replica = openerp.sql_db.db_connect(db_name, readonly=True)
+        self._db_replica_retry = 0
+
         # special cursor for test mode; None means "normal" mode
         self.test_cr = None
 
@@ -56,6 +69,8 @@ class Registry(Mapping):
         self.base_cache_signaling_sequence = None
 
         self.cache = LRU(8192)
+        # SQL code of domains, see openerp.osv.expression.compile_domain()
+        self.domain_cache = LRU(4096)
         # Flag indicating if at least one model cache has been cleared.
         # Useful only in a multi-process context.
         self._any_cache_cleared = False
@@ -65,6 +80,8 @@ class Registry(Mapping):
         if openerp.tools.config['unaccent'] and not has_unaccent:
             _logger.warning("The option --unaccent was given but no unaccent() function was found in database.")
         self.has_unaccent = openerp.tools.config['unaccent'] and has_unaccent
+        self.has_unaccent_index = self.has_unaccent and openerp.modules.db.has_immutable_unaccent(cr)
+        self.has_trigram = openerp.modules.db.has_trigram(cr)
         cr.close()
 
     #
@@ -179,6 +196,7 @@ class Registry(Mapping):
             :param partial: ``True`` if all models have not been loaded yet.
         """
         lazy_property.reset_all(self)
+        self.domain_cache.clear()
 
         # load custom models
         ir_model = self['ir.model']
@@ -263,9 +281,13 @@ class Registry(Mapping):
         self.test_cr = None
         RegistryManager.leave_test_mode()
 
-    def cursor(self):
+    def cursor(self, readonly=False):
         """ Return a new cursor for the database. The cursor itself may be used
             as a context manager to commit/rollback and close automatically.
+
+            :param readonly: whether the cursor may use the read replica of the
+                database, if one is configured; the cursor is then read-only.
+                The primary database is used if the replica is unreachable.
         """
         cr = self.test_cr
         if cr is not None:
@@ -275,8 +297,23 @@ class Registry(Mapping):
             # cursor itself in its method close().
             cr.acquire()
             return cr
+        if readonly and self._db_replica is not None and time.time() >= self._db_replica_retry:
+            try:
+                return self._db_replica.cursor()
+            except psycopg2.OperationalError:
+                _logger.warning("Cannot connect to the read replica of database %s, "
+                                "using the primary database for %d seconds",
+                                self.db_name, REPLICA_RETRY_DELAY, exc_info=True)
+                self._db_replica_retry = time.time() + REPLICA_RETRY_DELAY
         return self._db.cursor()
 
+    def readwrite(self, cr):
+        """ Make a cursor returned by ``cursor(readonly=True)`` continue on the
+            primary database. Its current transaction is rolled back.
+        """
+        if cr.readonly:
+            cr.reconnect(self._db.dsn)
+
 class DummyRLock(object):
     """ Dummy reentrant lock, to be used while running rpc and js tests """
     def acquire(self):
@@ -424,6 +424,32 @@ def select_from_where(cr, select_field, from_table, where_field, where_ids, wher
     return res
 
 
+def select_hierarchy(model, parent_name, ids, operator):
+    """ Return a subselect ``(query, params)`` returning the ids of the
+        records of ``model`` that are ``child_of`` or ``parent_of`` (given by
+        ``operator``) the records ``ids``, following the many2one field
+        ``parent_name``. The whole hierarchy is resolved by a single recursive
+        query. Return ``None`` if the field is not a many2one column stored in
+        the table of ``model``.
+    """
+    column = model._columns.get(parent_name)
+    if not (column and column._type == 'many2one' and column._classic_write
+            and column._obj == model._name):
+        return None
+    if operator == 'child_of':
+        # follow the parent field downwards: select the children of the nodes
+        step = 'SELECT t.id FROM "{table}" t JOIN __hierarchy h ON (t."{parent}" = h.id)'
+    else:
+        # follow the parent field upwards: select the parent of the nodes
+        step = 'SELECT t."{parent}" FROM "{table}" t JOIN __hierarchy h ON (t.id = h.id) WHERE t."{parent}" IS NOT NULL'
+    # UNION (instead of UNION ALL) stops the recursion on cycles
+    query = """WITH RECURSIVE __hierarchy(id) AS (
+                    SELECT id FROM "{table}" WHERE id IN %s
+                    UNION
+                    """ + step + """
+               ) SELECT id FROM __hierarchy"""
+    return query.format(table=model._table, parent=parent_name), [tuple(ids)]
+
 def select_distinct_from_where_not_null(cr, select_field, from_table):
     cr.execute('SELECT distinct("%s") FROM "%s" where "%s" is not null' % (select_field, from_table, select_field))
     return [r[0] for r in cr.fetchall()]
@@ -707,13 +733,79 @@ class expression(object):
                 return list(set(name_get_list))
             return list(value)
 
-        def child_of_domain(left, ids, left_model, parent=None, prefix='', context=None):
+        def select_search(comodel, domain, active_test=True):
+            """ Return a subselect ``(query, params)`` returning the ids that
+                ``comodel.search(domain)`` would return, with the access rules
+                of the current user applied inside the subselect """
+            if getattr(type(comodel)._search, 'im_func', None) is not BaseModel._search.im_func:
+                # _search() may restrict access further (mail.message,
+                # ir.attachment): use the ids it returns
+                ids = comodel.search(cr, uid, domain, context=dict(context or {}, active_test=active_test))
+                return 'SELECT "%s".id FROM "%s" WHERE "%s".id = ANY(%%s)' % (
+                    comodel._table, comodel._table, comodel._table), [ids]
+            comodel.check_access_rights(cr, uid, 'read')
+            # restrict access to transient records, as in _search()
+            if comodel.is_transient() and comodel._log_access and uid != SUPERUSER_ID:
+                domain = AND([[('create_uid', '=', uid)], domain])
+            query = comodel._where_calc(cr, uid, domain, active_test=active_test, context=context)
+            comodel._apply_ir_rules(cr, uid, query, 'read', context=context)
+            from_clause, where_clause, params = query.get_sql()
+            subselect = 'SELECT "%s".id FROM %s' % (comodel._table, from_clause)
+            if where_clause:
+                subselect += ' WHERE %s' % where_clause
+            return subselect, params
+
+        def hierarchy_domain(left, ids, left_model, parent, operator, inselect):
+            """ Return a domain implementing [(left, operator, ids)] with a
+                recursive query, or None if the parent field does not allow it """
+            subselect = select_hierarchy(left_model, parent or left_model._parent_name, ids, operator)
+            if subselect is None:
+                return None
+            return subselect_domain(left, subselect, inselect)
+
+        def subselect_domain(left, subselect, inselect):
+            """ Return a domain [(left,inselect,subselect)], or the domain
+                [(left,in,ids)] with the ids returned by ``subselect`` """
+            if inselect:
+                return [(left, 'inselect', subselect)]
+            cr.execute(*subselect)
+            return [(left, 'in', [row[0] for row in cr.fetchall()])]
+
+        def parent_paths(left_model, parent, ids):
+            """ Return the materialized paths of the given records, or None if
+                the model does not store them for the parent field """
+            if (parent or left_model._parent_name) != left_model._parent_name:
+                return None
+            cr.execute('SELECT parent_path FROM "%s" WHERE id IN %%s' % left_model._table, (tuple(ids),))
+            return [row[0] for row in cr.fetchall() if row[0]]
+
+        def nested_set(left_model):
+            """ Return whether the parent_left/right columns of the model can
+                be used; models storing materialized paths do not have them """
+            return left_model._parent_store and left_model._parent_store != 'path' and not left_model.pool._init
+
+        def child_of_domain(left, ids, left_model, parent=None, prefix='', context=None, inselect=True):
             """ Return a domain implementing the child_of operator for [(left,child_of,ids)],
-                either as a range using the parent_left/right tree lookup fields
-                (when available), or as an expanded [(left,in,child_ids)] """
+                either as a prefix match on the materialized path or as a range
+                using the parent_left/right tree lookup fields (when available),
+                or as a recursive subquery [(left,inselect,...)], or as an
+                expanded [(left,in,child_ids)] """
             if not ids:
                 return FALSE_DOMAIN
-            if left_model._parent_store and (not left_model.pool._init):
+            if left_model._parent_store == 'path':
+                paths = parent_paths(left_model, parent, ids)
+                if paths is not None:
+                    if not paths:
+                        return FALSE_DOMAIN
+                    # descendants share the prefix of their ancestors' paths
+                    conditions = ' OR '.join(['parent_path LIKE %s'] * len(paths))
+                    subselect = 'SELECT id FROM "%s" WHERE %s' % (left_model._table, conditions)
+                    return subselect_domain(left, (subselect, [path + '%' for path in paths]), inselect)
+            if not nested_set(left_model):
+                dom = hierarchy_domain(left, ids, left_model, parent, 'child_of', inselect)
+                if dom is not None:
+                    return dom
+            if nested_set(left_model):
                 # TODO: Improve where joins are implemented for many with '.', replace by:
                 # doms += ['&',(prefix+'.parent_left','<',o.parent_right),(prefix+'.parent_left','>=',o.parent_left)]
                 doms = []
@@ -732,11 +824,24 @@ class expression(object):
                     return ids + recursive_children(ids2, model, parent_field)
                 return [(left, 'in', recursive_children(ids, left_model, parent or left_model._parent_name))]
 
-        def parent_of_domain(left, ids, left_model, parent=None, prefix='', context=None):
+        def parent_of_domain(left, ids, left_model, parent=None, prefix='', context=None, inselect=True):
             """ Return a domain implementing the parent_of operator for [(left,parent_of,ids)],
-                either as a range using the parent_left/right tree lookup fields
-                (when available), or as an expanded [(left,in,parent_ids)] """
-            if left_model._parent_store and (not left_model.pool._init):
+                either from the materialized path or as a range using the
+                parent_left/right tree lookup fields (when available), or as a
+                recursive subquery [(left,inselect,...)], or as an expanded
+                [(left,in,parent_ids)] """
+            if not ids:
+                return FALSE_DOMAIN
+            if left_model._parent_store == 'path':
+                paths = parent_paths(left_model, parent, ids)
+                if paths is not None:
+                    # ancestors are the ids in the records' paths
+                    return [(left, 'in', [int(id) for path in paths for id in path.split('/')[:-1]])]
+            if not nested_set(left_model):
+                dom = hierarchy_domain(left, ids, left_model, parent, 'parent_of', inselect)
+                if dom is not None:
+                    return dom
+            if nested_set(left_model):
                 doms = []
                 for node in left_model.browse(cr, uid, ids, context=context):
                     if doms:
@@ -830,7 +935,7 @@ class expression(object):
                 ids2 = to_ids(right, model, context)
                 dom = HIERARCHY_FUNCS[operator](left, ids2, model)
                 for dom_leaf in reversed(dom):
-                    new_leaf = create_substitution_leaf(leaf, dom_leaf, model)
+                    new_leaf = create_substitution_leaf(leaf, dom_leaf, model, internal=True)
                     push(new_leaf)
 
             elif not column and path[0] in MAGIC_COLUMNS:
@@ -872,12 +977,25 @@ class expression(object):
                 raise NotImplementedError('_auto_join attribute not supported on many2many column %s' % left)
 
             elif len(path) > 1 and column._type == 'many2one':
-                right_ids = comodel.search(cr, uid, [(path[1], operator, right)], context=dict(context, active_test=False))
-                leaf.leaf = (path[0], 'in', right_ids)
-                push(leaf)
+                # the subdomain is evaluated by a subquery in the main query
+                subselect = select_search(comodel, [(path[1], operator, right)], active_test=False)
+                push(create_substitution_leaf(leaf, (path[0], 'inselect', subselect), model, internal=True))
 
             # Making search easier when there is a left operand as column.o2m or column.m2m
-            elif len(path) > 1 and column._type in ['many2many', 'one2many']:
+            elif len(path) > 1 and column._type == 'one2many' and comodel._fields[column._fields_id].store:
+                # records linked to the subquery's records: id in (SELECT inverse FROM comodel WHERE ...)
+                query, params = select_search(comodel, [(path[1], operator, right)])
+                subselect = 'SELECT "%s" FROM "%s" WHERE id IN (%s)' % (column._fields_id, comodel._table, query)
+                push(create_substitution_leaf(leaf, ('id', 'inselect', (subselect, params)), model, internal=True))
+
+            elif len(path) > 1 and column._type == 'many2many':
+                # records linked to the subquery's records through the relation table
+                rel_table, rel_id1, rel_id2 = column._sql_names(model)
+                query, params = select_search(comodel, [(path[1], operator, right)])
+                subselect = 'SELECT "%s" FROM "%s" WHERE "%s" IN (%s)' % (rel_id1, rel_table, rel_id2, query)
+                push(create_substitution_leaf(leaf, ('id', 'inselect', (subselect, params)), model, internal=True))
+
+            elif len(path) > 1 and column._type == 'one2many':
                 right_ids = comodel.search(cr, uid, [(path[1], operator, right)], context=context)
                 table_ids = model.search(cr, uid, [(path[0], 'in', right_ids)], context=dict(context, active_test=False))
                 leaf.leaf = ('id', 'in', table_ids)
@@ -944,11 +1062,12 @@ class expression(object):
             elif column._type == 'one2many' and operator in HIERARCHY_FUNCS:
                 ids2 = to_ids(right, comodel, context)
                 if column._obj != model._name:
-                    dom = HIERARCHY_FUNCS[operator](left, ids2, comodel, prefix=column._obj)
+                    # left is not a column of model: the ids must be expanded
+                    dom = HIERARCHY_FUNCS[operator](left, ids2, comodel, prefix=column._obj, inselect=False)
                 else:
                     dom = HIERARCHY_FUNCS[operator]('id', ids2, model, parent=left)
                 for dom_leaf in reversed(dom):
-                    push(create_substitution_leaf(leaf, dom_leaf, model))
+                    push(create_substitution_leaf(leaf, dom_leaf, model, internal=True))
 
             elif column._type == 'one2many':
                 call_null = True
@@ -982,8 +1101,9 @@ class expression(object):
                             push(create_substitution_leaf(leaf, ('id', o2m_op, ids1), model))
 
                 if call_null:
-                    o2m_op = 'in' if operator in NEGATIVE_TERM_OPERATORS else 'not in'
-                    push(create_substitution_leaf(leaf, ('id', o2m_op, select_distinct_from_where_not_null(cr, column._fields_id, comodel._table)), model))
+                    o2m_op = 'inselect' if operator in NEGATIVE_TERM_OPERATORS else 'not inselect'
+                    subselect = 'SELECT "%s" FROM "%s" WHERE "%s" IS NOT NULL' % (column._fields_id, comodel._table, column._fields_id)
+                    push(create_substitution_leaf(leaf, ('id', o2m_op, (subselect, [])), model, internal=True))
 
             elif column._type == 'many2many':
                 rel_table, rel_id1, rel_id2 = column._sql_names(model)
@@ -995,8 +1115,7 @@ class expression(object):
                         return select_from_where(cr, rel_id1, rel_table, rel_id2, ids, operator)
 
                     ids2 = to_ids(right, comodel, context)
-                    dom = HIERARCHY_FUNCS[operator]('id', ids2, comodel)
-                    ids2 = comodel.search(cr, uid, dom, context=context)
+                    ids2 = comodel.search(cr, uid, [('id', operator, ids2)], context=context)
                     push(create_substitution_leaf(leaf, ('id', 'in', _rec_convert(ids2)), model))
                 else:
                     call_null_m2m = True
@@ -1024,8 +1143,9 @@ class expression(object):
                             push(create_substitution_leaf(leaf, ('id', m2m_op, select_from_where(cr, rel_id1, rel_table, rel_id2, res_ids, operator) or [0]), model))
 
                     if call_null_m2m:
-                        m2m_op = 'in' if operator in NEGATIVE_TERM_OPERATORS else 'not in'
-                        push(create_substitution_leaf(leaf, ('id', m2m_op, select_distinct_from_where_not_null(cr, rel_id1, rel_table)), model))
+                        m2m_op = 'inselect' if operator in NEGATIVE_TERM_OPERATORS else 'not inselect'
+                        subselect = 'SELECT "%s" FROM "%s" WHERE "%s" IS NOT NULL' % (rel_id1, rel_table, rel_id1)
+                        push(create_substitution_leaf(leaf, ('id', m2m_op, (subselect, [])), model, internal=True))
 
             elif column._type == 'many2one':
                 if operator in HIERARCHY_FUNCS:
@@ -1035,7 +1155,7 @@ class expression(object):
                     else:
                         dom = HIERARCHY_FUNCS[operator]('id', ids2, model, parent=left)
                     for dom_leaf in reversed(dom):
-                        push(create_substitution_leaf(leaf, dom_leaf, model))
+                        push(create_substitution_leaf(leaf, dom_leaf, model, internal=True))
                 else:
                     def _get_expression(comodel, cr, uid, left, right, operator, context=None):
                         if context is None:
@@ -1109,6 +1229,7 @@ class expression(object):
                         inselect_operator = 'not inselect'
 
                     unaccent = self._unaccent if sql_operator.endswith('like') else lambda x: x
+                    cast = '::text' if sql_operator.endswith('like') else ''
 
                     instr = unaccent('%s')
 
@@ -1116,25 +1237,33 @@ class expression(object):
                         # params will be flatten by to_sql() => expand the placeholders
                         instr = '(%s)' % ', '.join(['%s'] * len(right))
 
-                    subselect = """WITH temp_irt_current (id, name) as (
-                            SELECT ct.id, coalesce(it.value,ct.{quote_left})
-                            FROM {current_table} ct
-                            LEFT JOIN ir_translation it ON (it.name = %s and
-                                        it.lang = %s and
-                                        it.type = %s and
-                                        it.res_id = ct.id and
-                                        it.value != '')
-                            )
-                            SELECT id FROM temp_irt_current WHERE {name} {operator} {right} order by name
-                            """.format(current_table=model._table, quote_left=_quote(left), name=unaccent('name'),
-                                       operator=sql_operator, right=instr)
-
-                    params = (
+                    # match the untranslated records on the column itself and
+                    # the translated ones on ir_translation, so that the
+                    # predicates may use the indexes on both tables
+                    subselect = """SELECT ct.id FROM {current_table} ct
+                            WHERE {name} {operator} {right}
+                            AND NOT EXISTS (SELECT 1 FROM ir_translation it
+                                            WHERE it.name = %s and
+                                                  it.lang = %s and
+                                                  it.type = %s and
+                                                  it.res_id = ct.id and
+                                                  it.value != '')
+                            UNION
+                            SELECT it.res_id FROM ir_translation it
+                            WHERE it.name = %s and
+                                  it.lang = %s and
+                                  it.type = %s and
+                                  it.value != '' and
+                                  {value} {operator} {right}
+                            """.format(current_table=model._table, name=unaccent('ct.' + _quote(left) + cast),
+                                       value=unaccent('it.value'), operator=sql_operator, right=instr)
+
+                    trans_params = (
                         model._name + ',' + left,
                         context.get('lang') or 'en_US',
                         'model',
-                        right,
                     )
+                    params = (right,) + trans_params + trans_params + (right,)
                     push(create_substitution_leaf(leaf, ('id', inselect_operator, (subselect, params)), model, internal=True))
 
                 else:
@@ -1281,7 +1410,13 @@ class expression(object):
                 params = model._columns[left]._symbol_set[1](right)
 
             if add_null:
-                query = '(%s OR %s."%s" IS NULL)' % (query, table_alias, left)
+                # an empty pattern matches all values: skip the useless
+                # pattern matching on every row
+                if operator in NEGATIVE_TERM_OPERATORS:
+                    query = '(%s."%s" IS NULL)' % (table_alias, left)
+                else:
+                    query = 'TRUE'
+                params = []
 
         if isinstance(params, basestring):
             params = [params]
@@ -1312,3 +1447,130 @@ class expression(object):
             query = '(%s) AND %s' % (joins, query)
 
         return query, tools.flatten(params)
+
+
+# --------------------------------------------------
+# Compiled domains
+# --------------------------------------------------
+
+# operators and column types whose SQL code does not depend on the values
+CACHED_OPERATORS = ('=', '!=', '<=', '<', '>', '>=', '=like', '=ilike',
+                    'like', 'not like', 'ilike', 'not ilike', 'in', 'not in')
+UNCACHED_TYPES = ('one2many', 'many2many', 'binary')
+WILDCARD_OPERATORS = ('like', 'ilike', 'not like', 'not ilike')
+
+
+def value_kind(value):
+    """ Return what the SQL code of a domain term depends on in ``value``. """
+    if isinstance(value, (list, tuple)):
+        nulls = sum(1 for item in value if item == False)
+        return ('list', len(value) - nulls, bool(nulls))
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, basestring):
+        return ('str', bool(value))
+    return type(value).__name__
+
+
+def domain_signature(model, domain):
+    """ Return the structure of ``domain`` on ``model``, where the values of
+        the terms are replaced by their kind, or ``None`` if the SQL code of
+        ``domain`` may depend on more than that (paths, relational fields,
+        translated fields, hierarchy operators...). Two domains with the same
+        signature on a model compile into the same SQL code.
+    """
+    signature = []
+    for element in domain:
+        if is_operator(element):
+            signature.append(element)
+            continue
+        if not is_leaf(element):
+            return None
+        if tuple(element) in (TRUE_LEAF, FALSE_LEAF):
+            signature.append(tuple(element))
+            continue
+        left, operator, right = element
+        column = model._columns.get(left) if isinstance(left, basestring) else None
+        if column is None or operator not in CACHED_OPERATORS:
+            return None
+        if column._type in UNCACHED_TYPES or column.translate:
+            return None
+        if isinstance(column, fields.function) and not column.store:
+            return None
+        if isinstance(right, (list, tuple)):
+            if operator not in ('in', 'not in', '=', '!='):
+                return None
+            if column._type == 'many2one' and any(isinstance(item, basestring) for item in right):
+                return None
+        elif operator in ('in', 'not in') and not isinstance(right, bool):
+            return None
+        elif isinstance(right, basestring):
+            if column._type == 'many2one':
+                return None
+            if column._type == 'datetime' and len(right) == 10:
+                return None
+        signature.append((left, operator, value_kind(right)))
+    return tuple(signature)
+
+
+def domain_params(model, domain):
+    """ Return the SQL parameters of ``domain`` on ``model``, in the order of
+        the SQL code generated by :class:`expression`. The domain must have a
+        signature (see :func:`domain_signature`).
+    """
+    params = []
+    for element in domain:
+        if is_operator(element) or tuple(element) in (TRUE_LEAF, FALSE_LEAF):
+            continue
+        left, operator, right = element
+        column = model._columns[left]
+        convert = (lambda value: value) if left == 'id' else column._symbol_set[1]
+        if isinstance(right, (list, tuple)):
+            params.extend(convert(item) for item in right if item != False)
+        elif (right is False or right is None) and operator in ('=', '!='):
+            continue
+        elif isinstance(right, bool) and column._type == 'boolean' and \
+                not (operator == '=' and right is True):
+            continue
+        elif operator in WILDCARD_OPERATORS:
+            if isinstance(right, unicode):
+                right = right.encode('utf-8')
+            elif not isinstance(right, str):
+                right = str(right)
+            if right:
+                params.append('%%%s%%' % right)
+        elif left == 'id':
+            params.append(right)
+        else:
+            params.append(convert(right))
+    return params
+
+
+def compile_domain(cr, uid, domain, model, context):
+    """ Return a triple ``(tables, where_clause, where_params)`` that implements
+        ``domain`` on ``model``.
+
+        The SQL code of domains whose structure is enough to determine it is
+        kept in the registry's ``domain_cache``, keyed by model and signature
+        (see :func:`domain_signature`); the next domains with the same
+        structure only bind their parameters to it.
+    """
+    signature = domain_signature(model, domain)
+    if signature is not None:
+        key = (model._name, signature)
+        template = model.pool.domain_cache.get(key)
+        if template:
+            tables, where_clause = template
+            return list(tables), where_clause, domain_params(model, domain)
+
+    e = expression(cr, uid, domain, model, context)
+    tables = e.get_tables()
+    where_clause, where_params = e.to_sql()
+
+    if signature is not None and template is None:
+        # only keep the SQL code if the parameters can be bound to it
+        if where_params == domain_params(model, domain):
+            model.pool.domain_cache[key] = (tuple(tables), where_clause)
+        else:
+            model.pool.domain_cache[key] = False
+    return tables, where_clause, where_params
@@ -289,6 +289,16 @@ def exp_migrate_databases(databases):
         openerp.modules.registry.RegistryManager.new(db, force_demo=False, update_module=True)
     return True
 
+def exp_pool_stats():
+    """ Return the counters of the connection pool of this server process:
+        the number of borrowed and idle connections per database, and the
+        number of borrows, waits, total wait time and timeouts.
+
+        In multi-process (prefork) mode, every worker has its own pool, and
+        the counters are only those of the worker that answers the call.
+    """
+    return openerp.sql_db.pool_stats()
+
 #----------------------------------------------------------
 # No master password required
 #----------------------------------------------------------
@@ -9,7 +9,9 @@ the ORM does, in fact.
 """
 
 from contextlib import contextmanager
+from cStringIO import StringIO
 from functools import wraps
+import json
 import logging
 import urlparse
 import uuid
@@ -44,10 +46,12 @@ psycopg2.extensions.register_type(psycopg2.extensions.new_type((700, 701, 1700,)
 
 
 import tools
+from tools import sql_profiler
 from tools.func import frame_codeinfo
 from datetime import datetime as mdt
 from datetime import timedelta
 import threading
+import time
 from inspect import currentframe
 
 import re
@@ -56,6 +60,89 @@ re_into = re.compile('.* into "?([a-zA-Z_0-9]+)"? .*$')
 
 sql_counter = 0
 
+# escaping of values in the text format of COPY
+COPY_NULL = r'\N'
+COPY_ESCAPES = [('\\', r'\\'), ('\t', r'\t'), ('\n', r'\n'), ('\r', r'\r')]
+COPY_UNESCAPES = {'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t', 'v': '\v'}
+re_copy_unescape = re.compile(r'\\(?:([0-7]{1,3})|x([0-9a-fA-F]{1,2})|(.))')
+
+def copy_escape(value):
+    """ Return the representation of a Python value in the text format of
+        COPY, as a byte string.
+    """
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        value = 't' if value else 'f'
+    elif isinstance(value, float):
+        if value != value:
+            value = 'NaN'
+        elif value in (float('inf'), float('-inf')):
+            value = 'Infinity' if value > 0 else '-Infinity'
+        else:
+            value = repr(value)
+    elif isinstance(value, (int, long)):
+        value = str(value)
+    elif isinstance(value, unicode):
+        value = value.encode('utf-8')
+    elif isinstance(value, psycopg2.extensions.Binary):
+        value = '\\x' + str(value.adapted).encode('hex')
+    elif isinstance(value, (buffer, bytearray)):
+        value = '\\x' + str(value).encode('hex')
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif not isinstance(value, str):
+        # dates, datetimes, decimals, ...
+        value = unicode(value).encode('utf-8')
+    for char, escaped in COPY_ESCAPES:
+        if char in value:
+            value = value.replace(char, escaped)
+    return value
+
+def copy_unescape(text):
+    """ Return the value of a field in the text format of COPY: either None
+        or a byte string.
+    """
+    if text == COPY_NULL:
+        return None
+    if '\\' not in text:
+        return text
+    def unescape(match):
+        octal, hexa, char = match.groups()
+        if octal:
+            return chr(int(octal, 8) & 0xFF)
+        if hexa:
+            return chr(int(hexa, 16))
+        return COPY_UNESCAPES.get(char, char)
+    return re_copy_unescape.sub(unescape, text)
+
+
+class CopyReader(object):
+    """ File-like object that produces the rows given by an iterable in the
+        text format of COPY; the rows are consumed lazily while COPY reads.
+    """
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self.count = 0
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += '\t'.join(copy_escape(value) for value in row) + '\n'
+            self.count += 1
+        if size < 0:
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
 class Cursor(object):
     """Represents an open transaction to the PostgreSQL DB backend,
        acting as a lightweight wrapper around psycopg2's
@@ -139,7 +226,7 @@ class Cursor(object):
             return f(self, *args, **kwargs)
         return wrapper
 
-    def __init__(self, pool, dbname, dsn, serialized=True):
+    def __init__(self, pool, dbname, dsn, serialized=True, readonly=False):
         self.sql_from_log = {}
         self.sql_into_log = {}
 
@@ -158,6 +245,9 @@ class Cursor(object):
         # Whether to enable snapshot isolation level for this cursor.
         # see also the docstring of Cursor.
         self._serialized = serialized
+        # Whether the transactions of this cursor are read-only, like on a
+        # read replica.
+        self.readonly = readonly
 
         self._cnx = pool.borrow(dsn)
         self._obj = self._cnx.cursor()
@@ -167,11 +257,17 @@ class Cursor(object):
             self.__caller = False
         self._closed = False   # real initialisation value
         self.autocommit(False)
+        if readonly:
+            # reset by the pool when the connection is borrowed again
+            self._cnx.set_session(readonly=True)
         self.__closer = False
 
         self._default_log_exceptions = True
 
         self.cache = {}
+        # caches that depend on the current transaction, and that are cleared
+        # when it is rolled back, even partially (see savepoint())
+        self.rollback_caches = []
 
     def __build_dict(self, row):
         return {d.name: row[i] for i, d in enumerate(self._obj.description)}
@@ -210,6 +306,10 @@ class Cursor(object):
         if self.sql_log:
             now = mdt.now()
 
+        profiler = sql_profiler.current()
+        if profiler is not None:
+            start = time.time()
+
         try:
             params = params or None
             res = self._obj.execute(query, params)
@@ -225,6 +325,9 @@ class Cursor(object):
         # simple query count is always computed
         self.sql_log_count += 1
 
+        if profiler is not None:
+            profiler.record(query, time.time() - start, self._obj.rowcount)
+
         # advanced stats only if sql_log is enabled
         if self.sql_log:
             delay = mdt.now() - now
@@ -243,6 +346,83 @@ class Cursor(object):
                 self.sql_into_log[res_into.group(1)][1] += delay
         return res
 
+    @check
+    def stream(self, query, params=None, itersize=2000):
+        """ Execute ``query`` with a server-side cursor in the current
+            transaction, and return an iterator over its rows. The rows are
+            fetched by batches of ``itersize`` rows, so that the memory stays
+            bounded whatever the size of the result. The cursor itself may be
+            used while iterating, but the transaction must not be committed
+            or rolled back before the iteration is over.
+        """
+        if params and not isinstance(params, (tuple, list, dict)):
+            raise ValueError("SQL query parameters should be a tuple, list or dict; got %r" % (params,))
+        cursor = self._cnx.cursor('stream_%s' % uuid.uuid1().hex)
+        cursor.itersize = itersize
+        try:
+            cursor.execute(query, params or None)
+        except Exception:
+            _logger.info("bad query: %s", cursor.query or query)
+            cursor.close()
+            raise
+        self.sql_log_count += 1
+        if self.sql_log:
+            _logger.debug("query: %s", cursor.query)
+        return self._stream_rows(cursor)
+
+    def _stream_rows(self, cursor):
+        try:
+            for row in cursor:
+                yield row
+        finally:
+            if not cursor.closed and not self._cnx.closed:
+                cursor.close()
+
+    @check
+    def copy_from_rows(self, table, columns, rows):
+        """ Insert rows in ``table`` with ``COPY ... FROM STDIN``, which is
+            much faster than ``INSERT`` for large amounts of data. The rows
+            are tuples of Python values matching ``columns``, and are escaped
+            for the text format of COPY; ``rows`` may be any iterable, and is
+            consumed lazily. Return the number of inserted rows.
+        """
+        query = 'COPY "%s" (%s) FROM STDIN' % (table, ', '.join('"%s"' % c for c in columns))
+        reader = CopyReader(rows)
+        try:
+            self._obj.copy_expert(query, reader)
+        except Exception:
+            _logger.info("bad query: %s", query)
+            raise
+        self.sql_log_count += 1
+        if self.sql_log:
+            _logger.debug("query: %s (%d rows)", query, reader.count)
+        return reader.count
+
+    @check
+    def copy_to_rows(self, query, params=None):
+        """ Execute ``query`` with ``COPY (...) TO STDOUT``, and return its
+            rows as a list of tuples. The values are returned in the text
+            format of PostgreSQL, as byte strings, or None for NULL.
+        """
+        if params and not isinstance(params, (tuple, list, dict)):
+            raise ValueError("SQL query parameters should be a tuple, list or dict; got %r" % (params,))
+        if params:
+            query = self._obj.mogrify(query, params)
+        query = 'COPY (%s) TO STDOUT' % query
+        output = StringIO()
+        try:
+            self._obj.copy_expert(query, output)
+        except Exception:
+            _logger.info("bad query: %s", query)
+            raise
+        self.sql_log_count += 1
+        if self.sql_log:
+            _logger.debug("query: %s", query)
+        return [
+            tuple(copy_unescape(value) for value in line.split('\t'))
+            for line in output.getvalue().split('\n')[:-1]
+        ]
+
     def split_for_in_conditions(self, ids):
         """Split a list of identifiers into one or more smaller tuples
            safe for IN conditions, after uniquifying them."""
@@ -347,8 +527,14 @@ class Cursor(object):
     def rollback(self):
         """ Perform an SQL `ROLLBACK`
         """
+        self.clear_rollback_caches()
         return self._cnx.rollback()
 
+    def clear_rollback_caches(self):
+        """ Clear the caches that depend on the current transaction. """
+        for cache in self.rollback_caches:
+            cache.clear()
+
     def __enter__(self):
         """ Using the cursor as a contextmanager automatically commits and
             closes it::
@@ -377,8 +563,26 @@ class Cursor(object):
             self.execute('RELEASE SAVEPOINT "%s"' % name)
         except:
             self.execute('ROLLBACK TO SAVEPOINT "%s"' % name)
+            self.clear_rollback_caches()
             raise
 
+    @check
+    def reconnect(self, dsn):
+        """ Roll back the current transaction, and continue on a read-write
+            connection to ``dsn``. The cursor object remains the same, so that
+            the environments and records bound to it remain valid. This is
+            used to fall back from a read replica to the primary database.
+        """
+        self._obj.close()
+        self._cnx.rollback()
+        self.clear_rollback_caches()
+        self.__pool.give_back(self._cnx)
+        self._cnx = self.__pool.borrow(dsn)
+        self._obj = self._cnx.cursor()
+        self.readonly = False
+        self.autocommit(False)
+        self.cache = {}
+
     @check
     def __getattr__(self, name):
         return getattr(self._obj, name)
@@ -421,21 +625,72 @@ class TestCursor(Cursor):
         self.execute("SAVEPOINT test_cursor")
 
     def rollback(self):
+        self.clear_rollback_caches()
         self.execute("ROLLBACK TO SAVEPOINT test_cursor")
         self.execute("SAVEPOINT test_cursor")
 
 class PsycoConnection(psycopg2.extensions.connection):
     pass
 
+class SubPool(object):
+    """ The connections of a :class:`ConnectionPool` to a given dsn, with
+        their counters. The idle connections are kept in a stack, with the
+        time they were given back, and are reused in LIFO order.
+    """
+    def __init__(self, dsn):
+        self.dsn = dsn
+        self.idle = []              # list of (connection, time of give back)
+        self.used = set()
+        self.borrows = 0            # number of borrowed connections
+        self.created = 0            # number of opened connections
+        self.reaped = 0             # number of connections closed by reaping
+        self.waits = 0              # number of borrows that waited
+        self.wait_time = 0.0        # total waiting time, in seconds
+        self.timeouts = 0           # number of borrows that timed out
+
+    def __len__(self):
+        return len(self.idle) + len(self.used)
+
+    @property
+    def name(self):
+        """ the database name of the dsn, used to report the counters """
+        match = re_dsn_dbname.search(self.dsn)
+        if match:
+            return match.group(1)
+        return urlparse.urlsplit(self.dsn).path.lstrip('/') or self.dsn
+
+    def stats(self):
+        return {
+            'borrowed': len(self.used),
+            'idle': len(self.idle),
+            'borrows': self.borrows,
+            'created': self.created,
+            'reaped': self.reaped,
+            'waits': self.waits,
+            'wait_time': self.wait_time,
+            'timeouts': self.timeouts,
+        }
+
+re_dsn_dbname = re.compile(r'(?:^|\s)dbname=(\S+)')
+
+
 class ConnectionPool(object):
     """ The pool of connections to database(s)
 
         Keep a set of connections to pg databases open, and reuse them
-        to open cursors for all transactions.
-
-        The connections are *not* automatically closed. Only a close_db()
-        can trigger that.
+        to open cursors for all transactions. The connections are grouped by
+        dsn (database), and each group is limited to ``db_maxconn``
+        connections, while the whole pool is limited to ``maxconn``.
+
+        Idle connections are closed after ``idle_timeout`` seconds, except
+        the ``db_minconn`` most recently used ones of each database, and any
+        connection is closed once it is given back after ``lifetime``
+        seconds. When the pool is full, ``borrow()`` waits up to
+        ``borrow_timeout`` seconds for a connection to be given back. A zero
+        value disables the corresponding limit.
     """
+    # minimum delay between two reapings of the pool, in seconds
+    REAP_INTERVAL = 10
 
     def locked(fun):
         @wraps(fun)
@@ -447,113 +702,211 @@ class ConnectionPool(object):
                 self._lock.release()
         return _locked
 
-    def __init__(self, maxconn=64):
-        self._connections = []
+    def __init__(self, maxconn=64, db_maxconn=0, db_minconn=0, idle_timeout=0,
+                 lifetime=0, borrow_timeout=0):
+        self._pools = {}                # {dsn: SubPool}
         self._maxconn = max(maxconn, 1)
-        self._lock = threading.Lock()
+        self._db_maxconn = min(db_maxconn or self._maxconn, self._maxconn)
+        self._db_minconn = db_minconn
+        self._idle_timeout = idle_timeout
+        self._lifetime = lifetime
+        self._borrow_timeout = borrow_timeout
+        self._count = 0
+        self._reaped_at = time.time()
+        self._lock = threading.Condition(threading.Lock())
 
     def __repr__(self):
-        used = len([1 for c, u in self._connections[:] if u])
-        count = len(self._connections)
-        return "ConnectionPool(used=%d/count=%d/max=%d)" % (used, count, self._maxconn)
+        used = sum(len(pool.used) for pool in self._pools.values())
+        return "ConnectionPool(used=%d/count=%d/max=%d)" % (used, self._count, self._maxconn)
 
     def _debug(self, msg, *args):
         _logger.debug(('%r ' + msg), self, *args)
 
+    def _close(self, cnx):
+        """ close a connection that has been removed from its pool """
+        self._count -= 1
+        # psycopg2 2.4.4 and earlier do not allow closing a closed connection
+        if not cnx.closed:
+            cnx.close()
+
+    def _expired(self, cnx, now):
+        return bool(self._lifetime) and now - cnx._created_at > self._lifetime
+
+    def _reap(self, now):
+        """ free the leaked connections, and close the dead, idle and expired
+            connections
+        """
+        self._reaped_at = now
+        for pool in self._pools.itervalues():
+            for cnx in list(pool.used):
+                if getattr(cnx, 'leaked', False):
+                    delattr(cnx, 'leaked')
+                    pool.used.discard(cnx)
+                    pool.idle.append((cnx, now))
+                    _logger.info('%r: Free leaked connection to %r', self, cnx.dsn)
+            # the idle stack is ordered by time of give back, and the most
+            # recent connections are kept when the others are reaped
+            keep = []
+            for index, (cnx, since) in enumerate(reversed(pool.idle)):
+                if cnx.closed or self._expired(cnx, now) or (
+                        self._idle_timeout and index >= self._db_minconn and
+                        now - since > self._idle_timeout):
+                    self._close(cnx)
+                    pool.reaped += 1
+                else:
+                    keep.append((cnx, since))
+            pool.idle = keep[::-1]
+        self._lock.notify_all()
+
+    def _pop_idle(self, pool, now):
+        """ return an idle connection from ``pool`` ready to use, or None """
+        while pool.idle:
+            cnx, since = pool.idle.pop()
+            if cnx.closed or self._expired(cnx, now):
+                self._close(cnx)
+                pool.reaped += 1
+                continue
+            try:
+                cnx.reset()
+            except psycopg2.OperationalError:
+                self._debug('Cannot reset connection: %r', cnx.dsn)
+                self._close(cnx)
+                continue
+            return cnx
+        return None
+
+    def _close_oldest_idle(self):
+        """ close the least recently used idle connection of the pool, and
+            return whether there was one
+        """
+        pools = [pool for pool in self._pools.itervalues() if pool.idle]
+        if not pools:
+            return False
+        pool = min(pools, key=lambda pool: pool.idle[0][1])
+        cnx, _since = pool.idle.pop(0)
+        self._close(cnx)
+        self._debug('Removing old connection: %r', cnx.dsn)
+        return True
+
     @locked
     def borrow(self, dsn):
-        # free dead and leaked connections
-        for i, (cnx, _) in tools.reverse_enumerate(self._connections):
-            if cnx.closed:
-                self._connections.pop(i)
-                self._debug('Removing closed connection at index %d: %r', i, cnx.dsn)
-                continue
-            if getattr(cnx, 'leaked', False):
-                delattr(cnx, 'leaked')
-                self._connections.pop(i)
-                self._connections.append((cnx, False))
-                _logger.info('%r: Free leaked connection to %r', self, cnx.dsn)
-
-        for i, (cnx, used) in enumerate(self._connections):
-            if not used and cnx._original_dsn == dsn:
+        start = now = time.time()
+        if now - self._reaped_at > self.REAP_INTERVAL:
+            self._reap(now)
+
+        reaped = waited = False
+        while True:
+            pool = self._pools.get(dsn)
+            if pool is None:
+                pool = self._pools[dsn] = SubPool(dsn)
+
+            cnx = self._pop_idle(pool, now)
+            if cnx is not None:
+                self._debug('Borrow existing connection to %r', cnx.dsn)
+                break
+
+            if len(pool) < self._db_maxconn and (
+                    self._count < self._maxconn or self._close_oldest_idle()):
                 try:
-                    cnx.reset()
-                except psycopg2.OperationalError:
-                    self._debug('Cannot reset connection at index %d: %r', i, cnx.dsn)
-                    # psycopg2 2.4.4 and earlier do not allow closing a closed connection
-                    if not cnx.closed:
-                        cnx.close()
-                    continue
-                self._connections.pop(i)
-                self._connections.append((cnx, True))
-                self._debug('Borrow existing connection to %r at index %d', cnx.dsn, i)
-
-                return cnx
-
-        if len(self._connections) >= self._maxconn:
-            # try to remove the oldest connection not used
-            for i, (cnx, used) in enumerate(self._connections):
-                if not used:
-                    self._connections.pop(i)
-                    if not cnx.closed:
-                        cnx.close()
-                    self._debug('Removing old connection at index %d: %r', i, cnx.dsn)
-                    break
-            else:
-                # note: this code is called only if the for loop has completed (no break)
-                raise PoolError('The Connection Pool Is Full')
+                    cnx = psycopg2.connect(dsn=dsn, connection_factory=PsycoConnection)
+                except psycopg2.Error:
+                    _logger.info('Connection to the database failed')
+                    raise
+                cnx._original_dsn = dsn
+                cnx._created_at = now
+                self._count += 1
+                pool.created += 1
+                self._debug('Create new connection')
+                break
 
-        try:
-            result = psycopg2.connect(dsn=dsn, connection_factory=PsycoConnection)
-        except psycopg2.Error:
-            _logger.info('Connection to the database failed')
-            raise
-        result._original_dsn = dsn
-        self._connections.append((result, True))
-        self._debug('Create new connection')
-        return result
+            # the pool is full: recover leaked connections, then wait for a
+            # connection to be given back
+            if not reaped:
+                self._reap(now)
+                reaped = True
+                continue
+            remaining = start + self._borrow_timeout - now
+            if remaining <= 0:
+                pool.wait_time += now - start
+                pool.timeouts += 1
+                raise PoolError('The Connection Pool Is Full')
+            if not waited:
+                waited = True
+                pool.waits += 1
+            self._lock.wait(remaining)
+            now = time.time()
+
+        pool.used.add(cnx)
+        pool.borrows += 1
+        if waited:
+            pool.wait_time += now - start
+        return cnx
 
     @locked
     def give_back(self, connection, keep_in_pool=True):
         self._debug('Give back connection to %r', connection.dsn)
-        for i, (cnx, used) in enumerate(self._connections):
-            if cnx is connection:
-                self._connections.pop(i)
-                if keep_in_pool:
-                    self._connections.append((cnx, False))
-                    self._debug('Put connection to %r in pool', cnx.dsn)
-                else:
-                    self._debug('Forgot connection to %r', cnx.dsn)
-                    cnx.close()
-                break
-        else:
+        pool = self._pools.get(getattr(connection, '_original_dsn', None))
+        if pool is None or connection not in pool.used:
             raise PoolError('This connection does not below to the pool')
+        pool.used.discard(connection)
+        if keep_in_pool and not connection.closed and not self._expired(connection, time.time()):
+            pool.idle.append((connection, time.time()))
+            self._debug('Put connection to %r in pool', connection.dsn)
+        else:
+            self._debug('Forgot connection to %r', connection.dsn)
+            self._close(connection)
+        # waiters may be waiting for another database: wake them all up, the
+        # ones that cannot use the released slot go back to waiting
+        self._lock.notify_all()
 
     @locked
     def close_all(self, dsn=None):
         count = 0
-        last = None
-        for i, (cnx, used) in tools.reverse_enumerate(self._connections):
-            if dsn is None or cnx._original_dsn == dsn:
-                cnx.close()
-                last = self._connections.pop(i)[0]
-                count += 1
+        for key, pool in self._pools.items():
+            if dsn is None or key == dsn:
+                for cnx, _since in pool.idle:
+                    self._close(cnx)
+                for cnx in pool.used:
+                    self._close(cnx)
+                count += len(pool)
+                del self._pools[key]
+        self._lock.notify_all()
         _logger.info('%r: Closed %d connections %s', self, count,
-                    (dsn and last and 'to %r' % last.dsn) or '')
+                    (dsn and count and 'to %r' % dsn) or '')
+
+    @locked
+    def stats(self):
+        """ Return the counters of the pool, as a dictionary with the global
+            limits and the counters per database.
+        """
+        databases = {}
+        for pool in self._pools.itervalues():
+            stats = pool.stats()
+            if pool.name in databases:
+                for key, val in databases[pool.name].iteritems():
+                    stats[key] += val
+            databases[pool.name] = stats
+        return {
+            'count': self._count,
+            'maxconn': self._maxconn,
+            'db_maxconn': self._db_maxconn,
+            'databases': databases,
+        }
 
 
 class Connection(object):
     """ A lightweight instance of a connection to postgres
     """
-    def __init__(self, pool, dbname, dsn):
+    def __init__(self, pool, dbname, dsn, readonly=False):
         self.dbname = dbname
         self.dsn = dsn
+        self.readonly = readonly
         self.__pool = pool
 
     def cursor(self, serialized=True):
         cursor_type = serialized and 'serialized ' or ''
         _logger.debug('create %scursor to %r', cursor_type, self.dsn)
-        return Cursor(self.__pool, self.dbname, self.dsn, serialized=serialized)
+        return Cursor(self.__pool, self.dbname, self.dsn, serialized=serialized, readonly=self.readonly)
 
     def test_cursor(self, serialized=True):
         cursor_type = serialized and 'serialized ' or ''
@@ -573,8 +926,9 @@ class Connection(object):
         except Exception:
             return False
 
-def dsn(db_or_uri):
-    """parse the given `db_or_uri` and return a 2-tuple (dbname, uri)"""
+def dsn(db_or_uri, replica=False):
+    """parse the given `db_or_uri` and return a 2-tuple (dbname, uri); with
+    `replica`, the uri refers to the read replica of the database"""
     if db_or_uri.startswith(('postgresql://', 'postgres://')):
         # extract db from uri
         us = urlparse.urlsplit(db_or_uri)
@@ -589,6 +943,8 @@ def dsn(db_or_uri):
     _dsn = ''
     for p in ('host', 'port', 'user', 'password'):
         cfg = tools.config['db_' + p]
+        if replica and p in ('host', 'port'):
+            cfg = tools.config['db_replica_' + p] or cfg
         if cfg:
             _dsn += '%s=%s ' % (p, cfg)
 
@@ -596,23 +952,43 @@ def dsn(db_or_uri):
 
 _Pool = None
 
-def db_connect(to, allow_uri=False):
+def db_connect(to, allow_uri=False, readonly=False):
+    """ Return a :class:`Connection` to the database ``to``. With
+        ``readonly``, the connection goes to the read replica configured by
+        the options ``db_replica_host`` and ``db_replica_port``, and its
+        cursors are read-only.
+    """
     global _Pool
     if _Pool is None:
-        _Pool = ConnectionPool(int(tools.config['db_maxconn']))
-
-    db, uri = dsn(to)
+        _Pool = ConnectionPool(
+            maxconn=int(tools.config['db_maxconn']),
+            db_maxconn=int(tools.config['db_maxconn_per_db'] or 0),
+            db_minconn=int(tools.config['db_minconn_per_db'] or 0),
+            idle_timeout=int(tools.config['db_idle_timeout'] or 0),
+            lifetime=int(tools.config['db_max_lifetime'] or 0),
+            borrow_timeout=float(tools.config['db_borrow_timeout'] or 0),
+        )
+
+    db, uri = dsn(to, replica=readonly)
     if not allow_uri and db != to:
         raise ValueError('URI connections not allowed')
-    return Connection(_Pool, db, uri)
+    return Connection(_Pool, db, uri, readonly=readonly)
 
 def close_db(db_name):
     """ You might want to call openerp.modules.registry.RegistryManager.delete(db_name) along this function."""
     global _Pool
     if _Pool:
         _Pool.close_all(dsn(db_name)[1])
+        if dsn(db_name, replica=True) != dsn(db_name):
+            _Pool.close_all(dsn(db_name, replica=True)[1])
 
 def close_all():
     global _Pool
     if _Pool:
         _Pool.close_all()
+
+def pool_stats():
+    """ Return the counters of the connection pool (see :meth:`ConnectionPool.stats`). """
+    if _Pool:
+        return _Pool.stats()
+    return {}
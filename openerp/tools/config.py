@@ -203,6 +203,20 @@ class configmanager(object):
                          help="specify the database port", type="int")
         group.add_option("--db_maxconn", dest="db_maxconn", type='int', my_default=64,
                          help="specify the the maximum number of physical connections to posgresql")
+        group.add_option("--db_maxconn_per_db", dest="db_maxconn_per_db", type='int', my_default=0,
+                         help="specify the maximum number of physical connections to a single database (0 means db_maxconn)")
+        group.add_option("--db_minconn_per_db", dest="db_minconn_per_db", type='int', my_default=0,
+                         help="specify the number of idle connections to a database that are never closed for idleness")
+        group.add_option("--db_idle_timeout", dest="db_idle_timeout", type='int', my_default=600,
+                         help="specify the number of seconds after which an idle connection is closed (0 to disable)")
+        group.add_option("--db_max_lifetime", dest="db_max_lifetime", type='int', my_default=3600,
+                         help="specify the number of seconds after which a connection is closed once released (0 to disable)")
+        group.add_option("--db_borrow_timeout", dest="db_borrow_timeout", type='float', my_default=0,
+                         help="specify the number of seconds to wait for a connection when the pool is full")
+        group.add_option("--db_replica_host", dest="db_replica_host", my_default=False,
+                         help="specify the host of a read replica of the databases, used by read-only routes")
+        group.add_option("--db_replica_port", dest="db_replica_port", my_default=False,
+                         help="specify the port of a read replica of the databases", type="int")
         group.add_option("--db-template", dest="db_template", my_default="template1",
                          help="specify a custom database template to create a new database")
         parser.add_option_group(group)
@@ -251,6 +265,15 @@ class configmanager(object):
                          type="int")
         group.add_option("--unaccent", dest="unaccent", my_default=False, action="store_true",
                          help="Use the unaccent function provided by the database when available.")
+        group.add_option("--columnar-cache", dest="columnar_cache", my_default=False, action="store_true",
+                         help="Store the record cache in compact array-backed columns, which reduces "
+                              "the memory used by processes reading many records.")
+        group.add_option("--sql-profiler", dest="sql_profiler", my_default=False,
+                         type="choice", choices=['request', 'cron', 'all'],
+                         help="Profile the SQL queries of the HTTP requests that ask for it with the "
+                              "header X-Odoo-SQL-Profile or the parameter sql_profile ('request'), of "
+                              "the cron jobs ('cron'), or of both ('all'). Only the requests of "
+                              "administrators are profiled, unless the server runs with --debug.")
         group.add_option("--geoip-db", dest="geoip_database", my_default='/usr/share/GeoIP/GeoLiteCity.dat',
                          help="Absolute path to the GeoIP database file.")
         parser.add_option_group(group)
@@ -362,7 +385,10 @@ class configmanager(object):
                 'db_name', 'db_user', 'db_password', 'db_host',
                 'db_port', 'db_template', 'logfile', 'pidfile', 'smtp_port',
                 'email_from', 'smtp_server', 'smtp_user', 'smtp_password',
-                'db_maxconn', 'import_partial', 'addons_path',
+                'db_maxconn', 'db_maxconn_per_db', 'db_minconn_per_db',
+                'db_idle_timeout', 'db_max_lifetime', 'db_borrow_timeout',
+                'db_replica_host', 'db_replica_port',
+                'import_partial', 'addons_path',
                 'xmlrpc', 'syslog', 'without_demo',
                 'dbfilter', 'log_level', 'log_db',
                 'log_db_level', 'geoip_database',
@@ -389,7 +415,7 @@ class configmanager(object):
             'list_db', 'proxy_mode',
             'test_file', 'test_enable', 'test_commit', 'test_report_directory',
             'osv_memory_count_limit', 'osv_memory_age_limit', 'max_cron_threads', 'unaccent',
-            'data_dir',
+            'data_dir', 'columnar_cache', 'sql_profiler',
         ]
 
         posix_keys = [
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+""" Profiling of the SQL queries executed by a request or a cron job.
+
+While a :class:`SQLProfiler` is active in the current thread (see
+:func:`profiling`), the cursors record every query they execute, with its
+duration, its number of rows, and the Python stack that executed it. The
+report of a profiler groups the queries by shape, i.e., their SQL code without
+their parameters, and flags the shapes that are repeatedly executed from the
+same stack: those are N+1 patterns, typically a query made for each record in
+a loop instead of a single query for all records.
+
+Reports are stored as JSON files in the data directory, so that they can be
+retrieved by any server process.
+"""
+
+import cgi
+import json
+import os
+import re
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from config import config
+
+# minimum number of executions of a query shape from the same stack to report
+# it as an N+1 pattern
+NPLUS1_THRESHOLD = 10
+
+# number of frames kept in the stack of every query
+STACK_DEPTH = 12
+
+# maximum number of reports kept on disk
+MAX_REPORTS = 100
+
+# the frames of those files are not recorded in stacks
+SKIPPED_FILES = (
+    os.path.join('openerp', 'sql_db.py'),
+    os.path.join('openerp', 'tools', 'sql_profiler.py'),
+)
+
+re_quoted = re.compile(r"'(?:[^']|'')*'")
+re_number = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+re_param = re.compile(r"%(?:\(\w+\))?s")
+re_list = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+re_space = re.compile(r"\s+")
+
+def normalize(query):
+    """ Return the shape of the given query: its parameters, literal values
+        and lists of values are replaced by placeholders.
+    """
+    query = re_quoted.sub('?', query)
+    query = re_number.sub('?', query)
+    query = re_param.sub('?', query)
+    query = re_list.sub('(...)', query)
+    return re_space.sub(' ', query).strip()
+
+
+class SQLProfiler(object):
+    """ Recorder of the queries executed in the current thread.
+
+        :param name: a description of what is profiled, like the path of an
+            HTTP request, or the name of a cron job
+    """
+    def __init__(self, name):
+        self.name = name
+        self.id = uuid.uuid4().hex
+        self.start = time.time()
+        self.duration = 0.0
+        self.queries = []           # list of (query, duration, rows, stack)
+
+    def record(self, query, duration, rows):
+        """ Record a query that took ``duration`` seconds and produced or
+            affected ``rows`` rows; its stack is the current one.
+        """
+        stack = [
+            (filename, lineno, funcname)
+            for filename, lineno, funcname, _line in traceback.extract_stack()
+            if not filename.endswith(SKIPPED_FILES)
+        ]
+        self.queries.append((query, duration, rows, stack[-STACK_DEPTH:]))
+
+    def stop(self):
+        self.duration = time.time() - self.start
+
+    def report(self, threshold=NPLUS1_THRESHOLD):
+        """ Return the report of the profiler, as a JSON-serializable dict. """
+        queries = []
+        shapes = OrderedDict()      # {shape: stats}
+        calls = OrderedDict()       # {(shape, stack): stats}
+        for query, duration, rows, stack in self.queries:
+            shape = normalize(query)
+            stack = ["%s:%s in %s" % frame for frame in stack]
+            queries.append({
+                'query': query,
+                'shape': shape,
+                'duration': duration,
+                'rows': rows,
+                'stack': stack,
+            })
+            for stats in (shapes.setdefault(shape, {'shape': shape}),
+                          calls.setdefault((shape, tuple(stack)), {'shape': shape, 'stack': stack})):
+                stats['count'] = stats.get('count', 0) + 1
+                stats['duration'] = stats.get('duration', 0.0) + duration
+                stats['rows'] = stats.get('rows', 0) + max(rows, 0)
+
+        by_duration = lambda stats: -stats['duration']
+        return {
+            'id': self.id,
+            'name': self.name,
+            'start': self.start,
+            'duration': self.duration,
+            'query_count': len(queries),
+            'query_duration': sum(query['duration'] for query in queries),
+            'queries': queries,
+            'shapes': sorted(shapes.itervalues(), key=by_duration),
+            'n_plus_one': sorted((stats for stats in calls.itervalues()
+                                  if stats['count'] >= threshold), key=by_duration),
+        }
+
+    def summary(self, report=None):
+        """ Return a one-line summary of the report. """
+        report = report or self.report()
+        return "id=%s; queries=%d; sql=%.1fms; total=%.1fms; n+1=%d" % (
+            report['id'], report['query_count'], report['query_duration'] * 1000,
+            report['duration'] * 1000, len(report['n_plus_one']),
+        )
+
+    def save(self):
+        """ Store the report of the profiler, and return it. """
+        report = self.report()
+        path = reports_dir()
+        if not os.path.isdir(path):
+            os.makedirs(path, 0700)
+        with open(os.path.join(path, '%s.json' % self.id), 'w') as f:
+            json.dump(report, f)
+        # remove the oldest reports
+        filenames = sorted(
+            (os.path.join(path, name) for name in os.listdir(path) if name.endswith('.json')),
+            key=os.path.getmtime,
+        )
+        for filename in filenames[:-MAX_REPORTS]:
+            try:
+                os.unlink(filename)
+            except OSError:
+                pass
+        return report
+
+
+def reports_dir():
+    return os.path.join(config['data_dir'], 'sql_profiles')
+
+def load(report_id):
+    """ Return the stored report with the given id, or None. """
+    if not re.match(r'^[0-9a-f]{32}$', report_id or ''):
+        return None
+    try:
+        with open(os.path.join(reports_dir(), '%s.json' % report_id)) as f:
+            return json.load(f)
+    except IOError:
+        return None
+
+def to_html(report):
+    """ Return a simple HTML page presenting the given report. """
+    esc = lambda value: cgi.escape(unicode(value), quote=True)
+    parts = [
+        u"<html><head><title>SQL profile %s</title></head><body>" % esc(report['name']),
+        u"<h1>%s</h1>" % esc(report['name']),
+        u"<p>%d queries, %.1fms in SQL, %.1fms in total</p>" % (
+            report['query_count'], report['query_duration'] * 1000, report['duration'] * 1000),
+    ]
+
+    def table(title, rows, with_stack):
+        parts.append(u"<h2>%s</h2><table border='1'><tr><th>count</th>"
+                     u"<th>time (ms)</th><th>rows</th><th>query</th>%s</tr>"
+                     % (esc(title), u"<th>stack</th>" if with_stack else u""))
+        for row in rows:
+            parts.append(u"<tr><td>%s</td><td>%.2f</td><td>%s</td><td><code>%s</code></td>%s</tr>" % (
+                row.get('count', 1), row['duration'] * 1000, row['rows'],
+                esc(row.get('query') or row['shape']),
+                u"<td><pre>%s</pre></td>" % esc("\n".join(row['stack'])) if with_stack else u"",
+            ))
+        parts.append(u"</table>")
+
+    table("N+1 patterns", report['n_plus_one'], True)
+    table("Query shapes", report['shapes'], False)
+    table("Queries", report['queries'], True)
+    parts.append(u"</body></html>")
+    return u"\n".join(parts)
+
+
+_local = threading.local()
+
+def current():
+    """ Return the profiler active in the current thread, or None. """
+    return getattr(_local, 'profiler', None)
+
+@contextmanager
+def profiling(profiler):
+    """ Context manager that makes ``profiler`` active in the current thread,
+        and stops it at the end. ``profiler`` may be None, in which case
+        nothing is profiled.
+    """
+    previous = current()
+    _local.profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _local.profiler = previous
+        if profiler is not None:
+            profiler.stop()